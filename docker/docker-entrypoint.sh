@@ -27,7 +27,7 @@ fi
 if [ -f "vercel-deployment/api/translate.py" ]; then
     echo "Starting server from vercel-deployment..."
     cd vercel-deployment/api
-    exec uvicorn translate:app --host 0.0.0.0 --port ${PORT:-8000}
+    exec uvicorn translate:app --host 0.0.0.0 --port ${PORT:-8000} --workers ${WEB_CONCURRENCY:-1}
 else
     echo "Starting server from root..."
     exec python3 main.py
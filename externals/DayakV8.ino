@@ -2,10 +2,10 @@
 
 #include <WiFi.h>
 #include <WebServer.h>
-#include <ArduinoJson.h>
 #include <vector>
 #include <DNSServer.h>
 #include <ESPmDNS.h>
+#include <string.h>
 
 // AP Configuration
 const char* AP_SSID = "DayakTranslator";  // Nama jaringan WiFi yang akan muncul
@@ -18,7 +18,6 @@ IPAddress AP_SUBNET(255, 255, 255, 0);     // Subnet mask
 // Initialize servers
 WebServer server(80);
 DNSServer dnsServer;
-StaticJsonDocument<16384> dict;
 
 // Connection tracking
 struct ClientInfo {
@@ -28,9 +27,21 @@ struct ClientInfo {
 std::vector<ClientInfo> activeClients;
 const unsigned long CLIENT_TIMEOUT = 300000; // 5 minutes in milliseconds
 
-// Refer to [https://github.com/RyuHiiragi/Dayak-Kenyah-Translator-ESP-32.git] for the full original dictionary JSON and HTML/CSS/JS.
+// Refer to [https://github.com/RyuHiiragi/Dayak-Kenyah-Translator-ESP-32.git] for the original HTML/CSS/JS.
 // KAMUS DAYAK KENYAH
-const char dictionary_json[] PROGMEM = R"rawliteral( ## DICTIONARY RAW STRING ## )rawliteral"; // Opted out for brevity
+// Binary image searched in place from flash; generate it with
+//   python tools/build_esp32_dictionary.py -o externals/dictionary_bin.h
+#include "dictionary_bin.h"
+
+// Views into dictionary_bin (layout documented in tools/build_esp32_dictionary.py)
+struct BinaryDictionary {
+    uint32_t forwardCount;
+    uint32_t reverseCount;
+    const uint8_t* forwardTable;
+    const uint8_t* reverseTable;
+    const uint8_t* strings;
+};
+BinaryDictionary dict = {0, 0, nullptr, nullptr, nullptr};
 
 // 3. KODE HTML/CSS/JS
 const char index_html[] PROGMEM = R"rawliteral( ## HTML, CSS, JS RAW STRING ## )rawliteral"; // Opted out for brevity
@@ -43,6 +54,7 @@ void handleFill();
 String extractQuotedText(const String& text);
 void updateClientActivity(IPAddress clientIP);
 void cleanupInactiveClients();
+bool loadDictionary();
 
 // BAGIAN ENGINE
 bool refinedPartialMatch(const String& token, const String& dictWord) {
@@ -82,80 +94,64 @@ std::vector<String> tokenizeSentence(const String& sentence) {
     return tokens;
 }
 
-String translateSentencePartial(const String& input, const String& lang, const JsonObject& dictObj) {
+static uint32_t readU32(const uint8_t* p) {
+    return (uint32_t)p[0] | ((uint32_t)p[1] << 8) | ((uint32_t)p[2] << 16) | ((uint32_t)p[3] << 24);
+}
+
+// Strings are stored as u16 length + bytes + NUL, so the bytes are a C string
+static const char* dictString(uint32_t offset) {
+    return (const char*)(dict.strings + offset + 2);
+}
+
+bool loadDictionary() {
+    if (dictionary_bin_len < 40 || memcmp(dictionary_bin, "DKD1", 4) != 0) return false;
+    if ((dictionary_bin[4] | (dictionary_bin[5] << 8)) != 1) return false; // format version
+    dict.forwardCount = readU32(dictionary_bin + 8);
+    dict.reverseCount = readU32(dictionary_bin + 12);
+    dict.forwardTable = dictionary_bin + readU32(dictionary_bin + 16);
+    dict.reverseTable = dictionary_bin + readU32(dictionary_bin + 20);
+    dict.strings = dictionary_bin + readU32(dictionary_bin + 24);
+    return true;
+}
+
+// Binary search over a table of (key offset, value offset) rows sorted in strcmp order
+const char* dictSearch(const uint8_t* table, uint32_t count, const char* word) {
+    uint32_t low = 0, high = count;
+    while (low < high) {
+        uint32_t middle = (low + high) / 2;
+        const uint8_t* row = table + middle * 8;
+        int cmp = strcmp(dictString(readU32(row)), word);
+        if (cmp == 0) return dictString(readU32(row + 4));
+        if (cmp < 0) low = middle + 1;
+        else high = middle;
+    }
+    return nullptr;
+}
+
+String translateSentencePartial(const String& input, const String& lang) {
     std::vector<String> tokens = tokenizeSentence(input);
     String result;
-    
-    // Set a maximum number of iterations to prevent potential hangs
-    const int MAX_DICT_ITERATIONS = 1000;
-
-    if (lang == "id") { // Indonesian -> Dayak
-        for (auto &t : tokens) {
-            String tLower = t;
-            tLower.toLowerCase();
-            bool found = false;
-            int iterations = 0;
-            
-            for (JsonPair pair : dictObj) {
-                String key = pair.key().c_str();
-                String keyLower = key;
-                keyLower.toLowerCase();
-                
-                if (tLower == keyLower) {
-                    result += pair.value().as<String>() + " ";
-                    found = true;
-                    break;
-                }
-                
-                iterations++;
-                if (iterations >= MAX_DICT_ITERATIONS) {
-                    break;
-                }
-            }
-            
-            if (!found) {
-                result += t + " ";
-            }
-        }
-    } else { // Dayak -> Indonesian
-        for (auto &t : tokens) {
-            String tLower = t;
-            tLower.toLowerCase();
-            bool found = false;
-            int iterations = 0;
-            
-            for (JsonPair pair : dictObj) {
-                String val = pair.value().as<String>();
-                String valLower = val;
-                valLower.toLowerCase();
-                
-                if (tLower == valLower) {
-                    result += String(pair.key().c_str()) + " ";
-                    found = true;
-                    break;
-                }
-                
-                iterations++;
-                if (iterations >= MAX_DICT_ITERATIONS) {
-                    break;
-                }
-            }
-            
-            if (!found) {
-                result += t + " ";
-            }
-        }
+    bool forward = (lang == "id"); // Indonesian -> Dayak, otherwise Dayak -> Indonesian
+
+    for (auto &t : tokens) {
+        String tLower = t;
+        tLower.toLowerCase();
+        const char* found = forward
+            ? dictSearch(dict.forwardTable, dict.forwardCount, tLower.c_str())
+            : dictSearch(dict.reverseTable, dict.reverseCount, tLower.c_str());
+        result += found ? String(found) : t;
+        result += " ";
     }
     
     result.trim();
     return result;
 }
 
-String doTranslation(const String& question, const String& questionLang, const String& outputLang, const JsonObject& dictObj) {
+String doTranslation(const String& question, const String& questionLang, const String& outputLang) {
     if (questionLang == outputLang) {
         return question;
     }
-    return translateSentencePartial(question, questionLang, dictObj);
+    return translateSentencePartial(question, questionLang);
 }
 
 // SETUP & ROUTING
@@ -202,14 +198,13 @@ void setup() {
         Serial.println("mDNS responder started: http://dayak.local");
     }
 
-    // Parse the dictionary JSON
+    // Map the binary dictionary (no parsing, nothing copied to RAM)
     Serial.println("Loading dictionary...");
-    DeserializationError error = deserializeJson(dict, dictionary_json);
-    if (error) {
-        Serial.println("Error parsing JSON: " + String(error.c_str()));
+    if (!loadDictionary()) {
+        Serial.println("Error: dictionary_bin is not a valid binary dictionary");
         return;
     }
-    Serial.println("Dictionary loaded successfully");
+    Serial.println("Dictionary loaded successfully: " + String(dict.forwardCount) + " entries");
 
     // Setup server routes
     server.on("/", HTTP_GET, handleRoot);
@@ -289,7 +284,7 @@ void handleTranslate() {
     }
     String text = server.arg("text");
     String lang = server.arg("lang");
-    String translated = translateSentencePartial(text, lang, dict.as<JsonObject>());
+    String translated = translateSentencePartial(text, lang);
     server.send(200, "text/plain", translated);
 }
 
@@ -311,7 +306,7 @@ void handleMC() {
     }
 
     String fromLang = (lang == "id_to_dyk") ? "id" : "dyk";
-    String translated = translateSentencePartial(extractedText, fromLang, dict.as<JsonObject>());
+    String translated = translateSentencePartial(extractedText, fromLang);
     translated.trim();
     translated.toLowerCase();
 
@@ -376,7 +371,7 @@ void handleFill() {
         return;
     }
 
-    String answer = doTranslation(extractedText, qLang, oLang, dict.as<JsonObject>());
+    String answer = doTranslation(extractedText, qLang, oLang);
     answer.trim();
 
     if (answer.length() == 0) {
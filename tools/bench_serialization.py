@@ -0,0 +1,143 @@
+"""Measure per-request protocol overhead of /translate versus /translate/fast.
+
+Translation itself is excluded: every variant decodes and validates the same
+request body and encodes a response around the same pre-computed translation,
+so the numbers isolate validation and serialization cost.
+
+Usage:
+    python tools/bench_serialization.py --iterations 2000 --lengths 100 2000 10000
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).resolve().parent.parent / "webroot" / "server"
+sys.path.insert(0, str(SERVER_DIR))
+
+import main  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from serialization import FastJSONResponse, MsgPackResponse, decode_body, msgpack  # noqa: E402
+
+SAMPLE_WORDS = "saya makan nasi dan minum air bersama teman di rumah".split()
+
+
+def make_text(length: int) -> str:
+    words = []
+    size = 0
+    while size < length:
+        word = SAMPLE_WORDS[len(words) % len(SAMPLE_WORDS)]
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def make_request(text: str) -> dict:
+    return {
+        "client": "benchmark",
+        "requestId": "bench-1",
+        "timestamp": "D:01-01-2025#T:00:00:00",
+        "payload": {
+            "sourceLang": "id",
+            "targetLang": "dyk",
+            "text": text,
+            "options": {"preserveFormatting": True, "caseSensitive": False}
+        }
+    }
+
+
+def baseline(body: bytes, translated: str) -> bytes:
+    """What /translate does: Pydantic request model, response model, jsonable_encoder, json.dumps."""
+    request = main.ClientRequest(**json.loads(body))
+    response = main.ServerResponse(
+        requestId=request.requestId,
+        timestamp=datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        status="success",
+        payload=main.TranslationResult(
+            sourceLang=request.payload.sourceLang,
+            targetLang=request.payload.targetLang,
+            sourceText=request.payload.text,
+            translatedText=translated,
+            confidence=0.9
+        ),
+        metadata={"processingTime": "0ms", "inputLength": len(request.payload.text)}
+    )
+    return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+
+def fast(body: bytes, translated: str, content_type: str, response_class, include_source: bool) -> bytes:
+    """What /translate/fast does: hand validation, plain dict, orjson or msgpack."""
+    data = decode_body(body, content_type)
+    source_lang, target_lang, text, raw_options = main.parse_payload_fields(data.get("payload"))
+    options = main.options_from_raw(raw_options)
+    payload = {
+        "sourceLang": source_lang,
+        "targetLang": target_lang,
+        "translatedText": translated,
+        "confidence": 0.9
+    }
+    if include_source and options.includeSourceText:
+        payload["sourceText"] = text
+    content = {
+        "server": "translatorService",
+        "requestId": str(data.get("requestId", "")),
+        "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        "status": "success",
+        "payload": payload,
+        "metadata": {"processingTime": "0ms", "inputLength": len(text)},
+        "error": None
+    }
+    return response_class(content=content).body
+
+
+def measure(func, iterations: int) -> tuple:
+    output = func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1e6, len(output)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 2000, 10000])
+    args = parser.parse_args()
+
+    report = []
+    for length in args.lengths:
+        text = make_text(length)
+        translated = text.upper()
+        request = make_request(text)
+        json_body = json.dumps(request).encode("utf-8")
+        variants = {
+            "baseline-pydantic-json": lambda: baseline(json_body, translated),
+            "fast-orjson": lambda: fast(json_body, translated, "application/json", FastJSONResponse, True),
+            "fast-orjson-no-source": lambda: fast(json_body, translated, "application/json", FastJSONResponse, False),
+        }
+        if msgpack is not None:
+            msgpack_body = msgpack.packb(request, use_bin_type=True)
+            variants["fast-msgpack"] = lambda: fast(
+                msgpack_body, translated, "application/msgpack", MsgPackResponse, True
+            )
+            variants["fast-msgpack-no-source"] = lambda: fast(
+                msgpack_body, translated, "application/msgpack", MsgPackResponse, False
+            )
+
+        results = {}
+        for name, func in variants.items():
+            micros, size = measure(func, args.iterations)
+            results[name] = {"usPerRequest": round(micros, 2), "responseBytes": size}
+        base = results["baseline-pydantic-json"]["usPerRequest"]
+        for result in results.values():
+            result["speedup"] = round(base / result["usPerRequest"], 2) if result["usPerRequest"] else None
+        report.append({"textLength": length, "iterations": args.iterations, "variants": results})
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
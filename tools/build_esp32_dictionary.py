@@ -0,0 +1,290 @@
+"""Compile dictionary.json into the binary layout used by the ESP32 firmware.
+
+The firmware (externals/DayakV8.ino) used to embed the dictionary as a JSON
+string and parse it into a fixed-size ArduinoJson document on boot. This tool
+instead emits a read-only image that is searched in place from flash: two
+sorted offset tables (Indonesian -> Dayak Kenyah and Dayak Kenyah ->
+Indonesian) over a pool of de-duplicated strings, so a lookup is a binary
+search with no parsing and no RAM proportional to the dictionary size.
+
+Layout (all integers little-endian):
+
+    header   magic "DKD1", u16 format version, u16 flags (0),
+             u32 forward count, u32 reverse count,
+             u32 forward table offset, u32 reverse table offset,
+             u32 string pool offset, u32 string pool length,
+             8-byte dictionary content hash
+    tables   rows of (u32 key offset, u32 value offset) into the pool,
+             sorted by the key's UTF-8 bytes (strcmp order)
+    strings  u16 byte length, UTF-8 bytes, NUL
+
+Lookups follow the server engines' exact stage: the query is lower-cased and
+matched against the dictionary words as stored. The reverse table is keyed by
+the lower-cased Dayak Kenyah word and, where several Indonesian words share a
+translation, keeps the first in dictionary order (the web server's choice).
+
+Usage:
+    python tools/build_esp32_dictionary.py -o externals/dictionary_bin.h
+    python tools/build_esp32_dictionary.py -o dictionary.bin --verify
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DICTIONARY = ROOT / "webroot" / "dynamic" / "dictionary.json"
+
+MAGIC = b"DKD1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIII8s")
+ROW = struct.Struct("<II")
+LENGTH = struct.Struct("<H")
+
+# Server settings that make importing it touch files or start threads; none of them changes the lexicon
+SERVER_STATE_VARIABLES = (
+    "DICTIONARY_JOURNAL_PATH", "TRANSLATION_MEMORY_PATH", "CACHE_SNAPSHOT_PATH", "REQUEST_CAPTURE_PATH",
+    "TRANSLATION_WORKERS", "MEMORY_TRACE_FRAMES"
+)
+
+
+class DictionaryFormatError(ValueError):
+    """Raised when a binary dictionary image is truncated or not in this format."""
+
+
+def content_hash(entries: Dict[str, str]) -> bytes:
+    return hashlib.sha256(json.dumps(entries, sort_keys=True, ensure_ascii=False).encode("utf-8")).digest()[:8]
+
+
+def reverse_pairs(entries: Dict[str, str]) -> Dict[str, str]:
+    """Lower-cased Dayak Kenyah word -> first Indonesian word translating to it."""
+    reverse: Dict[str, str] = {}
+    for indonesian, dayak in entries.items():
+        reverse.setdefault(dayak.lower(), indonesian)
+    return reverse
+
+
+def build_image(entries: Dict[str, str]) -> bytes:
+    pool = bytearray()
+    offsets: Dict[str, int] = {}
+
+    def intern(text: str) -> int:
+        offset = offsets.get(text)
+        if offset is None:
+            encoded = text.encode("utf-8")
+            if len(encoded) > 0xFFFF:
+                raise ValueError(f"Dictionary string too long for the binary layout: {text[:40]!r}...")
+            offset = len(pool)
+            pool.extend(LENGTH.pack(len(encoded)) + encoded + b"\0")
+            offsets[text] = offset
+        return offset
+
+    def table(pairs: Dict[str, str]) -> bytes:
+        rows = sorted(pairs.items(), key=lambda pair: pair[0].encode("utf-8"))
+        return b"".join(ROW.pack(intern(key), intern(value)) for key, value in rows)
+
+    reverse = reverse_pairs(entries)
+    forward_table = table(entries)
+    reverse_table = table(reverse)
+    forward_offset = HEADER.size
+    reverse_offset = forward_offset + len(forward_table)
+    strings_offset = reverse_offset + len(reverse_table)
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, len(entries), len(reverse),
+        forward_offset, reverse_offset, strings_offset, len(pool), content_hash(entries)
+    )
+    return header + forward_table + reverse_table + bytes(pool)
+
+
+def render_header(image: bytes, symbol: str = "dictionary_bin") -> str:
+    """C header declaring the image as a flash-resident byte array."""
+    lines = [
+        "// Generated by tools/build_esp32_dictionary.py - do not edit.",
+        "#pragma once",
+        "#include <Arduino.h>",
+        "",
+        f"const size_t {symbol}_len = {len(image)};",
+        f"const uint8_t {symbol}[] PROGMEM = {{",
+    ]
+    for start in range(0, len(image), 16):
+        lines.append("    " + ", ".join(f"0x{byte:02x}" for byte in image[start:start + 16]) + ",")
+    lines.append("};")
+    return "\n".join(lines) + "\n"
+
+
+class BinaryDictionary:
+    """Reference reader; performs the same binary search as the firmware."""
+
+    def __init__(self, image: bytes):
+        if len(image) < HEADER.size:
+            raise DictionaryFormatError("Image is shorter than its header")
+        (magic, version, _flags, self.forward_count, self.reverse_count, self.forward_offset,
+         self.reverse_offset, self.strings_offset, strings_length, self.content_hash) = HEADER.unpack_from(image)
+        if magic != MAGIC:
+            raise DictionaryFormatError(f"Bad magic {magic!r}")
+        if version != FORMAT_VERSION:
+            raise DictionaryFormatError(f"Unsupported format version {version}")
+        if (self.forward_offset + self.forward_count * ROW.size > self.reverse_offset
+                or self.reverse_offset + self.reverse_count * ROW.size > self.strings_offset
+                or self.strings_offset + strings_length > len(image)):
+            raise DictionaryFormatError("Table or string pool extends past the end of the image")
+        self.image = image
+
+    @classmethod
+    def from_file(cls, path: str) -> "BinaryDictionary":
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def __len__(self) -> int:
+        return self.forward_count
+
+    def _string(self, offset: int) -> bytes:
+        start = self.strings_offset + offset
+        (length,) = LENGTH.unpack_from(self.image, start)
+        return self.image[start + LENGTH.size:start + LENGTH.size + length]
+
+    def _search(self, table_offset: int, count: int, key: bytes) -> Optional[str]:
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, value_offset = ROW.unpack_from(self.image, table_offset + middle * ROW.size)
+            candidate = self._string(key_offset)
+            if candidate == key:
+                return self._string(value_offset).decode("utf-8")
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def lookup(self, word: str) -> Optional[str]:
+        """Indonesian word or phrase -> Dayak Kenyah, or None."""
+        return self._search(self.forward_offset, self.forward_count, word.lower().encode("utf-8"))
+
+    def reverse_lookup(self, word: str) -> Optional[str]:
+        """Dayak Kenyah word or phrase -> Indonesian, or None."""
+        return self._search(self.reverse_offset, self.reverse_count, word.lower().encode("utf-8"))
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for index in range(self.forward_count):
+            key_offset, value_offset = ROW.unpack_from(self.image, self.forward_offset + index * ROW.size)
+            yield self._string(key_offset).decode("utf-8"), self._string(value_offset).decode("utf-8")
+
+
+def probe_words(entries: Dict[str, str]) -> List[str]:
+    """Every dictionary word on both sides, in several casings, plus near misses."""
+    words = set()
+    for indonesian, dayak in entries.items():
+        for word in (indonesian, dayak):
+            words.update((word, word.upper(), word.title(), word + "x", word[:-1]))
+    words.update(("", " ", "zzqx"))
+    return sorted(words)
+
+
+def verify(image: bytes, entries: Dict[str, str], dictionary_path: Path) -> Dict[str, object]:
+    """Check the image against the dictionary and both server engines' exact lookups."""
+    reader = BinaryDictionary(image)
+    failures: List[str] = []
+    if dict(reader.items()) != entries:
+        failures.append("image entries differ from the source dictionary")
+    if reader.content_hash != content_hash(entries):
+        failures.append("content hash mismatch")
+
+    probes = probe_words(entries)
+    engines = {}
+
+    sys.path.insert(0, str(ROOT / "vercel-deployment" / "api"))
+    import translate as serverless  # noqa: E402
+    if serverless.DICTIONARY == entries:
+        engines["serverless"] = "checked"
+        for word in probes:
+            expected = serverless.DICTIONARY.get(word.lower())
+            if reader.lookup(word) != expected:
+                failures.append(f"serverless forward {word!r}: {expected!r} != {reader.lookup(word)!r}")
+            candidates = serverless.DICTIONARY_REVERSE.get(word.lower(), set())
+            found = reader.reverse_lookup(word)
+            # The serverless engine picks an arbitrary candidate when several share a translation
+            if (found in candidates) if candidates else found is None:
+                continue
+            failures.append(f"serverless reverse {word!r}: {found!r} not in {sorted(candidates)!r}")
+    else:
+        engines["serverless"] = "skipped (engine bundles a different dictionary)"
+
+    try:
+        sys.path.insert(0, str(ROOT / "webroot" / "server"))
+        # Only the lexicon is compared; keep the import away from a deployment's journal, memory and capture files
+        for name in SERVER_STATE_VARIABLES:
+            os.environ.pop(name, None)
+        import main as server  # noqa: E402
+    except ImportError as e:
+        engines["server"] = f"skipped ({e})"
+    else:
+        lexicon = server.DEFAULT_LEXICON
+        if lexicon.entries == entries:
+            engines["server"] = "checked"
+            reverse = server.reverse_entries(lexicon)
+            for word in probes:
+                expected = lexicon.entries.get(word.lower())
+                if reader.lookup(word) != expected:
+                    failures.append(f"server forward {word!r}: {expected!r} != {reader.lookup(word)!r}")
+                expected = reverse.get(word.lower())
+                if reader.reverse_lookup(word) != expected:
+                    failures.append(f"server reverse {word!r}: {expected!r} != {reader.reverse_lookup(word)!r}")
+        else:
+            engines["server"] = "skipped (server loads a different dictionary)"
+
+    return {
+        "dictionary": str(dictionary_path),
+        "entries": len(entries),
+        "probes": len(probes),
+        "engines": engines,
+        "failures": failures[:20],
+        "failureCount": len(failures),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the ESP32 binary dictionary image.")
+    parser.add_argument("--dictionary", default=str(DEFAULT_DICTIONARY), help="source dictionary.json")
+    parser.add_argument("-o", "--output", required=True, help="output file (.h for a C header, otherwise raw binary)")
+    parser.add_argument("--format", choices=("bin", "header"), help="output format (default: from extension)")
+    parser.add_argument("--symbol", default="dictionary_bin", help="C array name for header output")
+    parser.add_argument("--verify", action="store_true",
+                        help="read the image back and compare every lookup with the server engines")
+    args = parser.parse_args()
+
+    dictionary_path = Path(args.dictionary)
+    with open(dictionary_path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    image = build_image(entries)
+
+    fmt = args.format or ("header" if args.output.endswith(".h") else "bin")
+    if fmt == "header":
+        with open(args.output, "w", encoding="utf-8", newline="\n") as f:
+            f.write(render_header(image, args.symbol))
+    else:
+        with open(args.output, "wb") as f:
+            f.write(image)
+
+    summary = {
+        "output": args.output,
+        "format": fmt,
+        "entries": len(entries),
+        "reverseEntries": BinaryDictionary(image).reverse_count,
+        "imageBytes": len(image),
+        "jsonBytes": dictionary_path.stat().st_size,
+    }
+    status = 0
+    if args.verify:
+        summary["verification"] = verify(image, entries, dictionary_path)
+        status = 1 if summary["verification"]["failureCount"] else 0
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
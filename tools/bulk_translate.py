@@ -0,0 +1,260 @@
+"""Translate large text, JSONL or CSV files offline with the serverless engine.
+
+Records are streamed from the input, translated in batches across a process
+pool and written back in their original order. At most ``--max-pending``
+batches are in flight at once, so memory stays bounded however large the
+input is. Line endings, untouched JSON fields and untouched CSV columns are
+preserved; JSONL lines that are not JSON objects are reported by line number
+and skipped. A throughput and match-type summary (the same counters as the
+serverless handler's response metadata) is written to stderr.
+
+Usage:
+    python tools/bulk_translate.py corpus.txt -o corpus.dyk.txt --source id --target dyk
+    python tools/bulk_translate.py data.jsonl --field text --output-field translatedText
+    python tools/bulk_translate.py data.csv --column text --workers 8
+"""
+import argparse
+import csv
+import io
+import json
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+ENGINE_DIR = Path(__file__).resolve().parent.parent / "vercel-deployment" / "api"
+sys.path.insert(0, str(ENGINE_DIR))
+
+import translate as engine  # noqa: E402
+
+STAT_KEYS = (
+    "exactMatches",
+    "synonymRBMTMatches",
+    "morphologicalMatches",
+    "lightweightMatches",
+    "multiWordMatches",
+    "totalWords",
+)
+
+# (output record, confidence, statistics, characters translated); the output is None for a record that is skipped
+RecordResult = Tuple[Any, float, Dict[str, int], int]
+
+
+def translate_value(text: str, config: Dict[str, Any]) -> Tuple[str, float, Dict[str, int]]:
+    if not text or config["source"] == config["target"]:
+        return text, 0.0, dict.fromkeys(STAT_KEYS, 0)
+    return engine.translate_text(text, config["source"], config["target"], case_sensitive=config["case_sensitive"])
+
+
+def merge_stats(total: Dict[str, int], stats: Dict[str, int]) -> None:
+    for key in STAT_KEYS:
+        total[key] += stats[key]
+
+
+def translate_record(record: Any, config: Dict[str, Any]) -> RecordResult:
+    """Translate one record of the configured format, leaving everything else untouched."""
+    fmt = config["format"]
+    if fmt == "txt":
+        translated, confidence, stats = translate_value(record, config)
+        return translated, confidence, stats, len(record)
+
+    if fmt == "jsonl":
+        body = record.rstrip("\r\n")
+        if not body.strip():
+            return record, 0.0, dict.fromkeys(STAT_KEYS, 0), 0
+        line_ending = record[len(body):]
+        try:
+            obj = json.loads(body)
+        except ValueError:
+            obj = None
+        if not isinstance(obj, dict):
+            return None, 0.0, dict.fromkeys(STAT_KEYS, 0), 0
+        value = obj.get(config["field"])
+        if not isinstance(value, str):
+            return record, 0.0, dict.fromkeys(STAT_KEYS, 0), 0
+        translated, confidence, stats = translate_value(value, config)
+        obj[config["output_field"] or config["field"]] = translated
+        return json.dumps(obj, ensure_ascii=False) + line_ending, confidence, stats, len(value)
+
+    # csv: record is a list of cells
+    row = list(record)
+    index = config["column_index"]
+    if index is None or index >= len(row):
+        return row, 0.0, dict.fromkeys(STAT_KEYS, 0), 0
+    translated, confidence, stats = translate_value(row[index], config)
+    if config["output_field"]:
+        row.append(translated)
+    else:
+        row[index] = translated
+    return row, confidence, stats, len(record[index])
+
+
+def translate_batch(records: List[Any], config: Dict[str, Any]) -> List[RecordResult]:
+    return [translate_record(record, config) for record in records]
+
+
+def batched(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ordered_results(batches: Iterator[List[Any]], config: Dict[str, Any], workers: int,
+                    max_pending: int) -> Iterator[List[RecordResult]]:
+    """Yield translated batches in input order, keeping at most max_pending in flight."""
+    if workers <= 1:
+        for batch in batches:
+            yield translate_batch(batch, config)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(translate_batch, batch, config))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def detect_format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    return "txt"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Translate text, JSONL or CSV files without going through HTTP.")
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=("txt", "jsonl", "csv"), help="input format (default: from extension)")
+    parser.add_argument("--source", choices=("id", "dyk"), default="id", help="source language")
+    parser.add_argument("--target", choices=("id", "dyk"), default="dyk", help="target language")
+    parser.add_argument("--case-sensitive", action="store_true", help="do not adapt case to the source token")
+    parser.add_argument("--field", default="text", help="JSONL field to translate")
+    parser.add_argument("--column", default="text", help="CSV column (header name or 0-based index) to translate")
+    parser.add_argument("--no-header", action="store_true", help="CSV input has no header row")
+    parser.add_argument("--output-field", help="write the translation to this JSONL field / new CSV column "
+                                               "instead of replacing the source")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (1 = in-process)")
+    parser.add_argument("--batch-size", type=int, default=256, help="records per task sent to a worker")
+    parser.add_argument("--max-pending", type=int, default=0,
+                        help="batches in flight at once (default: 4 per worker)")
+    parser.add_argument("--stats", help="also write the summary JSON to this file")
+    args = parser.parse_args()
+
+    fmt = detect_format(args.input, args.format)
+    if fmt == "csv" and args.no_header and not args.column.isdigit():
+        parser.error("--no-header needs --column as a 0-based column index")
+    config = {
+        "format": fmt,
+        "source": args.source,
+        "target": args.target,
+        "case_sensitive": args.case_sensitive,
+        "field": args.field,
+        "output_field": args.output_field,
+        "column_index": None,
+    }
+
+    # newline='' everywhere so '\r\n' and '\n' records round-trip unchanged
+    if args.input == "-":
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        source = open(args.input, "r", encoding="utf-8", newline="")
+    if args.output == "-":
+        sink = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="")
+    else:
+        sink = open(args.output, "w", encoding="utf-8", newline="")
+
+    writer = None
+    if fmt == "csv":
+        # Write rows with the line ending the input uses
+        first_line = source.readline()
+        reader = csv.reader(itertools.chain([first_line], source))
+        writer = csv.writer(sink, lineterminator="\r\n" if first_line.endswith("\r\n") else "\n")
+        records: Iterable[Any] = reader
+        if args.no_header:
+            config["column_index"] = int(args.column)
+        else:
+            header = next(reader, None)
+            if header is not None:
+                if args.column in header:
+                    config["column_index"] = header.index(args.column)
+                elif args.column.isdigit():
+                    config["column_index"] = int(args.column)
+                else:
+                    parser.error(f"column {args.column!r} not found in CSV header")
+                writer.writerow(header + [args.output_field] if args.output_field else header)
+    else:
+        # Iterating a newline='' stream keeps each record's original line ending
+        records = source
+
+    totals = dict.fromkeys(STAT_KEYS, 0)
+    weighted_confidence = 0.0
+    record_count = 0
+    skipped = 0
+    char_count = 0
+    max_pending = args.max_pending or max(1, args.workers) * 4
+    started = time.perf_counter()
+
+    try:
+        for results in ordered_results(batched(records, args.batch_size), config, args.workers, max_pending):
+            for output, confidence, stats, chars in results:
+                if output is None:
+                    skipped += 1
+                    print(f"Skipping line {record_count + skipped}: not a JSON object", file=sys.stderr)
+                    continue
+                if writer is not None:
+                    writer.writerow(output)
+                else:
+                    sink.write(output)
+                merge_stats(totals, stats)
+                weighted_confidence += confidence * stats["totalWords"]
+                record_count += 1
+                char_count += chars
+    finally:
+        sink.flush()
+        if args.output != "-":
+            sink.close()
+        if args.input != "-":
+            source.close()
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "format": fmt,
+        "sourceLang": args.source,
+        "targetLang": args.target,
+        "workers": args.workers,
+        "records": record_count,
+        "skippedRecords": skipped,
+        "characters": char_count,
+        "elapsedSeconds": round(elapsed, 3),
+        "recordsPerSecond": round(record_count / elapsed, 1) if elapsed else None,
+        "charactersPerSecond": round(char_count / elapsed, 1) if elapsed else None,
+        "confidence": weighted_confidence / totals["totalWords"] if totals["totalWords"] else 0.0,
+        **totals,
+        "dictionarySize": len(engine.DICTIONARY),
+    }
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as stats_file:
+            json.dump(summary, stats_file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
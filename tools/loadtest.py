@@ -0,0 +1,351 @@
+"""Stepped-concurrency load test for the FastAPI and serverless translation servers.
+
+The serverless engine can be started either as its single-request handler
+class (``serverless``, as Vercel runs it) or as its ASGI app under uvicorn
+(``serverless-asgi``, honouring --server-workers).
+
+Starts the chosen server locally (or targets --url), replays a seeded mix of
+translation directions, input lengths and out-of-vocabulary rates at each
+concurrency step, and prints achieved RPS, latency percentiles and error
+rates as JSON. The client is a small asyncio HTTP/1.1 implementation so the
+tool needs nothing beyond the standard library.
+
+Usage:
+    python tools/loadtest.py --server fastapi --concurrency 1 2 4 8 16 --duration 10
+    python tools/loadtest.py --server serverless --lengths 20:3 200:1 --oov-rate 0.2
+    python tools/loadtest.py --server serverless-asgi --server-workers 4
+    python tools/loadtest.py --url http://127.0.0.1:8000/translate --concurrency 4 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+FASTAPI_DIR = ROOT_DIR / "webroot" / "server"
+SERVERLESS_DIR = ROOT_DIR / "vercel-deployment" / "api"
+DICTIONARY_PATH = ROOT_DIR / "webroot" / "dynamic" / "dictionary.json"
+
+# The serverless handler is served exactly as Vercel's runtime would: one request at a time
+SERVERLESS_BOOTSTRAP = (
+    "import sys\n"
+    "from http.server import HTTPServer\n"
+    "from translate import handler\n"
+    "HTTPServer(('127.0.0.1', int(sys.argv[1])), handler).serve_forever()\n"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind: str, port: int, workers: int, root: Path = ROOT_DIR,
+                 env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """Start a server from the checkout at root (this one by default)."""
+    if kind in ("fastapi", "serverless-asgi"):
+        command = [sys.executable, "-m", "uvicorn", "main:app" if kind == "fastapi" else "translate:app",
+                   "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+        cwd = FASTAPI_DIR if kind == "fastapi" else SERVERLESS_DIR
+    else:
+        command = [sys.executable, "-c", SERVERLESS_BOOTSTRAP, str(port)]
+        cwd = SERVERLESS_DIR
+    return subprocess.Popen(command, cwd=root / cwd.relative_to(ROOT_DIR), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(url: str, process: Optional[subprocess.Popen], timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode} before becoming ready")
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except urllib.error.HTTPError:
+            return  # Any HTTP answer means the server is accepting requests
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} was not ready after {timeout:.0f}s")
+
+
+def parse_weighted(values: List[str], cast) -> List[Tuple[object, float]]:
+    """Parse 'value:weight' pairs (weight defaults to 1)."""
+    parsed = []
+    for value in values:
+        name, _, weight = value.partition(":")
+        parsed.append((cast(name), float(weight) if weight else 1.0))
+    return parsed
+
+
+def build_workload(args: argparse.Namespace) -> List[bytes]:
+    """Pre-generate a pool of request bodies so generation cost stays out of the measurement."""
+    with open(DICTIONARY_PATH, "r", encoding="utf-8") as f:
+        dictionary = json.load(f)
+    vocab = {
+        "id": [word for word in dictionary.keys() if " " not in word],
+        "dyk": [word for word in dictionary.values() if " " not in word],
+    }
+    rng = random.Random(args.seed)
+    directions = parse_weighted(args.directions, str)
+    lengths = parse_weighted(args.lengths, int)
+
+    bodies = []
+    for index in range(args.pool_size):
+        direction = rng.choices([d for d, _ in directions], [w for _, w in directions])[0]
+        source_lang, target_lang = direction.split("-")
+        target_length = rng.choices([l for l, _ in lengths], [w for _, w in lengths])[0]
+        words = []
+        size = 0
+        while size < target_length:
+            if rng.random() < args.oov_rate:
+                word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+            else:
+                word = rng.choice(vocab[source_lang])
+            words.append(word)
+            size += len(word) + 1
+        text = " ".join(words)[:max(1, target_length)].strip() or "apa"
+        bodies.append(json.dumps({
+            "client": "loadtest",
+            "requestId": f"load-{index}",
+            "timestamp": "D:01-01-2025#T:00:00:00",
+            "payload": {
+                "sourceLang": source_lang,
+                "targetLang": target_lang,
+                "text": text,
+                "options": {"preserveFormatting": True, "caseSensitive": False}
+            }
+        }).encode("utf-8"))
+    return bodies
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client; reconnects when the server closes (HTTP/1.0)."""
+
+    def __init__(self, host: str, port: int, path: str):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+    async def post(self, body: bytes) -> int:
+        return (await self.request(body))[0]
+
+    async def request(self, body: bytes) -> Tuple[int, bytes]:
+        """POST body; returns the status and the response body."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n".encode("latin-1") + body
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed before a response was received")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = status_line.startswith(b"HTTP/1.1") and headers.get("connection", "").lower() != "close"
+        if "content-length" in headers:
+            content = await self.reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                chunks.append((await self.reader.readexactly(size + 2))[:size])
+                if size == 0:
+                    break
+            content = b"".join(chunks)
+        else:
+            content = await self.reader.read()
+            keep_alive = False
+        if not keep_alive:
+            await self.close()
+        return status, content
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+async def run_step(url: str, bodies: List[bytes], concurrency: int, duration: float,
+                   timeout: float, seed: int) -> Dict[str, object]:
+    parts = urlsplit(url)
+    host = parts.hostname or "127.0.0.1"
+    port = parts.port or 80
+    path = parts.path or "/"
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed * 1000 + worker_id)
+        connection = HTTPConnection(host, port, path)
+        try:
+            while time.perf_counter() < deadline:
+                body = bodies[rng.randrange(len(bodies))]
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(connection.post(body), timeout)
+                except (asyncio.TimeoutError, ConnectionError, OSError, ValueError, IndexError) as exc:
+                    errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+                    await connection.close()
+                    continue
+                if 200 <= status < 300:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors[f"HTTP {status}"] = errors.get(f"HTTP {status}", 0) + 1
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    error_count = sum(errors.values())
+    total = len(latencies) + error_count
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "successes": len(latencies),
+        "errors": error_count,
+        "errorRate": round(error_count / total, 4) if total else 0.0,
+        "errorBreakdown": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latencyMs": {
+            "p50": round(percentile(latencies, 0.50), 2) if latencies else None,
+            "p95": round(percentile(latencies, 0.95), 2) if latencies else None,
+            "p99": round(percentile(latencies, 0.99), 2) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "max": round(latencies[-1], 2) if latencies else None,
+        },
+    }
+
+
+def find_knee(steps: List[Dict[str, object]], min_gain: float) -> Optional[int]:
+    """Last concurrency before throughput stops growing by at least min_gain per step."""
+    for previous, current in zip(steps, steps[1:]):
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 + min_gain):
+            return previous["concurrency"]
+    return None
+
+
+async def run(args: argparse.Namespace, url: str) -> List[Dict[str, object]]:
+    bodies = build_workload(args)
+    steps = []
+    for step_index, concurrency in enumerate(args.concurrency):
+        if args.warmup:
+            await run_step(url, bodies, concurrency, args.warmup, args.timeout, args.seed + step_index)
+        steps.append(await run_step(url, bodies, concurrency, args.duration, args.timeout, args.seed + step_index))
+        print(f"concurrency={concurrency} rps={steps[-1]['rps']} p99={steps[-1]['latencyMs']['p99']}ms "
+              f"errors={steps[-1]['errors']}", file=sys.stderr)
+    return steps
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Stepped-concurrency load test for the translation servers.")
+    parser.add_argument("--server", choices=("fastapi", "serverless", "serverless-asgi"), default="fastapi",
+                        help="server to start locally (ignored with --url)")
+    parser.add_argument("--url", help="translate endpoint of an already running server")
+    parser.add_argument("--port", type=int, help="port for the locally started server (default: any free port)")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes for --server fastapi / serverless-asgi")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per concurrency step")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each step")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--directions", nargs="+", default=["id-dyk:1", "dyk-id:1"],
+                        help="direction mix as source-target:weight")
+    parser.add_argument("--lengths", nargs="+", default=["30:4", "300:2", "3000:1"],
+                        help="input length mix in characters as length:weight")
+    parser.add_argument("--oov-rate", type=float, default=0.1, help="fraction of words not in the dictionary")
+    parser.add_argument("--pool-size", type=int, default=500, help="distinct request bodies to replay")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--knee-gain", type=float, default=0.10,
+                        help="minimum RPS gain per step still counted as scaling")
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    process = None
+    if args.url:
+        url = args.url
+        ready_url = url
+    else:
+        port = args.port or free_port()
+        process = start_server(args.server, port, args.server_workers)
+        base = f"http://127.0.0.1:{port}"
+        url = f"{base}/translate" if args.server == "fastapi" else f"{base}/api/translate"
+        ready_url = f"{base}/"
+
+    try:
+        wait_until_ready(ready_url, process, args.ready_timeout)
+        steps = asyncio.run(run(args, url))
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = {
+        "server": "external" if args.url else args.server,
+        "url": url,
+        "serverWorkers": None if args.url or args.server == "serverless" else args.server_workers,
+        "clientCpuCount": os.cpu_count(),
+        "workload": {
+            "directions": args.directions,
+            "lengths": args.lengths,
+            "oovRate": args.oov_rate,
+            "poolSize": args.pool_size,
+            "seed": args.seed,
+        },
+        "durationPerStep": args.duration,
+        "steps": steps,
+        "knee": find_knee(steps, args.knee_gain),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
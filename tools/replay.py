@@ -0,0 +1,488 @@
+"""Replay captured /translate traffic against a server or engine build and compare runs.
+
+Captures are written by the FastAPI server when REQUEST_CAPTURE_PATH is set
+(see webroot/server/request_capture.py). ``run`` sends every captured request,
+in arrival order, to one target and writes a results file. ``diff`` compares
+two results files request by request: translations, statuses and latency
+distributions. Either side of a diff may also be the capture itself, whose
+translations (full text mode only) and server processing times then act as
+the baseline.
+
+Targets, each built from the checkout at --root (this one by default):
+    --server fastapi|serverless|serverless-asgi   started locally, as tools/loadtest.py does
+    --url URL                                     an already running server's translate endpoint
+    --engine fastapi|serverless                   the build's ASGI app driven in this process, with no
+                                                  sockets, so latencies are the engine's own
+
+Timing:
+    --timing original   each request starts at its captured arrival offset, divided by --speed and
+                        with idle gaps capped at --max-gap seconds, so bursts and overlap recur
+    --timing max        --concurrency requests in flight at all times, as fast as the target answers
+
+The serverless reverse lookup iterates a set, so its output depends on the
+hash seed; locally started servers and in-process engines run with
+PYTHONHASHSEED set to --hash-seed to keep replays comparable.
+
+Usage:
+    python tools/replay.py run capture.jsonl --server fastapi -o before.jsonl
+    python tools/replay.py run capture.jsonl --server fastapi --root ../translator-next -o after.jsonl
+    python tools/replay.py run capture.jsonl --engine serverless --timing max --concurrency 4 -o engine.jsonl
+    python tools/replay.py diff before.jsonl after.jsonl
+    python tools/replay.py diff capture.jsonl after.jsonl --max-p95-regression 0.1
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from loadtest import ROOT_DIR, HTTPConnection, free_port, percentile, start_server, wait_until_ready
+
+# (HTTP status, response body)
+Reply = Tuple[int, bytes]
+Sender = Callable[[bytes], Awaitable[Reply]]
+
+APP_MODULES = {
+    "fastapi": (Path("webroot") / "server", "main"),
+    "serverless": (Path("vercel-deployment") / "api", "translate"),
+}
+
+
+def load_capture(path: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Header lines and request records of a capture, records in arrival order"""
+    headers = []
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            (headers if entry.get("type") == "capture" else records).append(entry)
+    records.sort(key=lambda record: record["time"])
+    return headers, records
+
+
+def request_body(index: int, record: Dict[str, Any]) -> bytes:
+    return json.dumps({
+        "client": "replay",
+        "requestId": f"replay-{index}",
+        "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        "payload": {
+            "sourceLang": record["sourceLang"],
+            "targetLang": record["targetLang"],
+            "text": record["text"],
+            "options": record.get("options") or {}
+        }
+    }, ensure_ascii=False).encode("utf-8")
+
+
+def arrival_offsets(records: List[Dict[str, Any]], speed: float, max_gap: float) -> List[float]:
+    """Start time of each request relative to the first, in seconds"""
+    offsets = []
+    offset = 0.0
+    previous = records[0]["time"] if records else 0.0
+    for record in records:
+        offset += min(record["time"] - previous, max_gap) / speed
+        previous = record["time"]
+        offsets.append(offset)
+    return offsets
+
+
+def translated_text(status: int, content: bytes) -> Optional[str]:
+    if not 200 <= status < 300:
+        return None
+    try:
+        return json.loads(content)["payload"]["translatedText"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class ConnectionPool:
+    """Keep-alive connections to one URL, opened on demand and reused once idle."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+        self._idle: List[HTTPConnection] = []
+
+    async def send(self, body: bytes) -> Reply:
+        connection = self._idle.pop() if self._idle else HTTPConnection(self.host, self.port, self.path)
+        try:
+            reply = await connection.request(body)
+        except BaseException:
+            await connection.close()
+            raise
+        self._idle.append(connection)
+        return reply
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._idle.pop().close()
+
+
+class InProcessApp:
+    """Serves requests from an ASGI app in this process, running its startup and shutdown events."""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+        self._lifespan: Optional[asyncio.Future] = None
+        self._to_app: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._from_app: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def start(self) -> None:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan = asyncio.ensure_future(self.app(scope, self._to_app.get, self._from_app.put))
+        await self._to_app.put({"type": "lifespan.startup"})
+        message = await self._from_app.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Engine startup failed: {message.get('message', message['type'])}")
+
+    async def stop(self) -> None:
+        if self._lifespan is None:
+            return
+        await self._to_app.put({"type": "lifespan.shutdown"})
+        await self._from_app.get()
+        await self._lifespan
+
+    async def send(self, body: bytes) -> Reply:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": self.path, "raw_path": self.path.encode("latin-1"), "query_string": b"",
+            "root_path": "", "client": ("127.0.0.1", 0), "server": ("127.0.0.1", 80), "state": {},
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("latin-1"))]
+        }
+        finished = asyncio.Event()
+        request_sent = False
+        status = 500
+        chunks = []
+
+        async def receive() -> Dict[str, Any]:
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    finished.set()
+
+        await self.app(scope, receive, send)
+        finished.set()
+        return status, b"".join(chunks)
+
+
+def load_app(engine: str, root: Path):
+    directory, module_name = APP_MODULES[engine]
+    sys.path.insert(0, str(root / directory))
+    return importlib.import_module(module_name).app
+
+
+async def replay(records: List[Dict[str, Any]], send: Sender,
+                 args: argparse.Namespace) -> Tuple[List[Dict[str, Any]], float]:
+    """Per-request results in capture order, and the wall time the replay took"""
+    bodies = [request_body(index, record) for index, record in enumerate(records)]
+    results: List[Dict[str, Any]] = [{} for _ in records]
+
+    async def replay_one(index: int) -> None:
+        started = time.perf_counter()
+        try:
+            status, content = await asyncio.wait_for(send(bodies[index]), args.timeout)
+        except (asyncio.TimeoutError, ConnectionError, OSError, ValueError, IndexError) as exc:
+            results[index] = {"index": index, "status": None, "error": type(exc).__name__,
+                              "latencyMs": round((time.perf_counter() - started) * 1000, 2)}
+            return
+        results[index] = {
+            "index": index,
+            "status": status,
+            "latencyMs": round((time.perf_counter() - started) * 1000, 2),
+            "translatedText": translated_text(status, content)
+        }
+
+    replay_started = time.perf_counter()
+    if args.timing == "max":
+        pending = iter(range(len(records)))
+
+        async def worker() -> None:
+            for index in pending:
+                await replay_one(index)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return results, time.perf_counter() - replay_started
+
+    tasks = []
+    for index, offset in enumerate(arrival_offsets(records, args.speed, args.max_gap)):
+        delay = replay_started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(replay_one(index)))
+    await asyncio.gather(*tasks)
+    return results, time.perf_counter() - replay_started
+
+
+async def replay_in_process(records: List[Dict[str, Any]],
+                            args: argparse.Namespace) -> Tuple[List[Dict[str, Any]], float]:
+    app = InProcessApp(load_app(args.engine, args.root), "/translate" if args.engine == "fastapi" else "/api/translate")
+    await app.start()
+    try:
+        return await replay(records, app.send, args)
+    finally:
+        await app.stop()
+
+
+async def replay_over_http(records: List[Dict[str, Any]], url: str,
+                           args: argparse.Namespace) -> Tuple[List[Dict[str, Any]], float]:
+    pool = ConnectionPool(url)
+    try:
+        return await replay(records, pool.send, args)
+    finally:
+        await pool.close()
+
+
+def succeeded(result: Dict[str, Any]) -> bool:
+    return result["status"] is not None and 200 <= result["status"] < 300
+
+
+def success_latencies(results: List[Dict[str, Any]]) -> List[float]:
+    return [result["latencyMs"] for result in results if succeeded(result)]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    latencies = sorted(latencies)
+    summary = {
+        name: round(percentile(latencies, fraction), 2) if latencies else None
+        for name, fraction in (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99))
+    }
+    summary["mean"] = round(sum(latencies) / len(latencies), 2) if latencies else None
+    summary["max"] = round(latencies[-1], 2) if latencies else None
+    return summary
+
+
+def run_command(args: argparse.Namespace) -> int:
+    headers, records = load_capture(args.capture)
+    if not records:
+        print(f"No requests in {args.capture}", file=sys.stderr)
+        return 1
+
+    # A replayed server must not capture the replay; locally run builds get a fixed hash seed
+    env = dict(os.environ, PYTHONHASHSEED=str(args.hash_seed))
+    env.pop("REQUEST_CAPTURE_PATH", None)
+    if args.engine:
+        os.environ.pop("REQUEST_CAPTURE_PATH", None)
+        if os.environ.get("PYTHONHASHSEED") != str(args.hash_seed):
+            os.execve(sys.executable, [sys.executable, *sys.argv], env)
+
+    if headers and any(header.get("text") != "full" for header in headers):
+        print("Capture texts are masked: outputs and latencies only approximate the original traffic",
+              file=sys.stderr)
+
+    process = None
+    try:
+        if args.engine:
+            target = f"engine:{args.engine}"
+            results, elapsed = asyncio.run(replay_in_process(records, args))
+        else:
+            if args.url:
+                target = url = ready_url = args.url
+            else:
+                target = args.server
+                port = free_port()
+                process = start_server(args.server, port, args.server_workers, args.root, env)
+                base = f"http://127.0.0.1:{port}"
+                url = f"{base}/translate" if args.server == "fastapi" else f"{base}/api/translate"
+                ready_url = f"{base}/"
+            wait_until_ready(ready_url, process, args.ready_timeout)
+            results, elapsed = asyncio.run(replay_over_http(records, url, args))
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    successes = success_latencies(results)
+    header = {
+        "type": "replay",
+        "capture": args.capture,
+        "target": target,
+        "root": str(args.root),
+        "timing": args.timing,
+        "speed": args.speed if args.timing == "original" else None,
+        "concurrency": args.concurrency if args.timing == "max" else None,
+        "hashSeed": args.hash_seed,
+        "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        "requests": len(results),
+        "errors": len(results) - len(successes),
+        "wallSeconds": round(elapsed, 3),
+        "rps": round(len(successes) / elapsed, 2) if elapsed else 0.0,
+        "latencyMs": latency_summary(successes)
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        for entry in (header, *results):
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    print(json.dumps({key: header[key] for key in ("target", "requests", "errors", "wallSeconds", "rps", "latencyMs")}),
+          file=sys.stderr)
+    return 0
+
+
+def load_results(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """A results file, or a capture read as the results of the original traffic"""
+    with open(path, "r", encoding="utf-8") as f:
+        first = json.loads(f.readline() or "{}")
+    if first.get("type") != "replay":
+        _, records = load_capture(path)
+        results = [
+            {"index": index, "status": record["status"], "latencyMs": record["processingMs"],
+             "translatedText": record.get("translatedText")}
+            for index, record in enumerate(records)
+        ]
+        return {"type": "capture", "target": "captured traffic", "latency": "server processing time"}, results
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    header = dict(lines[0], latency="in-process" if lines[0]["target"].startswith("engine:") else "client round trip")
+    return header, lines[1:]
+
+
+def side_summary(path: str, header: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    latencies = success_latencies(results)
+    return {
+        "file": path,
+        "target": header["target"],
+        "latencyKind": header["latency"],
+        "requests": len(results),
+        "errors": len(results) - len(latencies),
+        "latencyMs": latency_summary(latencies)
+    }
+
+
+def diff_command(args: argparse.Namespace) -> int:
+    baseline_header, baseline = load_results(args.baseline)
+    candidate_header, candidate = load_results(args.candidate)
+    if len(baseline) != len(candidate):
+        print(f"Warning: {len(baseline)} baseline and {len(candidate)} candidate requests; comparing the first "
+              f"{min(len(baseline), len(candidate))}", file=sys.stderr)
+
+    identical = different = not_comparable = status_mismatches = 0
+    examples = []
+    ratios = []
+    for before, after in zip(baseline, candidate):
+        if before["status"] != after["status"]:
+            status_mismatches += 1
+            if len(examples) < args.max_examples:
+                examples.append({"index": before["index"], "baselineStatus": before["status"],
+                                 "candidateStatus": after["status"]})
+            continue
+        if before.get("translatedText") is None or after.get("translatedText") is None:
+            not_comparable += 1
+        elif before["translatedText"] == after["translatedText"]:
+            identical += 1
+        else:
+            different += 1
+            if len(examples) < args.max_examples:
+                examples.append({"index": before["index"], "baseline": before["translatedText"],
+                                 "candidate": after["translatedText"]})
+        if succeeded(before) and before["latencyMs"] > 0:
+            ratios.append(after["latencyMs"] / before["latencyMs"])
+
+    baseline_summary = side_summary(args.baseline, baseline_header, baseline)
+    candidate_summary = side_summary(args.candidate, candidate_header, candidate)
+    latency_change = {}
+    for name, before in baseline_summary["latencyMs"].items():
+        after = candidate_summary["latencyMs"][name]
+        latency_change[name] = round(after / before - 1, 4) if before and after is not None else None
+    ratios.sort()
+    report = {
+        "baseline": baseline_summary,
+        "candidate": candidate_summary,
+        "outputs": {
+            "identical": identical,
+            "different": different,
+            "notComparable": not_comparable,
+            "statusMismatches": status_mismatches
+        },
+        "examples": examples,
+        # Relative change of each candidate percentile over the baseline's (0.1 = 10% slower)
+        "latencyChange": latency_change,
+        # Per-request candidate/baseline latency, which cancels out the mix of short and long inputs
+        "pairedLatencyRatio": {
+            name: round(percentile(ratios, fraction), 3) if ratios else None
+            for name, fraction in (("p10", 0.10), ("p50", 0.50), ("p90", 0.90))
+        }
+    }
+    if baseline_summary["latencyKind"] != candidate_summary["latencyKind"]:
+        report["warning"] = (f"Latencies are not like for like: {baseline_summary['latencyKind']} vs "
+                             f"{candidate_summary['latencyKind']}")
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    failed = different > 0 or status_mismatches > 0
+    if args.max_p95_regression is not None and latency_change["p95"] is not None:
+        failed = failed or latency_change["p95"] > args.max_p95_regression
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay captured translation traffic and compare runs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="replay a capture against one target and write its results")
+    run_parser.add_argument("capture", help="capture file written with REQUEST_CAPTURE_PATH")
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument("--server", choices=("fastapi", "serverless", "serverless-asgi"),
+                        help="server to start locally from --root (default: fastapi)")
+    target.add_argument("--url", help="translate endpoint of an already running server")
+    target.add_argument("--engine", choices=tuple(APP_MODULES), help="drive the build's ASGI app in this process")
+    run_parser.add_argument("--root", type=lambda value: Path(value).resolve(), default=ROOT_DIR,
+                            help="checkout whose build is replayed (default: this one)")
+    run_parser.add_argument("--server-workers", type=int, default=1,
+                            help="uvicorn worker processes for --server fastapi / serverless-asgi")
+    run_parser.add_argument("--timing", choices=("original", "max"), default="original")
+    run_parser.add_argument("--speed", type=float, default=1.0, help="arrival-time speed-up for --timing original")
+    run_parser.add_argument("--max-gap", type=float, default=5.0,
+                            help="longest idle gap between captured arrivals kept, in seconds")
+    run_parser.add_argument("--concurrency", type=int, default=1, help="requests in flight for --timing max")
+    run_parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    run_parser.add_argument("--hash-seed", type=int, default=0, help="PYTHONHASHSEED for locally run builds")
+    run_parser.add_argument("--ready-timeout", type=float, default=60.0)
+    run_parser.add_argument("-o", "--output", required=True, help="results file to write")
+
+    diff_parser = commands.add_parser("diff", help="compare two results files (or a capture and a results file)")
+    diff_parser.add_argument("baseline")
+    diff_parser.add_argument("candidate")
+    diff_parser.add_argument("--max-examples", type=int, default=10, help="differing requests listed in the report")
+    diff_parser.add_argument("--max-p95-regression", type=float,
+                             help="also fail when the candidate p95 exceeds the baseline's by more than this fraction")
+    diff_parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        if not (args.server or args.url or args.engine):
+            args.server = "fastapi"
+        return run_command(args)
+    return diff_command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""The ESP32 image must answer every lookup exactly as the server engines' exact stage does."""
+import json
+
+import pytest
+
+from build_esp32_dictionary import (
+    DEFAULT_DICTIONARY, HEADER, ROOT, SERVER_STATE_VARIABLES, BinaryDictionary, DictionaryFormatError, build_image,
+    content_hash, probe_words, render_header
+)
+
+
+@pytest.fixture(scope="module")
+def entries():
+    with open(DEFAULT_DICTIONARY, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def reader(entries):
+    return BinaryDictionary(build_image(entries))
+
+
+@pytest.fixture(scope="module")
+def server():
+    with pytest.MonkeyPatch.context() as patch:
+        # Importing the server must not replay a journal, open a translation memory or spawn workers
+        for name in SERVER_STATE_VARIABLES + ("DICTIONARY_MANIFEST",):
+            patch.delenv(name, raising=False)
+        patch.syspath_prepend(str(ROOT / "webroot" / "server"))
+        import main
+        yield main
+
+
+@pytest.fixture(scope="module")
+def serverless():
+    with pytest.MonkeyPatch.context() as patch:
+        patch.syspath_prepend(str(ROOT / "vercel-deployment" / "api"))
+        import translate
+        yield translate
+
+
+def test_image_round_trips(entries, reader):
+    assert len(reader) == len(entries)
+    assert dict(reader.items()) == entries
+    assert reader.content_hash == content_hash(entries)
+
+
+def test_lookups_match_the_server(entries, reader, server):
+    lexicon = server.DEFAULT_LEXICON
+    assert lexicon.entries == entries
+    reverse = server.reverse_entries(lexicon)
+    for word in probe_words(entries):
+        assert reader.lookup(word) == lexicon.entries.get(word.lower()), word
+        assert reader.reverse_lookup(word) == reverse.get(word.lower()), word
+
+
+def test_lookups_match_the_serverless_engine(entries, reader, serverless):
+    assert serverless.DICTIONARY == entries
+    for word in probe_words(entries):
+        assert reader.lookup(word) == serverless.DICTIONARY.get(word.lower()), word
+        candidates = serverless.DICTIONARY_REVERSE.get(word.lower(), set())
+        found = reader.reverse_lookup(word)
+        # The serverless engine may pick any candidate when several words share a translation
+        if candidates:
+            assert found in candidates, word
+        else:
+            assert found is None, word
+
+
+def test_header_embeds_the_image(entries):
+    image = build_image(entries)
+    rendered = render_header(image, "dictionary_bin")
+    assert f"const size_t dictionary_bin_len = {len(image)};" in rendered
+    body = rendered.split("PROGMEM = {", 1)[1].rsplit("};", 1)[0]
+    assert bytes(int(byte, 16) for byte in body.replace(",", " ").split()) == image
+
+
+def test_truncated_image_is_rejected(entries):
+    image = build_image(entries)
+    with pytest.raises(DictionaryFormatError):
+        BinaryDictionary(image[:HEADER.size - 1])
+    with pytest.raises(DictionaryFormatError):
+        BinaryDictionary(image[:-1])
+
+
+def test_bad_magic_is_rejected(entries):
+    image = build_image(entries)
+    with pytest.raises(DictionaryFormatError):
+        BinaryDictionary(b"JSON" + image[4:])
+
+
+def test_unknown_format_version_is_rejected(entries):
+    image = bytearray(build_image(entries))
+    image[4:6] = (2).to_bytes(2, "little")
+    with pytest.raises(DictionaryFormatError):
+        BinaryDictionary(bytes(image))
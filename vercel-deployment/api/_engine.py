@@ -0,0 +1,444 @@
+"""Translation engine over an explicit lexicon, for embedding in other programs.
+
+The serverless handler translates through a default engine built from the
+bundled dictionary.json and rules.json, but the engine itself holds no
+module-level state: a pipeline can build one from any dictionary and call it
+directly, with no HTTP round trip or request parsing.
+
+    engine = TranslationEngine.from_files("dictionary.json", "rules.json")
+    text, confidence, statistics = engine.translate("Selamat pagi", "id", "dyk")
+    for result in engine.translate_iter(lines, "id", "dyk"):
+        ...
+
+translate_iter is a generator: it pulls one segment from its input, yields
+its translation and only then reads the next, so a file or stream of any
+length is translated in constant memory. Word resolutions are shared between
+the segments of one stream, up to a bounded number of words.
+"""
+import json
+import re
+from array import array
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from _numerals import find_numerals
+from _rules import EMPTY_RULES, RuleSet, SynonymMatch, compile_closure, load_rules
+
+# Match codes, one byte per token
+PRESERVED = 0       # whitespace or punctuation, copied as is
+UNRESOLVED = 1      # word left untranslated by the cascade
+EXACT = 2           # one-word dictionary entry
+PHRASE = 3          # first word of a multi-word dictionary entry (detail: phrase length)
+PHRASE_PART = 4     # later words of that entry, which translate to ""
+SYNONYM = 5         # synonym rule chain (detail: chain depth)
+MORPHOLOGICAL = 6   # base form found in the dictionary
+MORPH_SYNONYM = 7   # base form reached through a synonym chain (detail: chain depth)
+FUZZY = 8           # n-gram match (detail: the dictionary word matched)
+REVERSE = 9         # Dayak Kenyah word found in the reverse dictionary
+REVERSE_MISS = 10   # Dayak Kenyah word not in the reverse dictionary
+NUMERAL = 11        # first token of a number, carrying all of it (detail: its value)
+NUMERAL_PART = 12   # later tokens of that number, which translate to ""
+
+# (translation or None to keep the source token, match code, confidence, detail)
+WordResolution = Tuple[Optional[str], int, float, object]
+
+NO_RESOLUTION: WordResolution = (None, UNRESOLVED, 0.0, None)
+
+
+def synonym_rule_type(depth: int) -> str:
+    return {1: "synonym_chain", 2: "double_synonym"}.get(depth, f"synonym_chain_{depth}")
+
+
+class TokenResults:
+    """Per-token results as parallel arrays over the token list; match types are integer codes."""
+
+    __slots__ = ("tokens", "translations", "codes", "confidences", "details")
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.translations: List[str] = []
+        self.codes = array('B')
+        self.confidences = array('d')
+        self.details: List[object] = []
+
+    def append(self, translation: str, code: int, confidence: float = 0.0, detail: object = None) -> None:
+        self.translations.append(translation)
+        self.codes.append(code)
+        self.confidences.append(confidence)
+        self.details.append(detail)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def label(self, index: int) -> str:
+        """Descriptive match type of one token, e.g. "morphological_0.90" or "exact_2gram"."""
+        code = self.codes[index]
+        confidence = self.confidences[index]
+        detail = self.details[index]
+        if code == PRESERVED:
+            return "preserved"
+        if code == UNRESOLVED:
+            return f"none_{confidence:.2f}"
+        if code == EXACT:
+            return "exact_1gram"
+        if code == PHRASE:
+            return f"exact_{detail}gram"
+        if code == PHRASE_PART:
+            return f"exact_{detail}gram_part"
+        if code == SYNONYM:
+            return f"{synonym_rule_type(detail)}_{confidence:.2f}"
+        if code == MORPHOLOGICAL:
+            return f"morphological_{confidence:.2f}"
+        if code == MORPH_SYNONYM:
+            return f"morph_{synonym_rule_type(detail)}_{confidence:.2f}"
+        if code == FUZZY:
+            return f"fuzzy_{detail}_{confidence:.2f}"
+        if code == REVERSE:
+            return "reverse"
+        if code == NUMERAL:
+            return f"numeral_{detail}"
+        if code == NUMERAL_PART:
+            return "numeral_part"
+        return "none"
+
+    def as_tuples(self) -> List[Tuple[str, str, str]]:
+        """(translated_word, match_type, original_word) per token, for logging and older callers."""
+        return [
+            (translation, self.label(index), token)
+            for index, (translation, token) in enumerate(zip(self.translations, self.tokens))
+        ]
+
+
+class Translation(NamedTuple):
+    text: str
+    confidence: float
+    statistics: Dict[str, int]
+
+
+def ngram_similarity(word1: str, word2: str, n: int = 2) -> float:
+    """Calculates N-gram similarity between two words."""
+    if not word1 or not word2:
+        return 0.0
+
+    def get_ngrams(word, n):
+        return set([word[i:i+n] for i in range(len(word) - n + 1)])
+
+    ngrams1 = get_ngrams(word1.lower(), n)
+    ngrams2 = get_ngrams(word2.lower(), n)
+
+    intersection = len(ngrams1.intersection(ngrams2))
+    union = len(ngrams1.union(ngrams2))
+
+    return intersection / union if union else 0.0
+
+def analyze_morphology(word: str) -> List[Tuple[str, float]]:
+    """Analyze Indonesian word morphology and return possible base forms with confidence scores."""
+    word = word.lower()
+    base_forms = [(word, 1.0)]  # (form, confidence)
+
+    # Common Indonesian affixes with confidence scores
+    suffixes = [
+        ('ku', 0.9),   # Very common possessive
+        ('mu', 0.9),   # Very common possessive
+        ('nya', 0.9),  # Very common possessive/determiner
+        ('kan', 0.8),  # Causative
+        ('i', 0.7),    # Locative/repetitive
+        ('an', 0.7),   # Nominalizer
+    ]
+
+    prefixes = [
+        ('me', 0.8),
+        ('ber', 0.8),
+        ('di', 0.8),
+        ('ter', 0.7),
+        ('pe', 0.7),
+        ('se', 0.7),
+    ]
+
+    # Handle suffixes first - they're more reliable for meaning
+    for suffix, confidence in suffixes:
+        if word.endswith(suffix):
+            base = word[:-len(suffix)]
+            if len(base) > 1:
+                base_forms.append((base, confidence))
+
+                # Handle double suffix cases with reduced confidence
+                for other_suffix, other_conf in suffixes:
+                    if base.endswith(other_suffix):
+                        deeper_base = base[:-len(other_suffix)]
+                        if len(deeper_base) > 1:
+                            base_forms.append((deeper_base, confidence * other_conf))
+
+    # Handle prefixes
+    word_forms = base_forms.copy()  # Work with current base forms
+    for prefix, confidence in prefixes:
+        for base_word, base_conf in word_forms:
+            if base_word.startswith(prefix):
+                stripped = base_word[len(prefix):]
+                if len(stripped) > 1:
+                    base_forms.append((stripped, base_conf * confidence))
+
+    # Sort by confidence and remove duplicates while preserving best confidence
+    seen = {}
+    for form, conf in base_forms:
+        if form not in seen or conf > seen[form]:
+            seen[form] = conf
+
+    return [(form, conf) for form, conf in sorted(seen.items(), key=lambda x: x[1], reverse=True)]
+
+def tokenize(text: str) -> List[str]:
+    """Split text into word, whitespace and punctuation tokens, line by line to keep line breaks intact."""
+    tokens = []
+    for line in text.splitlines(keepends=True):
+        # Tokenize each line separately
+        line_tokens = re.findall(r'(\w+|\s+|[^\w\s]+)', line)
+        tokens.extend(token for token in line_tokens if token)
+    return tokens
+
+def build_reverse_index(dictionary: Dict[str, str]) -> Dict[str, Set[str]]:
+    """Dayak Kenyah word -> every Indonesian word translating to it."""
+    reverse: Dict[str, Set[str]] = {}
+    for indo_word, dayak_word in dictionary.items():
+        if dayak_word not in reverse:
+            reverse[dayak_word] = set()
+        reverse[dayak_word].add(indo_word)
+    return reverse
+
+
+class TranslationEngine:
+    """The serverless translation cascade bound to one dictionary and rule set."""
+
+    def __init__(self, dictionary: Dict[str, str], rules: RuleSet = EMPTY_RULES):
+        self.dictionary = dictionary
+        self.rules = rules
+        self.reverse: Dict[str, Set[str]] = build_reverse_index(dictionary)
+        # Synonym rules, compiled once against the dictionary
+        self.synonym_closure: Dict[str, SynonymMatch] = compile_closure(rules, dictionary)
+
+    @classmethod
+    def from_files(cls, dictionary_path: str, rules_path: Optional[str] = None) -> "TranslationEngine":
+        with open(dictionary_path, 'r', encoding='utf-8') as f:
+            dictionary = json.load(f)
+        return cls(dictionary, load_rules(rules_path) if rules_path else EMPTY_RULES)
+
+    def apply_rules(self, word: str) -> Tuple[str, str, float]:
+        """Apply Rule-Based Machine Translation rules through the precompiled synonym closure."""
+        # Direct dictionary match
+        if word in self.dictionary:
+            return self.dictionary[word], "direct", 1.0
+
+        # Best synonym chain, resolved when the rules were loaded
+        match = self.synonym_closure.get(word)
+        if match is not None:
+            return match.translation, synonym_rule_type(match.depth), match.confidence
+
+        return word, "none", 0.0
+
+    def resolve_word_types(self, words: Iterable[str]) -> Dict[str, WordResolution]:
+        """Resolve unique lower-cased Indonesian words stage by stage.
+
+        Each stage only sees the words earlier stages left unresolved: exact, synonym rules,
+        morphology (base forms, directly or through the rules), then fuzzy matching.
+        """
+        dictionary = self.dictionary
+        closure = self.synonym_closure
+        resolved: Dict[str, WordResolution] = {}
+
+        # Exact match (a one-word phrase)
+        pending = []
+        for word in words:
+            if word in dictionary:
+                resolved[word] = (dictionary[word], EXACT, 1.0, None)
+            else:
+                pending.append(word)
+
+        # Synonym rules
+        remaining = []
+        for word in pending:
+            match = closure.get(word)
+            if match is not None:
+                resolved[word] = (match.translation, SYNONYM, match.confidence, match.depth)
+            else:
+                remaining.append(word)
+
+        # Morphological analysis, trying each base form directly and through the rules
+        pending = []
+        for word in remaining:
+            for base_form, morph_conf in analyze_morphology(word):
+                if base_form in dictionary:
+                    resolved[word] = (dictionary[base_form], MORPHOLOGICAL, morph_conf, None)
+                    break
+                match = closure.get(base_form)
+                if match is not None:
+                    resolved[word] = (match.translation, MORPH_SYNONYM, morph_conf * match.confidence, match.depth)
+                    break
+            else:
+                pending.append(word)
+
+        # Lightweight matching
+        for word in pending:
+            best_match = None
+            best_similarity = 0.0
+            best_word = word
+            for dict_word in dictionary.keys():
+                similarity = ngram_similarity(word, dict_word)
+                if similarity > best_similarity and similarity > 0.7:
+                    best_similarity = similarity
+                    best_match = dictionary[dict_word]
+                    best_word = dict_word
+            if best_match:
+                resolved[word] = (best_match, FUZZY, best_similarity, best_word)
+
+        return resolved
+
+    def process_tokens(self, tokens: List[str], source_lang: str, target_lang: str, case_sensitive: bool = False,
+                       memo: Optional[Dict[str, WordResolution]] = None) -> TokenResults:
+        """Translate tokens into per-token results (translation, match code, confidence).
+
+        Numbers (digits or number words) are translated by rule before any dictionary lookup;
+        their tokens are not resolved through the cascade. Unique words are resolved once (see resolve_word_types) and every occurrence is
+        materialized from that map, so cost follows vocabulary size rather than token count.
+        A memo carried across calls (word -> resolution) skips words it already holds.
+        """
+        dictionary = self.dictionary
+        tokens, numerals = find_numerals(tokens, source_lang, target_lang)
+        in_numeral: Set[int] = set()
+        for start, numeral in numerals.items():
+            in_numeral.update(range(start, start + numeral.length))
+
+        is_word = [bool(re.fullmatch(r'\w+', token)) for token in tokens]
+        word_types: Dict[str, WordResolution] = {}
+        if source_lang == "id":
+            words = {
+                token.lower() for index, (token, word) in enumerate(zip(tokens, is_word))
+                if word and index not in in_numeral
+            }
+            if memo is None:
+                word_types = self.resolve_word_types(words)
+            else:
+                unseen = [word for word in words if word not in memo]
+                resolved = self.resolve_word_types(unseen)
+                # Unresolved words are remembered too, so they are not fuzzy-matched again
+                memo.update((word, resolved.get(word, NO_RESOLUTION)) for word in unseen)
+                word_types = memo
+
+        results = TokenResults(tokens)
+        i = 0
+
+        while i < len(tokens):
+            token = tokens[i]
+
+            # Preserve non-word tokens exactly
+            if not is_word[i]:
+                results.append(token, PRESERVED)
+                i += 1
+                continue
+
+            numeral = numerals.get(i)
+            if numeral is not None:
+                translated_word = numeral.translation
+                if not case_sensitive:
+                    if token.isupper():
+                        translated_word = translated_word.upper()
+                    elif token.istitle():
+                        translated_word = translated_word.capitalize()
+                results.append(translated_word, NUMERAL, 1.0, numeral.value)
+                # Its other words and the spaces between them are carried by the first token
+                for _ in range(1, numeral.length):
+                    results.append("", NUMERAL_PART, 1.0)
+                i += numeral.length
+                continue
+
+            if source_lang == "id":
+                # Multi-word sequences first (up to 3 words)
+                max_lookahead = min(3, len(tokens) - i)
+                matched_length = 0
+                for seq_len in range(max_lookahead, 1, -1):
+                    if all(is_word[i:i + seq_len]):
+                        phrase = " ".join(t.lower() for t in tokens[i:i + seq_len])
+                        if phrase in dictionary:
+                            matched_length = seq_len
+                            break
+
+                if matched_length:
+                    trans = dictionary[phrase]
+                    if not case_sensitive:
+                        if token.isupper():
+                            trans = trans.upper()
+                        elif token.istitle():
+                            trans = trans.capitalize()
+                    results.append(trans, PHRASE, 1.0, matched_length)
+
+                    # Add empty strings for remaining tokens in phrase
+                    for j in range(1, matched_length):
+                        results.append("", PHRASE_PART, 1.0, matched_length)
+                    i += matched_length
+                    continue
+
+                translation, code, confidence, detail = word_types.get(token.lower(), NO_RESOLUTION)
+                translated_word = translation if translation is not None else token
+            else:  # target_lang == "id", Dayak to Indonesian
+                # Use reverse dictionary for Dayak to Indonesian
+                if token.lower() in self.reverse:
+                    candidates = self.reverse[token.lower()]
+                    translated_word = next(iter(candidates))  # Take first candidate
+                    code, confidence = REVERSE, 1.0
+                else:
+                    translated_word = token
+                    code, confidence = REVERSE_MISS, 0.0
+                detail = None
+
+            # Case preservation
+            if not case_sensitive:
+                if token.isupper():
+                    translated_word = translated_word.upper()
+                elif token.istitle():
+                    translated_word = translated_word.capitalize()
+
+            results.append(translated_word, code, confidence, detail)
+            i += 1
+
+        return results
+
+    @staticmethod
+    def reconstruct(results: TokenResults) -> Translation:
+        """Join token results back into text and gather match statistics."""
+        # Non-word tokens carry themselves and the later words of a phrase carry "", so the text is one join
+        translated_text = "".join(results.translations)
+
+        codes = results.codes
+        total_words = len(codes) - codes.count(PRESERVED) - codes.count(PHRASE_PART) - codes.count(NUMERAL_PART)
+        # Dictionary entries of one or more words and numbers are counted (as multi-word matches) and
+        # scored; the other counters are part of the response format but no stage of this engine feeds them
+        multi_word_matches = codes.count(EXACT) + codes.count(PHRASE) + codes.count(NUMERAL)
+        confidence = 0.0
+        if total_words > 0:
+            confidence = multi_word_matches / total_words
+
+        statistics = {
+            "exactMatches": 0,
+            "synonymRBMTMatches": 0,
+            "morphologicalMatches": 0,
+            "lightweightMatches": 0,
+            "multiWordMatches": multi_word_matches,
+            "totalWords": total_words
+        }
+        return Translation(translated_text, confidence, statistics)
+
+    def translate(self, text: str, source_lang: str, target_lang: str, case_sensitive: bool = False,
+                  memo: Optional[Dict[str, WordResolution]] = None) -> Translation:
+        """Translate text and return (translated_text, confidence, match statistics)."""
+        return self.reconstruct(self.process_tokens(tokenize(text), source_lang, target_lang, case_sensitive, memo))
+
+    def translate_iter(self, segments: Iterable[str], source_lang: str, target_lang: str,
+                       case_sensitive: bool = False, memo_size: int = 50000) -> Iterator[Translation]:
+        """Lazily translate each segment in turn, yielding one Translation per segment.
+
+        Segments are translated independently (exactly as translate() would); only the
+        resolutions of single words are shared, and the shared memo is cleared whenever
+        it grows past memo_size words.
+        """
+        memo: Dict[str, WordResolution] = {}
+        for segment in segments:
+            if len(memo) > memo_size:
+                memo.clear()
+            yield self.translate(segment, source_lang, target_lang, case_sensitive, memo)
@@ -0,0 +1,169 @@
+"""Structured, non-blocking logging shared by the FastAPI server and the serverless handlers.
+
+Records are pushed onto a bounded queue by the request thread and formatted
+as one JSON object per line by a background listener, so a request never
+waits on stdout/stderr. Payload fields are passed unformatted and only
+capped and serialised on the listener thread.
+
+Per-request debug detail goes through RequestLogger, which decides once per
+request whether detail is recorded (DEBUG enabled and the request sampled).
+When it is not, debug calls return immediately without building anything.
+
+The serverless handlers log under the "translator" logger (get_logger). The
+FastAPI server, whose modules log under their own names, installs the queue
+on the root logger instead: configure(""). This module is copied verbatim
+between webroot/server/structured_logging.py and
+vercel-deployment/api/_structured_logging.py.
+
+Environment variables:
+    LOG_LEVEL            minimum level (default INFO)
+    LOG_SAMPLE_RATE      fraction of requests whose debug detail is kept (default 1.0)
+    LOG_MAX_FIELD_CHARS  longest string or repr kept per field (default 1000)
+    LOG_MAX_ITEMS        most list/dict items kept per field (default 50)
+    LOG_QUEUE_SIZE       records buffered before new ones are dropped (default 10000)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))
+LOG_MAX_FIELD_CHARS = int(os.environ.get("LOG_MAX_FIELD_CHARS", "1000"))
+LOG_MAX_ITEMS = int(os.environ.get("LOG_MAX_ITEMS", "50"))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+ROOT_LOGGER_NAME = "translator"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+def cap_value(value: Any, max_chars: int = LOG_MAX_FIELD_CHARS, max_items: int = LOG_MAX_ITEMS) -> Any:
+    """Return a JSON-friendly copy of value with long strings and collections truncated."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}...(+{len(value) - max_chars} chars)"
+        return value
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        capped = [cap_value(item, max_chars, max_items) for item in items[:max_items]]
+        if len(items) > max_items:
+            capped.append(f"...(+{len(items) - max_items} items)")
+        return capped
+    if isinstance(value, dict):
+        capped = {}
+        for index, (key, item) in enumerate(value.items()):
+            if index >= max_items:
+                capped["..."] = f"+{len(value) - max_items} keys"
+                break
+            capped[str(key)] = cap_value(item, max_chars, max_items)
+        return capped
+    return cap_value(repr(value), max_chars, max_items)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; structured fields come from record.fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            for key, value in fields.items():
+                entry[key] = cap_value(value)
+        if record.exc_info:
+            entry["exception"] = cap_value(self.formatException(record.exc_info), max_chars=4000)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks or formats on the calling thread."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure(logger_name: str = ROOT_LOGGER_NAME) -> None:
+    """Install the queue handler on logger_name ("" for the root logger) and start the listener.
+
+    Safe to call more than once; only the first call installs anything.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter())
+    _queue_handler = DroppingQueueHandler(log_queue)
+
+    root = logging.getLogger(logger_name)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(_queue_handler)
+    if logger_name:
+        root.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    configure()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+class RequestLogger:
+    """Per-request view of a logger that tags records and gates debug detail by sampling."""
+
+    __slots__ = ("logger", "request_id", "detail")
+
+    def __init__(self, logger: logging.Logger, request_id: str = "", sample_rate: float = LOG_SAMPLE_RATE):
+        self.logger = logger
+        self.request_id = request_id
+        self.detail = logger.isEnabledFor(logging.DEBUG) and (sample_rate >= 1.0 or random.random() < sample_rate)
+
+    def debug(self, msg: str, **fields: Any) -> None:
+        if self.detail:
+            fields["requestId"] = self.request_id
+            self.logger.debug(msg, extra={"fields": fields})
+
+    def info(self, msg: str, **fields: Any) -> None:
+        if self.logger.isEnabledFor(logging.INFO):
+            fields["requestId"] = self.request_id
+            self.logger.info(msg, extra={"fields": fields})
+
+    def warning(self, msg: str, **fields: Any) -> None:
+        fields["requestId"] = self.request_id
+        self.logger.warning(msg, extra={"fields": fields})
+
+    def error(self, msg: str, exc_info: bool = False, **fields: Any) -> None:
+        fields["requestId"] = self.request_id
+        self.logger.error(msg, exc_info=exc_info, extra={"fields": fields})
@@ -1,18 +1,22 @@
 from http.server import BaseHTTPRequestHandler
 import json
+import logging
 import os
 from datetime import datetime
 
-print("Starting API handler")  # Debug print
+from _structured_logging import RequestLogger, get_logger
+
+logger = get_logger("index")
+logger.info("Starting API handler")
 
 # Load dictionary
 DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), "dictionary.json")
 try:
     with open(DICTIONARY_PATH, 'r', encoding='utf-8') as f:
         DICTIONARY = json.load(f)
-        print(f"Dictionary loaded successfully from {DICTIONARY_PATH}")
+        logger.info("Dictionary loaded", extra={"fields": {"path": DICTIONARY_PATH}})
 except Exception as e:
-    print(f"Error loading dictionary from {DICTIONARY_PATH}: {e}")
+    logger.error("Error loading dictionary", extra={"fields": {"path": DICTIONARY_PATH, "error": str(e)}})
     DICTIONARY = {}
 
 def perform_translation(text, source_lang, target_lang, options=None):
@@ -30,7 +34,7 @@ def perform_translation(text, source_lang, target_lang, options=None):
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
-        print(f"GET request to {self.path}")  # Debug print
+        logger.debug("GET request", extra={"fields": {"path": self.path}})
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -42,20 +46,22 @@ class handler(BaseHTTPRequestHandler):
         self.wfile.write(json.dumps(response).encode())
 
     def do_POST(self):
-        print(f"POST request to {self.path}")  # Debug print
+        request_log = RequestLogger(logger)
+        request_log.debug("POST request", path=self.path)
         try:
             content_length = int(self.headers.get('Content-Length', 0))
             body = self.rfile.read(content_length).decode('utf-8')
-            print(f"Received body: {body}")  # Debug print
+            request_log.debug("Received body", body=body)
             
             data = json.loads(body)
+            request_log.request_id = data.get('requestId', '')
             payload = data.get('payload', {})
             
             text = payload.get('text', '')
             source_lang = payload.get('sourceLang', '')
             target_lang = payload.get('targetLang', '')
             
-            print(f"Processing translation request: {text} from {source_lang} to {target_lang}")  # Debug print
+            request_log.debug("Processing translation request", text=text, sourceLang=source_lang, targetLang=target_lang)
             
             if not text:
                 raise ValueError("Text is required")
@@ -75,7 +81,7 @@ class handler(BaseHTTPRequestHandler):
                 }
             }
             
-            print(f"Sending response: {response}")  # Debug print
+            request_log.debug("Sending response", response=response)
             
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -84,7 +90,7 @@ class handler(BaseHTTPRequestHandler):
             self.wfile.write(json.dumps(response).encode())
             
         except Exception as e:
-            print(f"Error processing request: {str(e)}")  # Debug print
+            request_log.warning("Error processing request", error=str(e))
             error_response = {
                 "status": "error",
                 "error": {
@@ -97,8 +103,16 @@ class handler(BaseHTTPRequestHandler):
             self.end_headers()
             self.wfile.write(json.dumps(error_response).encode())
 
+    def log_message(self, format, *args):
+        # Route the per-request access line through the queued logger instead of writing stderr inline
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("HTTP access", extra={"fields": {"client": self.address_string(), "line": format % args}})
+
+    def log_error(self, format, *args):
+        logger.warning("HTTP error", extra={"fields": {"client": self.address_string(), "line": format % args}})
+
     def do_OPTIONS(self):
-        print(f"OPTIONS request to {self.path}")  # Debug print
+        logger.debug("OPTIONS request", extra={"fields": {"path": self.path}})
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
@@ -1,496 +1,348 @@
 from http.server import BaseHTTPRequestHandler
+import asyncio
 import json
+import logging
 import os
-import re
 from datetime import datetime
-from typing import List, Tuple, Dict, Set
+from typing import Iterable, List, Tuple, Dict, Set, Optional
+
+# ngram_similarity and analyze_morphology stay importable from here for existing callers
+from _engine import (  # noqa: F401
+    TranslationEngine, WordResolution, analyze_morphology, ngram_similarity, tokenize
+)
+from _rules import EMPTY_RULES, SynonymMatch, load_rules
+from _structured_logging import RequestLogger, get_logger
+
+logger = get_logger("translate")
 
 # Load dictionary with better error handling
 DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), "dictionary.json")
 DICTIONARY: Dict[str, str] = {}
-DICTIONARY_REVERSE: Dict[str, Set[str]] = {}  # For reverse lookups
 
 try:
     with open(DICTIONARY_PATH, 'r', encoding='utf-8') as f:
         DICTIONARY = json.load(f)
         
-    # Build reverse lookup dictionary
-    for indo_word, dayak_word in DICTIONARY.items():
-        if dayak_word not in DICTIONARY_REVERSE:
-            DICTIONARY_REVERSE[dayak_word] = set()
-        DICTIONARY_REVERSE[dayak_word].add(indo_word)
-        
-    print(f"Dictionary loaded successfully from {DICTIONARY_PATH}")
-    print(f"Total entries: {len(DICTIONARY)}")
-    print(f"Total reverse mappings: {len(DICTIONARY_REVERSE)}")
-        
 except FileNotFoundError:
-    print(f"Dictionary file not found at {DICTIONARY_PATH}")
+    logger.error("Dictionary file not found", extra={"fields": {"path": DICTIONARY_PATH}})
     raise
 except json.JSONDecodeError as e:
-    print(f"Error parsing dictionary file: {e}")
+    logger.error("Error parsing dictionary file", extra={"fields": {"path": DICTIONARY_PATH, "error": str(e)}})
     raise
 except Exception as e:
-    print(f"Unexpected error loading dictionary: {e}")
+    logger.error("Unexpected error loading dictionary", extra={"fields": {"path": DICTIONARY_PATH, "error": str(e)}})
     raise
 
-def ngram_similarity(word1: str, word2: str, n: int = 2) -> float:
-    """Calculates N-gram similarity between two words."""
-    if not word1 or not word2:
-        return 0.0
-        
-    def get_ngrams(word, n):
-        return set([word[i:i+n] for i in range(len(word) - n + 1)])
-        
-    ngrams1 = get_ngrams(word1.lower(), n)
-    ngrams2 = get_ngrams(word2.lower(), n)
-    
-    intersection = len(ngrams1.intersection(ngrams2))
-    union = len(ngrams1.union(ngrams2))
-    
-    return intersection / union if union else 0.0
-
-def analyze_morphology(word: str) -> List[Tuple[str, float]]:
-    """Analyze Indonesian word morphology and return possible base forms with confidence scores."""
-    word = word.lower()
-    base_forms = [(word, 1.0)]  # (form, confidence)
-    
-    # Common Indonesian affixes with confidence scores
-    suffixes = [
-        ('ku', 0.9),   # Very common possessive
-        ('mu', 0.9),   # Very common possessive
-        ('nya', 0.9),  # Very common possessive/determiner
-        ('kan', 0.8),  # Causative
-        ('i', 0.7),    # Locative/repetitive
-        ('an', 0.7),   # Nominalizer
-    ]
-    
-    prefixes = [
-        ('me', 0.8),
-        ('ber', 0.8),
-        ('di', 0.8),
-        ('ter', 0.7),
-        ('pe', 0.7),
-        ('se', 0.7),
-    ]
-    
-    # Handle suffixes first - they're more reliable for meaning
-    for suffix, confidence in suffixes:
-        if word.endswith(suffix):
-            base = word[:-len(suffix)]
-            if len(base) > 1:
-                base_forms.append((base, confidence))
-                
-                # Handle double suffix cases with reduced confidence
-                for other_suffix, other_conf in suffixes:
-                    if base.endswith(other_suffix):
-                        deeper_base = base[:-len(other_suffix)]
-                        if len(deeper_base) > 1:
-                            base_forms.append((deeper_base, confidence * other_conf))
-    
-    # Handle prefixes
-    word_forms = base_forms.copy()  # Work with current base forms
-    for prefix, confidence in prefixes:
-        for base_word, base_conf in word_forms:
-            if base_word.startswith(prefix):
-                stripped = base_word[len(prefix):]
-                if len(stripped) > 1:
-                    base_forms.append((stripped, base_conf * confidence))
-    
-    # Sort by confidence and remove duplicates while preserving best confidence
-    seen = {}
-    for form, conf in base_forms:
-        if form not in seen or conf > seen[form]:
-            seen[form] = conf
-            
-    return [(form, conf) for form, conf in sorted(seen.items(), key=lambda x: x[1], reverse=True)]
-
-def apply_rbmt_rules(word: str, dict_data: Dict[str, str], visited: Set[str] | None = None) -> Tuple[str, str, float]:
-    """Apply Rule-Based Machine Translation rules recursively."""
-    if visited is None:
-        visited = set()
-    
-    if word in visited:
-        return word, "cycle", 0.0
-    visited.add(word)
-    
-    # Direct dictionary match
+# Synonym rules, compiled once against the dictionary
+RULES_PATH = os.path.join(os.path.dirname(__file__), "rules.json")
+try:
+    RULES = load_rules(RULES_PATH)
+except FileNotFoundError:
+    logger.warning("Rule file not found, synonym rules disabled", extra={"fields": {"path": RULES_PATH}})
+    RULES = EMPTY_RULES
+
+# The engine behind the handler; the module-level functions below translate through it
+ENGINE = TranslationEngine(DICTIONARY, RULES)
+DICTIONARY_REVERSE: Dict[str, Set[str]] = ENGINE.reverse  # For reverse lookups
+SYNONYM_CLOSURE: Dict[str, SynonymMatch] = ENGINE.synonym_closure
+logger.info("Dictionary loaded", extra={"fields": {
+    "path": DICTIONARY_PATH,
+    "entries": len(DICTIONARY),
+    "reverseMappings": len(DICTIONARY_REVERSE)
+}})
+logger.info("Synonym rules compiled", extra={"fields": {
+    "path": RULES_PATH,
+    "version": RULES.version,
+    "ruleWords": len(RULES.synonyms),
+    "closureEntries": len(SYNONYM_CLOSURE)
+}})
+
+def apply_rbmt_rules(word: str, dict_data: Dict[str, str]) -> Tuple[str, str, float]:
+    """Apply Rule-Based Machine Translation rules through the precompiled synonym closure."""
+    if dict_data is DICTIONARY:
+        return ENGINE.apply_rules(word)
+    # Other dictionaries have no compiled closure: direct match only
     if word in dict_data:
         return dict_data[word], "direct", 1.0
-        
-    # Known synonym mappings with confidences
-    synonyms = {
-        "kawan": ("teman", 0.95),
-        "teman": ("kawan", 0.95),
-        "sobat": ("teman", 0.9),
-        "sahabat": ("teman", 0.9),
-    }
-    
-    # Try synonym chain translation
-    if word in synonyms:
-        synonym, confidence = synonyms[word]
-        if synonym in dict_data:
-            return dict_data[synonym], "synonym_chain", confidence
-        # Try one more level of synonyms
-        elif synonym in synonyms and synonym not in visited:
-            next_syn, next_conf = synonyms[synonym]
-            if next_syn in dict_data:
-                return dict_data[next_syn], "double_synonym", confidence * next_conf
-                
     return word, "none", 0.0
 
-def process_single_word(word: str, source_lang: str, dict_data: Dict[str, str]) -> Tuple[str, str, float]:
-    """Process a single word with morphological analysis and RBMT rules."""
-    word_lower = word.lower()
-    
-    # Try direct translation first
-    if word_lower in dict_data:
-        return dict_data[word_lower], "exact", 1.0
-        
-    # Try RBMT rules
-    translated, rule_type, confidence = apply_rbmt_rules(word_lower, dict_data)
-    if rule_type != "none":
-        return translated, rule_type, confidence
-        
-    # Try morphological analysis
-    analyzed_forms = analyze_morphology(word_lower)
-    for base_form, morph_conf in analyzed_forms:
-        # Try direct translation of base form
-        if base_form in dict_data:
-            return dict_data[base_form], "morphological", morph_conf
-            
-        # Try RBMT rules on base form
-        translated, rule_type, rule_conf = apply_rbmt_rules(base_form, dict_data)
-        if rule_type != "none":
-            return translated, f"morph_{rule_type}", morph_conf * rule_conf
-            
-    # If still no match, try lightweight matching
-    best_match = None
-    best_similarity = 0.0
-    best_word = word_lower
-    
-    for dict_word in dict_data.keys():
-        similarity = ngram_similarity(word_lower, dict_word)
-        if similarity > best_similarity and similarity > 0.7:
-            best_similarity = similarity
-            best_match = dict_data[dict_word]
-            best_word = dict_word
-            
-    if best_match:
-        return best_match, f"fuzzy_{best_word}", best_similarity
-        
-    return word, "none", 0.0
+def resolve_word_types(words: Iterable[str]) -> Dict[str, WordResolution]:
+    """Resolve unique lower-cased Indonesian words stage by stage (see TranslationEngine)."""
+    return ENGINE.resolve_word_types(words)
 
-# Update process_tokens to use the new functions
 def process_tokens(tokens: List[str], source_lang: str, target_lang: str, case_sensitive: bool = False) -> List[Tuple[str, str, str]]:
-    """Process tokens and return (translated_word, match_type, original_word)"""
-    results = []
-    i = 0
-    
-    while i < len(tokens):
-        token = tokens[i]
-        
-        # Preserve non-word tokens exactly
-        if not re.fullmatch(r'\w+', token):
-            results.append((token, "preserved", token))
-            i += 1
-            continue
-            
-        # Try multi-word sequences first (up to 3 words)
-        max_lookahead = min(3, len(tokens) - i)
-        translated = False
-        
-        if source_lang == "id":
-            # Try increasingly smaller sequences
-            for seq_len in range(max_lookahead, 0, -1):
-                phrase_tokens = tokens[i:i + seq_len]
-                if all(re.fullmatch(r'\w+', t) for t in phrase_tokens):
-                    phrase = " ".join(t.lower() for t in phrase_tokens)
-                    
-                    # Check if this phrase exists in dictionary
-                    if phrase in DICTIONARY:
-                        translated_word = DICTIONARY[phrase]
-                        match_type = f"exact_{seq_len}gram"
-                        translated = True
-                        
-                        # Handle first token with translation and case preservation
-                        orig_token = tokens[i]
-                        trans = translated_word
-                        if not case_sensitive:
-                            if orig_token.isupper():
-                                trans = trans.upper()
-                            elif orig_token.istitle():
-                                trans = trans.capitalize()
-                        
-                        results.append((trans, match_type, orig_token))
-                        
-                        # Add empty strings for remaining tokens in phrase
-                        for j in range(1, seq_len):
-                            results.append(("", f"{match_type}_part", tokens[i+j]))
-                            
-                        i += seq_len
-                        break
-                        
-            if not translated:
-                # Single word processing with new pipeline
-                translated_word, match_type, confidence = process_single_word(token, source_lang, DICTIONARY)
-                
-                # Case preservation
-                if not case_sensitive:
-                    if token.isupper():
-                        translated_word = translated_word.upper()
-                    elif token.istitle():
-                        translated_word = translated_word.capitalize()
-                        
-                results.append((translated_word, f"{match_type}_{confidence:.2f}", token))
-                i += 1
-                
-        else:  # target_lang == "id", Dayak to Indonesian
-            # Use reverse dictionary for Dayak to Indonesian
-            if token.lower() in DICTIONARY_REVERSE:
-                candidates = DICTIONARY_REVERSE[token.lower()]
-                translated_word = next(iter(candidates))  # Take first candidate
-                match_type = "reverse"
-            else:
-                translated_word = token
-                match_type = "none"
-                
-            # Case preservation
-            if not case_sensitive:
-                if token.isupper():
-                    translated_word = translated_word.upper()
-                elif token.istitle():
-                    translated_word = translated_word.capitalize()
-                    
-            results.append((translated_word, match_type, token))
-            i += 1
-            
-    return results
+    """Process tokens and return (translated_word, match_type, original_word)."""
+    return ENGINE.process_tokens(tokens, source_lang, target_lang, case_sensitive).as_tuples()
 
-class handler(BaseHTTPRequestHandler):
-    def send_json_response(self, status_code, data):
-        self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+def translate_text(text: str, source_lang: str, target_lang: str, case_sensitive: bool = False,
+                   request_log: Optional[RequestLogger] = None) -> Tuple[str, float, Dict[str, int]]:
+    """Translate text and return (translated_text, confidence, match statistics)."""
+    tokens = tokenize(text)
+    if request_log is not None:
+        request_log.debug("Tokens after tokenization", tokens=tokens)
 
-    def do_POST(self):
-        start_time = datetime.now()
-        request_id = '' # Initialize request_id
-        try:
-            # Check if dictionary is loaded
-            if not DICTIONARY:
-                 error_response = {
-                     "status": "error",
-                     "timestamp": datetime.now().isoformat(),
-                     "error": {
-                         "code": "DICTIONARY_NOT_LOADED",
-                         "message": "Translation dictionary is not loaded."
-                     }
+    # Process translation
+    processed_tokens = ENGINE.process_tokens(
+        tokens,
+        source_lang,
+        target_lang,
+        case_sensitive=case_sensitive
+    )
+
+    if request_log is not None and request_log.detail:
+        request_log.debug("Processed tokens before reconstruction", processedTokens=processed_tokens.as_tuples())
+
+    # Reconstruct translated text and gather statistics
+    return ENGINE.reconstruct(processed_tokens)
+
+def handle_translate_request(body: bytes) -> Tuple[int, dict]:
+    """Translate one raw request body; returns (HTTP status, response object).
+
+    Shared by the serverless handler class and the ASGI app, so both serve the same responses.
+    """
+    start_time = datetime.now()
+    request_id = '' # Initialize request_id
+    try:
+        # Check if dictionary is loaded
+        if not DICTIONARY:
+             error_response = {
+                 "status": "error",
+                 "timestamp": datetime.now().isoformat(),
+                 "error": {
+                     "code": "DICTIONARY_NOT_LOADED",
+                     "message": "Translation dictionary is not loaded."
                  }
-                 self.send_json_response(503, error_response) # Service Unavailable
-                 return
+             }
+             return 503, error_response # Service Unavailable
 
-            content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
-            data = json.loads(body)
-            
-            request_id = data.get('requestId', '')
-            payload = data.get('payload', {})
-            text = payload.get('text', '')
-            source_lang = payload.get('sourceLang', '')
-            target_lang = payload.get('targetLang', '')
-            options = payload.get('options', {})
-            
-            # Input validation
-            if not text:
-                raise ValueError("Text is required")
-            if source_lang not in ['id', 'dyk'] or target_lang not in ['id', 'dyk']:
-                raise ValueError("Invalid language code. Use 'id' for Indonesian or 'dyk' for Dayak")
-            if len(text) > 10000:
-                raise ValueError("Text too long. Maximum length is 10000 characters")
-                
-            # Early return for same language
-            if source_lang == target_lang:
-                response = {
-                    "status": "success",
-                    "requestId": request_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "payload": {
-                        "translatedText": text,
-                        "sourceLang": source_lang,
-                        "targetLang": target_lang,
-                        "confidence": 1.0,
-                        "sourceText": text
-                    },
-                    "metadata": {
-                        "processingTime": "0ms",
-                        "model": "direct-copy",
-                        "exactMatches": 0,
-                        "morphologicalMatches": 0,
-                        "lightweightMatches": 0,
-                        "multiWordMatches": 0,
-                        "synonymRBMTMatches": 0, # Added synonymRBMTMatches
-                        "totalWords": 0
-                    }
-                }
-                self.send_json_response(200, response)
-                return
-              # Split into lines first to preserve line breaks
-            lines = text.splitlines(keepends=True)
-            all_tokens = []
-            
-            for line in lines:
-                # Tokenize each line separately
-                line_tokens = re.findall(r'(\w+|\s+|[^\w\s]+)', line)
-                line_tokens = [token for token in line_tokens if token]
-                all_tokens.extend(line_tokens)
-            
-            tokens = all_tokens
-            print(f"[DEBUG] Tokens after tokenization (with newlines): {tokens}") # Added debug print
-            
-            # Process translation
-            processed_tokens = process_tokens(
-                tokens,
-                source_lang,
-                target_lang,
-                case_sensitive=options.get('caseSensitive', False)
-            )
-            
-            print(f"[DEBUG] Processed tokens before reconstruction: {processed_tokens}") # Added debug print
-            
-            # Reconstruct translated text and gather statistics
-            translated_text = ''
-            word_tokens = []
-            exact_matches = 0
-            morph_matches = 0
-            light_matches = 0
-            multi_word_matches = 0
-            synonym_rbmt_matches = 0 # Added synonym_rbmt_matches counter
-            
-            i = 0
-            while i < len(processed_tokens):
-                token_info = processed_tokens[i]
-                trans_word, match_type, orig_word = token_info
-                  # Add to translated text, preserving original whitespace and newlines
-                if re.fullmatch(r'\w+', orig_word):
-                    translated_text += trans_word
-                else:
-                    # Preserve all types of whitespace exactly
-                    translated_text += orig_word
-                
-                # Count match types
-                if re.fullmatch(r'\w+', orig_word):
-                    word_tokens.append(token_info)
-                    if match_type == "exact":
-                        exact_matches += 1
-                    elif match_type == "synonym_rbmt": # Count synonym RBMT matches
-                        synonym_rbmt_matches += 1
-                    elif match_type == "morphological":
-                        morph_matches += 1
-                    elif match_type == "lightweight":
-                        light_matches += 1
-                    elif match_type.startswith("exact_") and match_type.endswith("gram"):
-                        multi_word_matches += 1
-                        # Skip the empty tokens that are part of this multi-word match
-                        phrase_len = int(match_type[6:-4])  # extract number from "exact_Xgram"
-                        i += phrase_len - 1  # -1 because the loop will increment i
-                i += 1
-            
-            # Calculate confidence
-            total_words = len(word_tokens)
-            confidence = 0.0
-            if total_words > 0:
-                # Include synonym RBMT matches in confidence calculation (same as exact)
-                confidence = (exact_matches + synonym_rbmt_matches + multi_word_matches + 
-                            0.9 * morph_matches + 
-                            0.7 * light_matches) / total_words
-            
-            # Calculate processing time
-            processing_time = (datetime.now() - start_time).total_seconds() * 1000  # in milliseconds
+        data = json.loads(body.decode('utf-8'))
+        
+        request_id = data.get('requestId', '')
+        request_log = RequestLogger(logger, request_id)
+        payload = data.get('payload', {})
+        text = payload.get('text', '')
+        source_lang = payload.get('sourceLang', '')
+        target_lang = payload.get('targetLang', '')
+        options = payload.get('options', {})
+        
+        # Input validation
+        if not text:
+            raise ValueError("Text is required")
+        if source_lang not in ['id', 'dyk'] or target_lang not in ['id', 'dyk']:
+            raise ValueError("Invalid language code. Use 'id' for Indonesian or 'dyk' for Dayak")
+        if len(text) > 10000:
+            raise ValueError("Text too long. Maximum length is 10000 characters")
             
+        # Early return for same language
+        if source_lang == target_lang:
             response = {
                 "status": "success",
                 "requestId": request_id,
                 "timestamp": datetime.now().isoformat(),
                 "payload": {
-                    "translatedText": translated_text,
+                    "translatedText": text,
                     "sourceLang": source_lang,
                     "targetLang": target_lang,
-                    "confidence": confidence,
+                    "confidence": 1.0,
                     "sourceText": text
                 },
                 "metadata": {
-                    "processingTime": f"{processing_time:.0f}ms",
-                    "model": "translator-v8-serverless",
-                    "exactMatches": exact_matches,
-                    "synonymRBMTMatches": synonym_rbmt_matches, # Added synonymRBMTMatches to metadata
-                    "morphologicalMatches": morph_matches,
-                    "lightweightMatches": light_matches,
-                    "multiWordMatches": multi_word_matches,
-                    "totalWords": total_words,
-                    "dictionarySize": len(DICTIONARY),
-                    "reverseDictionarySize": len(DICTIONARY_REVERSE), # Added reverse dictionary size
-                    "inputLength": len(text),
-                    "outputLength": len(translated_text)
+                    "processingTime": "0ms",
+                    "model": "direct-copy",
+                    "exactMatches": 0,
+                    "morphologicalMatches": 0,
+                    "lightweightMatches": 0,
+                    "multiWordMatches": 0,
+                    "synonymRBMTMatches": 0, # Added synonymRBMTMatches
+                    "totalWords": 0
                 }
             }
-            
-            self.send_json_response(200, response)
-            
-        except json.JSONDecodeError:
-            error_response = {
-                "status": "error",
-                "timestamp": datetime.now().isoformat(),
-                "requestId": request_id, # Include request_id in error response
-                "error": {
-                    "code": "INVALID_JSON",
-                    "message": "Invalid JSON in request body"
-                }
+            return 200, response
+
+        translated_text, confidence, statistics = translate_text(
+            text,
+            source_lang,
+            target_lang,
+            case_sensitive=options.get('caseSensitive', False),
+            request_log=request_log
+        )
+        
+        # Calculate processing time
+        processing_time = (datetime.now() - start_time).total_seconds() * 1000  # in milliseconds
+        
+        response = {
+            "status": "success",
+            "requestId": request_id,
+            "timestamp": datetime.now().isoformat(),
+            "payload": {
+                "translatedText": translated_text,
+                "sourceLang": source_lang,
+                "targetLang": target_lang,
+                "confidence": confidence,
+                "sourceText": text
+            },
+            "metadata": {
+                "processingTime": f"{processing_time:.0f}ms",
+                "model": "translator-v8-serverless",
+                **statistics,
+                "dictionarySize": len(DICTIONARY),
+                "reverseDictionarySize": len(DICTIONARY_REVERSE), # Added reverse dictionary size
+                "inputLength": len(text),
+                "outputLength": len(translated_text)
             }
-            self.send_json_response(400, error_response)
-        except ValueError as e:
-            error_response = {
-                "status": "error",
-                "timestamp": datetime.now().isoformat(),
-                "requestId": request_id, # Include request_id in error response
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": str(e)
-                }
+        }
+        
+        request_log.debug("Translation complete", processingTime=response["metadata"]["processingTime"],
+                          sourceLang=source_lang, targetLang=target_lang, inputLength=len(text))
+        return 200, response
+        
+    except json.JSONDecodeError:
+        error_response = {
+            "status": "error",
+            "timestamp": datetime.now().isoformat(),
+            "requestId": request_id, # Include request_id in error response
+            "error": {
+                "code": "INVALID_JSON",
+                "message": "Invalid JSON in request body"
             }
-            self.send_json_response(400, error_response)
-        except Exception as e:
-            error_response = {
-                "status": "error",
-                "timestamp": datetime.now().isoformat(),
-                "requestId": request_id, # Include request_id in error response
-                "error": {
-                    "code": "INTERNAL_SERVER_ERROR",
-                    "message": "An unexpected error occurred",
-                    "details": str(e)
-                }
+        }
+        return 400, error_response
+    except ValueError as e:
+        error_response = {
+            "status": "error",
+            "timestamp": datetime.now().isoformat(),
+            "requestId": request_id, # Include request_id in error response
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": str(e)
+            }
+        }
+        return 400, error_response
+    except Exception as e:
+        RequestLogger(logger, request_id).error("Unhandled error in translate handler", exc_info=True)
+        error_response = {
+            "status": "error",
+            "timestamp": datetime.now().isoformat(),
+            "requestId": request_id, # Include request_id in error response
+            "error": {
+                "code": "INTERNAL_SERVER_ERROR",
+                "message": "An unexpected error occurred",
+                "details": str(e)
             }
-            self.send_json_response(500, error_response)
+        }
+        return 500, error_response
+
+def service_status() -> dict:
+    return {
+        "status": "success",
+        "message": "Dayak Translation API is running",
+        "version": "v8-serverless",
+        "dictionary_status": "loaded" if DICTIONARY else "not_loaded",
+        "dictionary_size": len(DICTIONARY) if DICTIONARY else 0,
+        "reverse_dictionary_size": len(DICTIONARY_REVERSE) if DICTIONARY_REVERSE else 0, # Added reverse dictionary size
+        "timestamp": datetime.now().isoformat()
+    }
+
+JSON_RESPONSE_HEADERS = [
+    ('Content-type', 'application/json'),
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+]
+
+PREFLIGHT_HEADERS = [
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+]
+
+class handler(BaseHTTPRequestHandler):
+    def send_json_response(self, status_code, data):
+        self.send_response(status_code)
+        for name, value in JSON_RESPONSE_HEADERS:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode('utf-8'))
+
+    def do_POST(self):
+        content_length = int(self.headers.get('Content-Length', 0))
+        self.send_json_response(*handle_translate_request(self.rfile.read(content_length)))
+
+    def log_message(self, format, *args):
+        # Route the per-request access line through the queued logger instead of writing stderr inline
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("HTTP access", extra={"fields": {"client": self.address_string(), "line": format % args}})
+
+    def log_error(self, format, *args):
+        logger.warning("HTTP error", extra={"fields": {"client": self.address_string(), "line": format % args}})
 
     def do_OPTIONS(self):
         self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        for name, value in PREFLIGHT_HEADERS:
+            self.send_header(name, value)
         self.end_headers()
 
     def do_GET(self):
-        response = {
-            "status": "success",
-            "message": "Dayak Translation API is running",
-            "version": "v8-serverless",
-            "dictionary_status": "loaded" if DICTIONARY else "not_loaded",
-            "dictionary_size": len(DICTIONARY) if DICTIONARY else 0,
-            "reverse_dictionary_size": len(DICTIONARY_REVERSE) if DICTIONARY_REVERSE else 0, # Added reverse dictionary size
-            "timestamp": datetime.now().isoformat()
-        }
-        self.send_json_response(200, response)
\ No newline at end of file
+        self.send_json_response(200, service_status())
+
+# Request bodies larger than this are translated in a worker thread so the event loop stays responsive
+ASGI_INLINE_MAX_BYTES = int(os.environ.get("ASGI_INLINE_MAX_BYTES", "2048"))
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+    return b''.join(chunks)
+
+async def send_response(send, status_code: int, headers: List[Tuple[str, str]], body: bytes = b'') -> None:
+    await send({
+        'type': 'http.response.start',
+        'status': status_code,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+                   + [(b'content-length', str(len(body)).encode('latin-1'))],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+async def app(scope, receive, send):
+    """ASGI entry point (`uvicorn translate:app --workers N`) serving the same routes as `handler`.
+
+    As with the handler class, every path answers: GET with the service status, POST with a
+    translation and OPTIONS with the CORS preflight. Each uvicorn worker is one process with
+    its own copy of the engine.
+    """
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    method = scope['method']
+    if method == 'POST':
+        body = await read_body(receive)
+        if len(body) > ASGI_INLINE_MAX_BYTES:
+            status_code, data = await asyncio.get_running_loop().run_in_executor(None, handle_translate_request, body)
+        else:
+            status_code, data = handle_translate_request(body)
+    elif method == 'GET':
+        status_code, data = 200, service_status()
+    elif method == 'OPTIONS':
+        await send_response(send, 200, PREFLIGHT_HEADERS)
+        return
+    else:
+        await send_response(send, 501, JSON_RESPONSE_HEADERS, json.dumps({
+            "status": "error",
+            "timestamp": datetime.now().isoformat(),
+            "error": {"code": "METHOD_NOT_ALLOWED", "message": f"Unsupported method {method}"}
+        }).encode('utf-8'))
+        return
+    await send_response(send, status_code, JSON_RESPONSE_HEADERS, json.dumps(data).encode('utf-8'))
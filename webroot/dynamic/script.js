@@ -219,6 +219,93 @@ async function fetchWithErrorHandling(url, options) {
     }
 }
 
+// Incremental translation session for as-you-type editing
+let translationSession = null; // { id, version, lang, sourceText, outputText }
+
+function buildEnvelope(payload) {
+    return {
+        client: "webInterface",
+        requestId: generateRequestId(),
+        timestamp: getTimestamp(),
+        payload: payload
+    };
+}
+
+// Describe the change from oldText to newText as a single range replacement.
+// Offsets are in code points to match the server's string indexing.
+function diffTexts(oldTextValue, newTextValue) {
+    const oldText = Array.from(oldTextValue);
+    const newText = Array.from(newTextValue);
+    let start = 0;
+    const maxPrefix = Math.min(oldText.length, newText.length);
+    while (start < maxPrefix && oldText[start] === newText[start]) {
+        start++;
+    }
+    let oldEnd = oldText.length;
+    let newEnd = newText.length;
+    while (oldEnd > start && newEnd > start && oldText[oldEnd - 1] === newText[newEnd - 1]) {
+        oldEnd--;
+        newEnd--;
+    }
+    return { start: start, end: oldEnd, text: newText.slice(start, newEnd).join('') };
+}
+
+async function openTranslationSession(inputText) {
+    const data = await fetchWithErrorHandling("/translate/session", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(buildEnvelope({
+            sourceLang: currentLang,
+            targetLang: currentLang === "id" ? "dyk" : "id",
+            text: inputText,
+            options: {
+                preserveFormatting: true,
+                preservePunctuation: true,
+                caseSensitive: false
+            }
+        }))
+    });
+    translationSession = {
+        id: data.payload.sessionId,
+        version: data.payload.version,
+        lang: currentLang,
+        sourceText: inputText,
+        outputText: data.payload.text
+    };
+    return translationSession.outputText;
+}
+
+// Send only the edited range; falls back to a fresh session if the server lost track
+async function translateIncrementally(inputText) {
+    const session = translationSession;
+    if (!session || session.lang !== currentLang) {
+        return openTranslationSession(inputText);
+    }
+    if (session.sourceText === inputText) {
+        return session.outputText;
+    }
+    try {
+        const data = await fetchWithErrorHandling(`/translate/session/${session.id}`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(buildEnvelope({
+                baseVersion: session.version,
+                edit: diffTexts(session.sourceText, inputText)
+            }))
+        });
+        const patch = data.payload;
+        session.version = patch.version;
+        session.sourceText = inputText;
+        const output = Array.from(session.outputText);
+        output.splice(patch.start, patch.end - patch.start, patch.text);
+        session.outputText = output.join('');
+        return session.outputText;
+    } catch (error) {
+        translationSession = null;
+        return openTranslationSession(inputText);
+    }
+}
+
 // Updated translation function to use fetchWithErrorHandling
 async function translateText() {
     const inputTextElement = document.getElementById("inputText");
@@ -315,9 +402,15 @@ document.getElementById('inputText').addEventListener('input', (e) => {
 
     translatorLoader.style.display = 'block';
     
-    // Auto-translate after 500ms of no typing
-    translateTimeout = setTimeout(() => {
-        translateText();
+    // Auto-translate after 500ms of no typing, sending only what changed
+    translateTimeout = setTimeout(async () => {
+        try {
+            outputTextElement.textContent = await translateIncrementally(e.target.value);
+        } catch (error) {
+            outputTextElement.textContent = "Error connecting to translation service.";
+        } finally {
+            translatorLoader.style.display = 'none';
+        }
     }, 500);
 });
 
@@ -0,0 +1,150 @@
+"""Admission control for translation requests.
+
+At most ``max_in_flight`` translations run at once; further requests wait in a
+bounded queue ordered by cost (input length), so short inputs are not stuck
+behind near-limit documents. Waiting also ages a request's priority, which
+keeps long inputs from starving under a steady stream of short ones. When the
+queue is full a cheaper newcomer displaces the most expensive waiter, and
+anything that cannot be admitted is rejected with a retry hint derived from
+the recent service time instead of being left to time out.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request is refused because the server is saturated."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request not admitted ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency with a cost-ordered, bounded wait queue."""
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 64, queue_timeout: float = 5.0,
+                 aging_rate: float = 2000.0):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        # Cost units (characters) a waiting request gains per second of waiting
+        self.aging_rate = aging_rate
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.peak_queue_depth = 0
+        self.avg_service_time = 0.0
+        self._queue: List[Tuple[float, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._epoch = time.monotonic()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._queue if not waiter.done())
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog is expected to drain."""
+        service_time = self.avg_service_time or 0.1
+        backlog = self.queue_depth + self.in_flight
+        return max(1, math.ceil(service_time * backlog / self.max_in_flight))
+
+    def _reject(self, reason: str) -> AdmissionRejectedError:
+        self.rejected += 1
+        return AdmissionRejectedError(reason, self.retry_after())
+
+    def _shed_most_expensive(self, priority: float) -> bool:
+        """Drop the costliest waiter if it costs more than priority; True if room was made."""
+        live = [entry for entry in self._queue if not entry[2].done()]
+        if not live:
+            return False
+        worst = max(live)
+        if worst[0] <= priority:
+            return False
+        self._queue.remove(worst)
+        heapq.heapify(self._queue)
+        worst[2].set_exception(self._reject("shed"))
+        self.shed += 1
+        return True
+
+    async def acquire(self, cost: int) -> None:
+        if self.in_flight < self.max_in_flight and self.queue_depth == 0:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        priority = cost + (time.monotonic() - self._epoch) * self.aging_rate
+        if self.queue_depth >= self.max_queue and not self._shed_most_expensive(priority):
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if self._granted(waiter):
+                # Slot was handed over as the timeout fired; keep it
+                self.admitted += 1
+                return
+            if waiter.done():
+                raise waiter.exception()
+            waiter.cancel()
+            self.timed_out += 1
+            raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if self._granted(waiter):
+                self.release()
+            elif not waiter.done():
+                waiter.cancel()
+            raise
+        self.admitted += 1
+
+    @staticmethod
+    def _granted(waiter: asyncio.Future) -> bool:
+        return waiter.done() and not waiter.cancelled() and waiter.exception() is None
+
+    def release(self, service_time: float = 0.0) -> None:
+        if service_time:
+            self.avg_service_time = (
+                service_time if not self.avg_service_time else 0.8 * self.avg_service_time + 0.2 * service_time
+            )
+        # Hand the slot straight to the cheapest live waiter
+        while self._queue:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self, cost: int) -> AsyncIterator[None]:
+        await self.acquire(cost)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def metrics(self) -> Dict[str, float]:
+        return {
+            "inFlight": self.in_flight,
+            "maxInFlight": self.max_in_flight,
+            "queueDepth": self.queue_depth,
+            "maxQueue": self.max_queue,
+            "peakQueueDepth": self.peak_queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "timedOut": self.timed_out,
+            "avgServiceTimeMs": round(self.avg_service_time * 1000, 2),
+            "retryAfter": self.retry_after(),
+        }
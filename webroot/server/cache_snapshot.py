@@ -0,0 +1,82 @@
+"""Warm restarts: snapshot the segment cache and recent inputs on shutdown.
+
+The snapshot is one JSON file, written to a temporary file and renamed over
+the previous one:
+
+    {"format": 1, "timestamp": "D:...",
+     "segments": [{"key": ["id", "dyk", true, false], "dictionaryVersion": "3f2a...",
+                   "entries": [["Selamat pagi\\n", "Slamat lemawa\\n", 2.0, 2], ...]}],
+     "inputs": [{"text": "...", "sourceLang": "id", "targetLang": "dyk",
+                 "options": {...}, "count": 14}]}
+
+Cached lines are grouped by cache key and tagged with the version of the
+lexicon they were translated with; on startup a group is only restored when
+that lexicon still has the same version, so edits or a new dictionary discard
+it. Inputs are the most frequently requested texts, recency breaking ties.
+They do not depend on the dictionary and are replayed through the cascade
+after the restore, which re-warms whatever the restored entries do not cover.
+"""
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+SNAPSHOT_FORMAT = 1
+
+# (text, source language, target language, options serialized with sorted keys)
+InputKey = Tuple[str, str, str, str]
+
+
+class InputLog:
+    """Request inputs with their request counts; the least recently requested are dropped beyond max_inputs."""
+
+    def __init__(self, max_inputs: int = 500):
+        self.max_inputs = max_inputs
+        self._counts: "OrderedDict[InputKey, int]" = OrderedDict()
+
+    def record(self, text: str, source_lang: str, target_lang: str, options: Dict[str, Any], count: int = 1) -> None:
+        key = (text, source_lang, target_lang, json.dumps(options, sort_keys=True))
+        self._counts[key] = self._counts.pop(key, 0) + count
+        while len(self._counts) > self.max_inputs:
+            self._counts.popitem(last=False)
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        """Most requested first; among equal counts, the most recently requested first."""
+        recent_first = reversed(list(self._counts.items()))
+        return [
+            {"text": text, "sourceLang": source_lang, "targetLang": target_lang,
+             "options": json.loads(options), "count": count}
+            for (text, source_lang, target_lang, options), count in sorted(
+                recent_first, key=lambda item: item[1], reverse=True
+            )
+        ]
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+def save_snapshot(path: str, segments: List[Dict[str, Any]], inputs: List[Dict[str, Any]]) -> None:
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({
+            "format": SNAPSHOT_FORMAT,
+            "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+            "segments": segments,
+            "inputs": inputs
+        }, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """The snapshot at path, or None when there is none or it is unreadable or in another format."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
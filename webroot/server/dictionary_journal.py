@@ -0,0 +1,127 @@
+"""Append-only journal of live dictionary edits.
+
+Every edit is appended as one JSON line and fsynced before it is applied:
+
+    {"seq": 12, "word": "kawan", "translation": "sabat", "timestamp": "D:..."}
+
+("translation": null deletes the word). Compaction collapses the journal
+into a snapshot holding the net edit per word, in the order the words were
+last written, and then truncates the journal. The snapshot records the last
+sequence number it covers, so a crash between writing it and truncating the
+journal does not apply any edit twice. Replaying the snapshot and then the
+remaining journal lines in order reproduces the dictionary exactly, entry
+order included.
+
+A record torn by a crash mid-write is cut off the end of the journal on
+load, so later appends follow the last intact record.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# (word, translation or None for a deletion)
+Edit = Tuple[str, Optional[str]]
+
+logger = logging.getLogger(__name__)
+
+
+class DictionaryJournal:
+    """Journal file plus its compacted snapshot (<path>.snapshot.json)."""
+
+    def __init__(self, path: str, compact_every: int = 1000):
+        self.path = path
+        self.snapshot_path = path + ".snapshot.json"
+        self.compact_every = compact_every
+        self.seq = 0
+        self.records = 0
+        self.compactions = 0
+        self._file = None
+
+    def load(self) -> List[Edit]:
+        """Edits to replay over the shards, oldest first; leaves the journal open for appending."""
+        edits: List[Edit] = []
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot["seq"]
+            edits.extend((word, translation) for word, translation in snapshot["edits"])
+        self.seq = snapshot_seq
+        if os.path.exists(self.path):
+            # Byte offset just past the last complete record
+            intact = 0
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        # A record is only complete with its newline: the write was cut short otherwise
+                        if not line.endswith(b"\n"):
+                            raise ValueError("missing newline")
+                        record = json.loads(line) if line.strip() else None
+                    except ValueError:
+                        # Torn final write from a crash; everything before it is intact
+                        break
+                    intact += len(line)
+                    if record is None or record["seq"] <= snapshot_seq:
+                        continue
+                    edits.append((record["word"], record["translation"]))
+                    self.seq = record["seq"]
+                    self.records += 1
+            size = os.path.getsize(self.path)
+            if size > intact:
+                # Cut the torn tail off, or edits appended after it would be unreadable on the next load
+                logger.warning(f"Dictionary journal {self.path}: dropping {size - intact} bytes "
+                               f"of incomplete record after seq {self.seq}")
+                with open(self.path, "r+b") as f:
+                    f.truncate(intact)
+                    f.flush()
+                    os.fsync(f.fileno())
+        self._file = open(self.path, "a", encoding="utf-8")
+        return edits
+
+    def append(self, word: str, translation: Optional[str]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self.seq += 1
+        self._file.write(json.dumps({
+            "seq": self.seq,
+            "word": word,
+            "translation": translation,
+            "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S")
+        }, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records += 1
+
+    @property
+    def due(self) -> bool:
+        return self.records >= self.compact_every
+
+    def compact(self, overlay: Iterable[Edit]) -> None:
+        """Replace snapshot and journal with the net edits (the registry's overlay, in order)."""
+        temporary = self.snapshot_path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"seq": self.seq, "edits": [list(edit) for edit in overlay]}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_path)
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.records = 0
+        self.compactions += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "seq": self.seq,
+            "journalRecords": self.records,
+            "compactEvery": self.compact_every,
+            "compactions": self.compactions
+        }
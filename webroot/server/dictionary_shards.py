@@ -0,0 +1,278 @@
+"""Domain-sharded dictionaries loaded on demand.
+
+A manifest lists the available shards, each a flat JSON object mapping
+Indonesian words to Dayak Kenyah ones:
+
+    {"shards": [
+        {"name": "core", "file": "../dictionary.json", "priority": 0, "default": true},
+        {"name": "agriculture", "file": "agriculture.json", "priority": 20}
+    ]}
+
+Default shards are loaded at startup and stay resident; every other shard is
+read the first time a request selects it. A request's lexicon is its selected
+shards layered over the defaults: where shards define the same source word
+the higher priority wins (manifest order breaks ties), and reverse lookups see
+the entries of higher-priority shards first. Non-default shards and the merged
+lexicons built from them are dropped least recently used first whenever their
+estimated size exceeds the memory cap.
+
+Live edits form an overlay above every shard. An edit is applied in place to
+the default lexicon and to every cached merged lexicon (a replaced or added
+word moves to the end of the entry order), and lexicons merged later apply
+the whole overlay, so the result is the same as replaying the edits in order.
+"""
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, KeysView, List, Optional, Sequence, Tuple, ValuesView
+
+
+class UnknownShardError(KeyError):
+    """Raised when a request selects a shard the manifest does not declare."""
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    name: str
+    path: Path
+    priority: int
+    default: bool
+    order: int
+
+    @property
+    def precedence(self) -> Tuple[int, int]:
+        return (self.priority, self.order)
+
+
+@dataclass
+class Lexicon:
+    """Merged view of one or more shards, as used by the translation cascade."""
+    shards: Tuple[str, ...]
+    entries: Dict[str, str]
+    version: str
+    size: int
+    # Derived lookup tables (e.g. the synonym closure), built lazily by the engine
+    synonym_closure: Optional[dict] = None
+    reverse_entries: Optional[dict] = None
+    reverse_candidates: Optional[dict] = None
+    language_index: Optional[object] = None
+
+    # Live views, so fuzzy matching never scans a stale copy of the vocabulary
+    @property
+    def vocab_source(self) -> KeysView:
+        return self.entries.keys()
+
+    @property
+    def vocab_target(self) -> ValuesView:
+        return self.entries.values()
+
+
+def dictionary_version(entries: Dict[str, str]) -> str:
+    """Content hash; anything derived from a dictionary is only reused for the same content"""
+    return hashlib.sha256(
+        json.dumps(entries, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def edited_version(version: str, word: str, translation: Optional[str]) -> str:
+    """Version after one edit; chained so that the same edits on the same content give the same version"""
+    return hashlib.sha256(
+        json.dumps([version, word, translation], ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def apply_entry(entries: Dict[str, str], word: str, translation: Optional[str]) -> Optional[str]:
+    """Set word (moving it to the end of the entry order) or delete it when translation is None; returns the old value"""
+    previous = entries.pop(word, None)
+    if translation is not None:
+        entries[word] = translation
+    return previous
+
+
+def estimate_size(entries: Dict[str, str]) -> int:
+    """Approximate resident bytes of a shard: the dict plus its key and value strings."""
+    return sys.getsizeof(entries) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in entries.items())
+
+
+def build_lexicon(names: Tuple[str, ...], layers: Sequence[Dict[str, str]]) -> Lexicon:
+    """Merge layers given highest precedence first; earlier layers win and iterate first."""
+    if len(layers) == 1:
+        entries = layers[0]
+    else:
+        entries = {}
+        for layer in layers:
+            for word, translation in layer.items():
+                entries.setdefault(word, translation)
+    # Strings are shared with the shards, so only the container counts
+    return Lexicon(names, entries, dictionary_version(entries), sys.getsizeof(entries))
+
+
+class ShardRegistry:
+    """Loads shards lazily and caches merged lexicons under a memory cap."""
+
+    def __init__(self, manifest_path: Optional[Path], fallback_path: Path, memory_cap: int = 64 * 1024 * 1024,
+                 max_lexicons: int = 16):
+        self.memory_cap = memory_cap
+        self.max_lexicons = max_lexicons
+        self.specs: Dict[str, ShardSpec] = self._read_manifest(manifest_path, fallback_path)
+        self.default_names = tuple(
+            spec.name for spec in sorted(self.specs.values(), key=lambda s: s.precedence, reverse=True) if spec.default
+        )
+        if not self.default_names:
+            raise ValueError("Dictionary manifest declares no default shard")
+        self.loads = 0
+        self.evictions = 0
+        # Live edits above every shard: word -> translation, or None for a deleted word
+        self.overlay: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self.edit_count = 0
+        self._lock = threading.Lock()
+        self._shards: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._shard_sizes: Dict[str, int] = {}
+        self._lexicons: "OrderedDict[Tuple[str, ...], Lexicon]" = OrderedDict()
+        for name in self.default_names:
+            self._load(name)
+        self.default_lexicon = build_lexicon(
+            self.default_names, [self._shards[name] for name in self.default_names]
+        )
+
+    @staticmethod
+    def _read_manifest(manifest_path: Optional[Path], fallback_path: Path) -> Dict[str, ShardSpec]:
+        if manifest_path is None or not manifest_path.exists():
+            return {"core": ShardSpec("core", fallback_path, 0, True, 0)}
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        specs = {}
+        for order, entry in enumerate(manifest.get("shards", [])):
+            name = entry["name"]
+            if name in specs:
+                raise ValueError(f"Shard {name!r} is declared twice in {manifest_path}")
+            specs[name] = ShardSpec(
+                name=name,
+                path=(manifest_path.parent / entry["file"]).resolve(),
+                priority=int(entry.get("priority", 0)),
+                default=bool(entry.get("default", False)),
+                order=order
+            )
+        return specs
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.specs)
+
+    def validate(self, names: Iterable[str]) -> None:
+        unknown = [name for name in names if name not in self.specs]
+        if unknown:
+            raise UnknownShardError(f"Unknown dictionaries: {', '.join(unknown)}. Available: {', '.join(self.specs)}")
+
+    def _load(self, name: str) -> Dict[str, str]:
+        with open(self.specs[name].path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        if not isinstance(entries, dict):
+            raise ValueError(f"Shard {name!r} must be a JSON object of word pairs")
+        self._shards[name] = entries
+        self._shard_sizes[name] = estimate_size(entries)
+        self.loads += 1
+        return entries
+
+    def _resident_bytes(self) -> int:
+        shard_bytes = sum(size for name, size in self._shard_sizes.items() if not self.specs[name].default)
+        return shard_bytes + sum(lexicon.size for lexicon in self._lexicons.values())
+
+    def _enforce_cap(self, keep: Tuple[str, ...]) -> None:
+        """Drop cold lexicons, then cold non-default shards, until under the cap or nothing is evictable."""
+        while len(self._lexicons) > self.max_lexicons or self._resident_bytes() > self.memory_cap:
+            cold_lexicon = next((key for key in self._lexicons if key != keep), None)
+            if cold_lexicon is not None:
+                del self._lexicons[cold_lexicon]
+                continue
+            cold_shard = next(
+                (name for name in self._shards if not self.specs[name].default and name not in keep), None
+            )
+            if cold_shard is None:
+                break
+            del self._shards[cold_shard]
+            del self._shard_sizes[cold_shard]
+            self.evictions += 1
+
+    def lexicon(self, selected: Sequence[str] = ()) -> Lexicon:
+        """Lexicon for the selected shards layered over the defaults (no selection = defaults only)."""
+        if not selected:
+            return self.default_lexicon
+        extra = {name for name in selected if name not in self.default_names}
+        if not extra:
+            return self.default_lexicon
+        self.validate(extra)
+        names = tuple(
+            spec.name for spec in sorted(self.specs.values(), key=lambda s: s.precedence, reverse=True)
+            if spec.default or spec.name in extra
+        )
+        with self._lock:
+            lexicon = self._lexicons.get(names)
+            if lexicon is not None:
+                self._lexicons.move_to_end(names)
+                for name in names:
+                    self._shards.move_to_end(name)
+                return lexicon
+            layers = []
+            for name in names:
+                shard = self._shards.get(name)
+                if shard is None:
+                    shard = self._load(name)
+                else:
+                    self._shards.move_to_end(name)
+                layers.append(shard)
+            lexicon = build_lexicon(names, layers)
+            if self.overlay:
+                for word, translation in self.overlay.items():
+                    apply_entry(lexicon.entries, word, translation)
+                lexicon.version = dictionary_version(lexicon.entries)
+            self._lexicons[names] = lexicon
+            self._enforce_cap(names)
+            return lexicon
+
+    def apply_edit(self, word: str, translation: Optional[str]) -> List[Tuple[Lexicon, Optional[str]]]:
+        """Set word in every live lexicon (None deletes it); returns each changed lexicon with the word's old value.
+
+        Only the entry itself is touched; tables derived from a lexicon are left to the caller.
+        """
+        with self._lock:
+            if word in self.overlay and self.overlay[word] == translation:
+                return []
+            self.overlay.pop(word, None)
+            self.overlay[word] = translation
+            self.edit_count += 1
+            changed = []
+            for lexicon in (self.default_lexicon, *self._lexicons.values()):
+                changed.append((lexicon, apply_entry(lexicon.entries, word, translation)))
+                lexicon.version = edited_version(lexicon.version, word, translation)
+            return changed
+
+    def resident(self) -> Tuple[Dict[str, Dict[str, str]], List[Lexicon]]:
+        """Loaded shards by name and the lexicons built from them, default lexicon first."""
+        with self._lock:
+            return dict(self._shards), [self.default_lexicon, *self._lexicons.values()]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "shards": [
+                    {
+                        "name": spec.name,
+                        "priority": spec.priority,
+                        "default": spec.default,
+                        "loaded": spec.name in self._shards,
+                        "entries": len(self._shards[spec.name]) if spec.name in self._shards else None
+                    }
+                    for spec in self.specs.values()
+                ],
+                "residentBytes": self._resident_bytes(),
+                "memoryCapBytes": self.memory_cap,
+                "cachedLexicons": len(self._lexicons),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "liveEdits": len(self.overlay)
+            }
@@ -0,0 +1,244 @@
+"""Session-scoped incremental re-translation for as-you-type editing.
+
+A session keeps the source document split into lines together with the
+translation of every line. An edit is applied against a known version of the
+document and only the lines it touches are re-translated, so the cost of a
+keystroke tracks the size of the edit rather than the size of the document.
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, List, Optional, Tuple
+
+# (translated text, summed confidence score, number of word tokens)
+SegmentResult = Tuple[str, float, int]
+SegmentTranslator = Callable[[str], Awaitable[SegmentResult]]
+
+
+class SessionNotFoundError(KeyError):
+    """Raised when a session id is unknown or has expired."""
+
+
+class VersionConflictError(Exception):
+    """Raised when an edit targets a version other than the current one."""
+
+    def __init__(self, expected: int, received: int):
+        super().__init__(f"Session is at version {expected}, edit targets version {received}")
+        self.expected = expected
+        self.received = received
+
+
+@dataclass
+class TranslationPatch:
+    """Replacement of translated[start:end] with text, producing version."""
+    version: int
+    start: int
+    end: int
+    text: str
+    segments_retranslated: int
+    segment_cache_hits: int
+
+
+def _ends_with_break(text: str) -> bool:
+    """True if text ends with any line boundary recognised by str.splitlines."""
+    if not text:
+        return False
+    return text.splitlines(True)[-1] != text.splitlines()[-1]
+
+
+class SegmentCache:
+    """Bounded LRU cache of per-line translation results shared by all sessions."""
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, str], SegmentResult]" = OrderedDict()
+
+    def get(self, key: Hashable, segment: str) -> Optional[SegmentResult]:
+        result = self._entries.get((key, segment))
+        if result is not None:
+            self._entries.move_to_end((key, segment))
+        return result
+
+    def put(self, key: Hashable, segment: str, result: SegmentResult) -> None:
+        self._entries[(key, segment)] = result
+        self._entries.move_to_end((key, segment))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard_where(self, predicate: Callable[[Hashable, str], bool]) -> int:
+        """Drop the entries for which predicate(key, segment) holds; returns how many were dropped."""
+        stale = [entry for entry in self._entries if predicate(*entry)]
+        for entry in stale:
+            del self._entries[entry]
+        return len(stale)
+
+    def items(self) -> List[Tuple[Tuple[Hashable, str], SegmentResult]]:
+        """((key, segment), result) pairs, least recently used first."""
+        return list(self._entries.items())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TranslationSession:
+    """A single document being edited, translated line by line."""
+
+    def __init__(self, session_id: str, translate_segment: SegmentTranslator,
+                 cache_key: Hashable, cache: SegmentCache):
+        self.session_id = session_id
+        self.version = 0
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self._translate_segment = translate_segment
+        self._cache_key = cache_key
+        self._cache = cache
+        self._lines: List[str] = []
+        self._results: List[SegmentResult] = []
+        self._length = 0
+
+    @property
+    def length(self) -> int:
+        return self._length
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._lines)
+
+    @property
+    def confidence(self) -> float:
+        score = sum(result[1] for result in self._results)
+        words = sum(result[2] for result in self._results)
+        return score / words if words else 0.0
+
+    @property
+    def translated_text(self) -> str:
+        return "".join(result[0] for result in self._results)
+
+    async def _translate_lines(self, lines: List[str]) -> Tuple[List[SegmentResult], int]:
+        results = []
+        hits = 0
+        for line in lines:
+            result = self._cache.get(self._cache_key, line)
+            if result is None:
+                result = await self._translate_segment(line)
+                self._cache.put(self._cache_key, line, result)
+            else:
+                hits += 1
+            results.append(result)
+        return results, hits
+
+    def _locate(self, offset: int) -> Tuple[int, int]:
+        """Return (line index, line start offset) of the line containing offset."""
+        position = 0
+        for index, line in enumerate(self._lines):
+            line_end = position + len(line)
+            if offset < line_end:
+                return index, position
+            position = line_end
+        return len(self._lines), position
+
+    async def load(self, text: str) -> TranslationPatch:
+        """Replace the whole document, returning a patch from the empty translation."""
+        lines = text.splitlines(True)
+        results, hits = await self._translate_lines(lines)
+        self._lines = lines
+        self._results = results
+        self._length = len(text)
+        self.version += 1
+        return TranslationPatch(
+            version=self.version,
+            start=0,
+            end=0,
+            text="".join(result[0] for result in results),
+            segments_retranslated=len(lines) - hits,
+            segment_cache_hits=hits
+        )
+
+    async def apply_edit(self, base_version: int, start: int, end: int, text: str) -> TranslationPatch:
+        """Replace source[start:end] with text and re-translate only the affected lines."""
+        if base_version != self.version:
+            raise VersionConflictError(self.version, base_version)
+        if not 0 <= start <= end <= self._length:
+            raise ValueError(f"Edit range {start}-{end} is outside the document (length {self._length})")
+
+        first, chunk_start = self._locate(start)
+        # Text added at the very end extends the last line unless that line is already terminated
+        if first == len(self._lines) and self._lines and not _ends_with_break(self._lines[-1]):
+            first -= 1
+            chunk_start -= len(self._lines[first])
+        last = self._locate(end - 1)[0] if end > start else first
+        stop = min(last + 1, len(self._lines))
+
+        # A lone '\r' before the edit may join with a '\n' inserted by it
+        if first > 0 and self._lines[first - 1].endswith("\r"):
+            first -= 1
+            chunk_start -= len(self._lines[first])
+
+        old_chunk = "".join(self._lines[first:stop])
+        chunk = old_chunk[:start - chunk_start] + text + old_chunk[end - chunk_start:]
+
+        # Pull in the following line if the edit removed or split its line break
+        if stop < len(self._lines) and chunk and (not _ends_with_break(chunk) or chunk.endswith("\r")):
+            chunk += self._lines[stop]
+            stop += 1
+
+        new_lines = chunk.splitlines(True)
+        new_results, hits = await self._translate_lines(new_lines)
+
+        translated_start = sum(len(result[0]) for result in self._results[:first])
+        translated_end = translated_start + sum(len(result[0]) for result in self._results[first:stop])
+
+        self._lines[first:stop] = new_lines
+        self._results[first:stop] = new_results
+        self._length += len(text) - (end - start)
+        self.version += 1
+        return TranslationPatch(
+            version=self.version,
+            start=translated_start,
+            end=translated_end,
+            text="".join(result[0] for result in new_results),
+            segments_retranslated=len(new_lines) - hits,
+            segment_cache_hits=hits
+        )
+
+
+class SessionStore:
+    """Bounded registry of live sessions with idle expiry."""
+
+    def __init__(self, max_sessions: int = 1000, idle_timeout: float = 900.0,
+                 cache: Optional[SegmentCache] = None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.cache = cache if cache is not None else SegmentCache()
+        self._sessions: "OrderedDict[str, TranslationSession]" = OrderedDict()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_used >= cutoff and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+    def create(self, translate_segment: SegmentTranslator, cache_key: Hashable) -> TranslationSession:
+        session = TranslationSession(uuid.uuid4().hex, translate_segment, cache_key, self.cache)
+        self._sessions[session.session_id] = session
+        self._expire()
+        return session
+
+    def get(self, session_id: str) -> TranslationSession:
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise SessionNotFoundError(session_id)
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def discard(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,102 @@
+"""Vocabulary-coverage detection of the source language.
+
+Every word of both vocabularies is entered once into a combined membership
+index (word -> bit mask of the languages it belongs to). Detection looks up
+the first words of the input in that index and picks the language covering
+more of them; words known to both languages count for neither. The sample is
+bounded, so detection cost does not grow with the input. Memberships are
+reference-counted per language, so dictionary entries can be added and
+removed without rebuilding the index.
+"""
+import re
+from typing import Dict, NamedTuple, Tuple
+
+INDONESIAN = 1
+DAYAK = 2
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class Detection(NamedTuple):
+    language: str
+    confidence: float
+    sampled_words: int
+    indonesian_hits: int
+    dayak_hits: int
+
+    def as_metadata(self) -> Dict[str, object]:
+        return {
+            "language": self.language,
+            "confidence": round(self.confidence, 4),
+            "sampledWords": self.sampled_words,
+            "indonesianHits": self.indonesian_hits,
+            "dayakHits": self.dayak_hits,
+        }
+
+
+class LanguageIndex:
+    """Word -> bit mask of the languages whose side of the dictionary contains it."""
+
+    def __init__(self):
+        self.masks: Dict[str, int] = {}
+        self._counts: Dict[Tuple[str, int], int] = {}
+
+    def get(self, word: str, default: int = 0) -> int:
+        return self.masks.get(word, default)
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def _update(self, text: str, language: int, delta: int) -> None:
+        for word in WORD_PATTERN.findall(text.lower()):
+            count = self._counts.get((word, language), 0) + delta
+            if count > 0:
+                self._counts[(word, language)] = count
+                self.masks[word] = self.masks.get(word, 0) | language
+                continue
+            self._counts.pop((word, language), None)
+            mask = self.masks.get(word, 0) & ~language
+            if mask:
+                self.masks[word] = mask
+            else:
+                self.masks.pop(word, None)
+
+    def add_entry(self, indonesian: str, dayak: str) -> None:
+        self._update(indonesian, INDONESIAN, 1)
+        self._update(dayak, DAYAK, 1)
+
+    def remove_entry(self, indonesian: str, dayak: str) -> None:
+        self._update(indonesian, INDONESIAN, -1)
+        self._update(dayak, DAYAK, -1)
+
+
+def build_language_index(entries: Dict[str, str]) -> LanguageIndex:
+    """Combined membership index over the words of both sides of a dictionary."""
+    index = LanguageIndex()
+    for indonesian, dayak in entries.items():
+        index.add_entry(indonesian, dayak)
+    return index
+
+
+def detect_language(text: str, index: LanguageIndex, fallback: str = "id",
+                    max_words: int = 64, max_chars: int = 2000) -> Detection:
+    """Pick 'id' or 'dyk' from the words in a prefix of text; fallback (confidence 0) when nothing matches."""
+    indonesian_hits = 0
+    dayak_hits = 0
+    sampled = 0
+    for match in WORD_PATTERN.finditer(text, 0, max_chars):
+        membership = index.get(match.group().lower(), 0)
+        if membership == INDONESIAN:
+            indonesian_hits += 1
+        elif membership == DAYAK:
+            dayak_hits += 1
+        sampled += 1
+        if sampled >= max_words:
+            break
+
+    decided = indonesian_hits + dayak_hits
+    if not decided or indonesian_hits == dayak_hits:
+        return Detection(fallback, 0.5 if decided else 0.0, sampled, indonesian_hits, dayak_hits)
+    if indonesian_hits > dayak_hits:
+        return Detection("id", indonesian_hits / decided, sampled, indonesian_hits, dayak_hits)
+    return Detection("dyk", dayak_hits / decided, sampled, indonesian_hits, dayak_hits)
@@ -1,11 +1,11 @@
-from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, Request, BackgroundTasks, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, Response
 from pathlib import Path
 from pydantic import BaseModel, Field, root_validator, validator
 import json
+import hmac
 import time
 from datetime import datetime
 import os
@@ -14,17 +14,39 @@ import re
 import asyncio
 import torch
 import numpy as np
-from typing import Optional, Dict, List, Any, Union, Tuple
+from array import array
+from typing import Optional, Dict, List, Any, Union, Tuple, Iterable, Set
+from functools import lru_cache
 import uvicorn
 from concurrent.futures import ThreadPoolExecutor
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from admission import AdmissionController, AdmissionRejectedError
+from cache_snapshot import InputLog, load_snapshot, save_snapshot
+from dictionary_journal import DictionaryJournal
+from dictionary_shards import Lexicon, ShardRegistry, UnknownShardError
+from language_detection import Detection, LanguageIndex, build_language_index, detect_language
+from memory_report import (
+    GROUP_BY, deep_size, process_memory, start_tracing, take_snapshot, tensor_report, top_allocations, workers_memory
 )
+from numerals import find_numerals
+from rules import EMPTY_RULES, SynonymMatch, compile_closure, load_rules
+from parallel import ParallelTranslator
+from request_capture import RequestCapture
+from incremental import SessionStore, SessionNotFoundError, VersionConflictError
+from translation_memory import TranslationMemory, WORD_PATTERN
+from serialization import FastJSONResponse, UnsupportedMediaTypeError, decode_body, negotiated_response
+from structured_logging import RequestLogger, configure as configure_logging
+
+# Configure logging: JSON lines written by a background listener, so requests never wait on stderr
+configure_logging("")
 logger = logging.getLogger(__name__)
 
+# Optional allocation tracing for GET /metrics/memory/allocations, started before the dictionary loads so its
+# allocations are attributed; every allocation then costs extra CPU and memory (0 = off)
+MEMORY_TRACE_FRAMES = int(os.environ.get("MEMORY_TRACE_FRAMES", "0"))
+if MEMORY_TRACE_FRAMES > 0:
+    start_tracing(MEMORY_TRACE_FRAMES)
+    logger.info(f"Tracing allocations with {MEMORY_TRACE_FRAMES} frames per traceback")
+
 # Initialize FastAPI with metadata
 app = FastAPI(
     title="Dayak Kenyah Translator API",
@@ -60,18 +82,46 @@ app.mount("/dynamic", StaticFiles(directory=str(DYNAMIC_DIR)), name="dynamic")
 # Thread pool for async processing
 thread_pool = ThreadPoolExecutor(max_workers=4)
 
+# Live editing sessions for incremental re-translation
+translation_sessions = SessionStore(max_sessions=1000, idle_timeout=900.0)
+
+# Admission control: bounded concurrent translations, cost-ordered wait queue, 429 beyond that
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "8")),
+    max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", "64")),
+    queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT", "5.0"))
+)
+
+# Document-parallel mode: long inputs are split and translated in this many worker processes (0/1 = off)
+parallel_translator = ParallelTranslator(
+    max_workers=int(os.environ.get("TRANSLATION_WORKERS", "0")),
+    min_length=int(os.environ.get("PARALLEL_MIN_LENGTH", "2000"))
+)
+
 # Load dictionary with CUDA optimization
 try:
-    with open(DYNAMIC_DIR / "dictionary.json", "r", encoding="utf-8") as f:
-        DICTIONARY = json.load(f)
+    # Domain shards from the manifest; the default shards form the base dictionary, others load on first use
+    manifest_path = Path(os.environ.get("DICTIONARY_MANIFEST", str(DYNAMIC_DIR / "shards" / "manifest.json")))
+    dictionary_shards = ShardRegistry(
+        manifest_path,
+        DYNAMIC_DIR / "dictionary.json",
+        memory_cap=int(float(os.environ.get("DICTIONARY_SHARD_MEMORY_MB", "64")) * 1024 * 1024)
+    )
+    # Live edits made through the dictionary API; the journal is only opened and replayed by the serving
+    # process (replay_dictionary_journal), document-parallel workers import this module too
+    DICTIONARY_JOURNAL_PATH = os.environ.get("DICTIONARY_JOURNAL_PATH", "")
+    dictionary_journal: Optional[DictionaryJournal] = None
+    DEFAULT_LEXICON = dictionary_shards.default_lexicon
+    DICTIONARY = DEFAULT_LEXICON.entries
     if not DICTIONARY:
         raise ValueError("Dictionary is empty")
-        
+
+    # Vocabulary lists are needed by the matching fallback on every device
+    VOCAB_INDO = DEFAULT_LEXICON.vocab_source
+    VOCAB_DAYAK = DEFAULT_LEXICON.vocab_target
+
     if torch.cuda.is_available():
         # Convert dictionary to tensors for CUDA acceleration
-        VOCAB_INDO = list(DICTIONARY.keys())
-        VOCAB_DAYAK = list(DICTIONARY.values())
-        
         # Pad sequences to same length for tensor operations
         max_length_indo = max((len(word) for word in VOCAB_INDO), default=0)
         max_length_dayak = max((len(word) for word in VOCAB_DAYAK), default=0)
@@ -87,12 +137,66 @@ except Exception as e:
     logger.error(f"Failed to load dictionary: {e}")
     raise RuntimeError(f"Failed to initialize translation service: {str(e)}")
 
+# Synonym rules; compiled into a closure once per lexicon
+RULES_PATH = DYNAMIC_DIR / "rules.json"
+try:
+    RULES = load_rules(str(RULES_PATH))
+except FileNotFoundError:
+    logger.warning(f"Rule file {RULES_PATH} not found, synonym rules disabled")
+    RULES = EMPTY_RULES
+
+# Words on either end of a synonym edge; editing one of them can change the closure
+RULE_WORDS = set(RULES.synonyms) | {synonym for edges in RULES.synonyms.values() for synonym, _ in edges}
+
+def synonym_closure(lexicon: Lexicon) -> Dict[str, SynonymMatch]:
+    if lexicon.synonym_closure is None:
+        lexicon.synonym_closure = compile_closure(RULES, lexicon.entries)
+    return lexicon.synonym_closure
+
+synonym_closure(DEFAULT_LEXICON)
+
+def language_index(lexicon: Lexicon) -> LanguageIndex:
+    """Word -> language membership bits over both sides of the lexicon, for sourceLang 'auto'"""
+    if lexicon.language_index is None:
+        lexicon.language_index = build_language_index(lexicon.entries)
+    return lexicon.language_index
+
+language_index(DEFAULT_LEXICON)
+
+# Optional persistent translation memory shared by all workers on this host
+TRANSLATION_MEMORY_PATH = os.environ.get("TRANSLATION_MEMORY_PATH", "")
+translation_memory: Optional[TranslationMemory] = None
+if TRANSLATION_MEMORY_PATH:
+    translation_memory = TranslationMemory(
+        TRANSLATION_MEMORY_PATH,
+        max_entries=int(os.environ.get("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+    )
+    logger.info(f"Translation memory enabled at {TRANSLATION_MEMORY_PATH}")
+
+# Optional warm-restart snapshot of the segment cache and the most requested inputs
+CACHE_SNAPSHOT_PATH = os.environ.get("CACHE_SNAPSHOT_PATH", "")
+CACHE_SNAPSHOT_MAX_SEGMENTS = int(os.environ.get("CACHE_SNAPSHOT_MAX_SEGMENTS", "20000"))
+CACHE_SNAPSHOT_REPLAY_SECONDS = float(os.environ.get("CACHE_SNAPSHOT_REPLAY_SECONDS", "30"))
+input_log: Optional[InputLog] = None
+if CACHE_SNAPSHOT_PATH:
+    input_log = InputLog(max_inputs=int(os.environ.get("CACHE_SNAPSHOT_MAX_INPUTS", "500")))
+
+# Optional sampled capture of /translate requests for tools/replay.py; opened at startup so document-parallel
+# workers, which import this module, do not write to it
+REQUEST_CAPTURE_PATH = os.environ.get("REQUEST_CAPTURE_PATH", "")
+request_capture: Optional[RequestCapture] = None
+
+MAX_TEXT_LENGTH = 10000
+
 class TranslationOptions(BaseModel):
     preserveFormatting: bool = True
     preservePunctuation: bool = True
     caseSensitive: bool = False
     useGPU: bool = True
     batchSize: int = 64
+    includeSourceText: bool = True
+    latencyBudgetMs: Optional[int] = None
+    dictionaries: List[str] = Field(default_factory=list)
     
     @validator('batchSize')
     def validate_batch_size(cls, v):
@@ -100,13 +204,33 @@ class TranslationOptions(BaseModel):
             raise ValueError("Batch size must be between 1 and 512")
         return v
 
+    @validator('latencyBudgetMs')
+    def validate_latency_budget(cls, v):
+        if v is not None and (v < 1 or v > 60000):
+            raise ValueError("Latency budget must be between 1 and 60000 ms")
+        return v
+
+    @validator('dictionaries')
+    def validate_dictionaries(cls, v):
+        try:
+            dictionary_shards.validate(v)
+        except UnknownShardError as e:
+            raise ValueError(e.args[0])
+        return v
+
 class TranslationPayload(BaseModel):
     sourceLang: str
     targetLang: str
     text: str
     options: TranslationOptions = Field(default_factory=TranslationOptions)
     
-    @validator('sourceLang', 'targetLang')
+    @validator('sourceLang')
+    def validate_source_language(cls, v):
+        if v not in ['id', 'dyk', 'auto']:
+            raise ValueError("Source language must be 'id', 'dyk' or 'auto'")
+        return v
+
+    @validator('targetLang')
     def validate_languages(cls, v):
         if v not in ['id', 'dyk']:
             raise ValueError("Language must be either 'id' or 'dyk'")
@@ -116,8 +240,8 @@ class TranslationPayload(BaseModel):
     def validate_text(cls, v):
         if not v.strip():
             raise ValueError("Text cannot be empty")
-        if len(v) > 10000:  # Limit text length to prevent abuse
-            raise ValueError("Text too long. Maximum length is 10000 characters")
+        if len(v) > MAX_TEXT_LENGTH:  # Limit text length to prevent abuse
+            raise ValueError(f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters")
         return v
 
 class ClientRequest(BaseModel):
@@ -129,7 +253,7 @@ class ClientRequest(BaseModel):
 class TranslationResult(BaseModel):
     sourceLang: str
     targetLang: str
-    sourceText: str
+    sourceText: Optional[str]
     translatedText: str
     confidence: float
 
@@ -142,12 +266,51 @@ class ServerResponse(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     error: Optional[Dict[str, Any]] = None
 
+class TextEdit(BaseModel):
+    start: int
+    end: int
+    text: str = ""
+
+    @validator('end')
+    def validate_range(cls, v, values):
+        start = values.get('start')
+        if start is not None and (start < 0 or v < start):
+            raise ValueError("Edit range must satisfy 0 <= start <= end")
+        return v
+
+class SessionEditPayload(BaseModel):
+    baseVersion: int
+    edit: TextEdit
+
+class SessionEditRequest(BaseModel):
+    client: str
+    requestId: str
+    timestamp: str
+    payload: SessionEditPayload
+
+class TranslationPatchResult(BaseModel):
+    sessionId: str
+    version: int
+    start: int
+    end: int
+    text: str
+    confidence: float
+
+class SessionResponse(BaseModel):
+    server: str = "translatorService"
+    requestId: str
+    timestamp: str
+    status: str
+    payload: Optional[TranslationPatchResult]
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[Dict[str, Any]] = None
+
 @app.exception_handler(Exception)
 async def universal_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
-        content=jsonable_encoder({
+        content={
             "server": "translatorService",
             "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
             "status": "error",
@@ -156,7 +319,7 @@ async def universal_exception_handler(request: Request, exc: Exception):
                 "message": "An unexpected error occurred",
                 "details": str(exc)
             }
-        })
+        }
     )
 
 async def cuda_word_match(word: str, vocab_vectors: torch.Tensor, max_length: int, batch_size: int = 64) -> Optional[int]:
@@ -264,192 +427,258 @@ def analyze_morphology(word: str) -> List[str]:
             if len(base) > 1:
                 base_forms.append(base)
     
-    # Common word variations/synonyms
-    synonyms = {
-        'kawan': ['teman', 'sahabat'],
-        'teman': ['kawan', 'sahabat'],
-        'sahabat': ['teman', 'kawan']
-    }
-    
-    # Add synonyms for any base forms we found
-    extended_forms = base_forms.copy()
-    for form in base_forms:
-        if form in synonyms:
-            extended_forms.extend(synonyms[form])
-    
-    return list(set(extended_forms))  # Remove duplicates
+    return list(dict.fromkeys(base_forms))  # Remove duplicates, keeping a stable order across processes
 
-async def process_tokens(tokens: List[str], source_lang: str, target_lang: str, options: TranslationOptions) -> List[Tuple[str, str, str]]:
-    """Processes a list of tokens (words and non-words) and returns translated tokens, match types, and original tokens."""
-    results = []
-    i = 0 # Use an index to iterate through tokens
+class LatencyBudget:
+    """Per-request time budget; words whose morphology/fuzzy stages were skipped or cut short are recorded"""
+
+    # Vocabulary words compared between deadline checks during a fuzzy scan
+    CHECK_INTERVAL = 256
+
+    def __init__(self, budget_ms: int, start_time: Optional[float] = None):
+        self.budget_ms = budget_ms
+        self.start_time = start_time if start_time is not None else time.time()
+        self.deadline = self.start_time + budget_ms / 1000
+        self.degraded_tokens: List[str] = []
+
+    def expired(self) -> bool:
+        return time.time() >= self.deadline
+
+    def degrade(self, token: str) -> None:
+        self.degraded_tokens.append(token)
+
+def find_similar_word(word: str, vocab: List[str], budget: Optional[LatencyBudget] = None) -> Optional[str]:
+    """Best vocabulary word by bigram similarity above 0.7; a spent budget ends the scan early"""
+    best_match = None
+    best_similarity = 0.0
+    for index, vocab_word in enumerate(vocab):
+        if budget is not None and index % LatencyBudget.CHECK_INTERVAL == 0 and budget.expired():
+            budget.degrade(word)
+            break
+        similarity = ngram_similarity(word, vocab_word)
+        if similarity > best_similarity and similarity > 0.7: # Threshold for similarity
+            best_similarity = similarity
+            best_match = vocab_word
+    return best_match
+
+# Match codes, one byte per token
+MATCH_PRESERVED = 0      # whitespace or punctuation
+MATCH_NONE = 1           # word left untranslated
+MATCH_EXACT = 2
+MATCH_MORPHOLOGICAL = 3
+MATCH_LIGHTWEIGHT = 4
+MATCH_REVERSE = 5        # Dayak Kenyah word found by reverse lookup
+MATCH_PHRASE = 6         # any word of a multi-word Dayak Kenyah phrase
+MATCH_NUMERAL = 7        # first word of a number, carrying the whole translated number
+MATCH_NUMERAL_PART = 8   # later words of that number, translated to ""
+# Confidence contributed by each code; reverse and phrase matches count as translated words but score nothing
+MATCH_SCORES = (0.0, 0.0, 1.0, 0.9, 0.7, 0.0, 0.0, 1.0, 0.0)
+
+# (translation, or None to keep the source token; match code)
+WordResolution = Tuple[Optional[str], int]
+
+# Unique words resolved between yields to the event loop (a fuzzy scan costs a few ms per word)
+RESOLVE_BATCH_SIZE = 16
+
+def reverse_entries(lexicon: Lexicon) -> Dict[str, str]:
+    """Dayak Kenyah word or phrase (lower-cased) -> first Indonesian entry translating to it"""
+    if lexicon.reverse_entries is None:
+        # Every Indonesian entry per Dayak Kenyah word, in entry order, so edits can promote the next one
+        candidates: Dict[str, List[str]] = {}
+        for indo_word, dayak_word in lexicon.entries.items():
+            candidates.setdefault(dayak_word.lower(), []).append(indo_word)
+        lexicon.reverse_candidates = candidates
+        lexicon.reverse_entries = {dayak_word: indo_words[0] for dayak_word, indo_words in candidates.items()}
+    return lexicon.reverse_entries
+
+def resolve_word_types(words: Iterable[str], source_lang: str, options: TranslationOptions, lexicon: Lexicon,
+                       budget: Optional[LatencyBudget] = None) -> Tuple[Dict[str, WordResolution], Set[str]]:
+    """Resolve unique lower-cased words stage by stage; each stage only sees what earlier stages left unresolved.
+
+    Indonesian source: exact -> morphology -> synonym rules -> fuzzy. Dayak Kenyah source: exact
+    (reverse lookup) -> fuzzy. Words left out of the result stay untranslated. Also returns the words
+    whose morphology/fuzzy stages were skipped or cut short by the latency budget.
+    """
+    dictionary = lexicon.entries
+    resolved: Dict[str, WordResolution] = {}
+    degraded: Set[str] = set()
 
     if source_lang == "id":
-        source_vocab = VOCAB_INDO
-        target_vocab = VOCAB_DAYAK
-        source_vectors = VOCAB_INDO_VECTORS if torch.cuda.is_available() else None
+        # 1. Exact match
+        pending = []
+        for word in words:
+            if word in dictionary:
+                resolved[word] = (dictionary[word], MATCH_EXACT)
+            else:
+                pending.append(word)
+
+        # 2. Morphological analysis; base forms are kept for the rule stage
+        base_forms: Dict[str, List[str]] = {}
+        for word in pending:
+            if budget is not None and budget.expired():
+                budget.degrade(word)
+                degraded.add(word)
+                continue
+            forms = analyze_morphology(word)
+            form = next((form for form in forms if form in dictionary), None)
+            if form is not None:
+                resolved[word] = (dictionary[form], MATCH_MORPHOLOGICAL)
+            else:
+                base_forms[word] = forms
+
+        # 3. Synonym rules on the base forms (precompiled closure, one lookup per form)
+        closure = synonym_closure(lexicon)
+        pending = []
+        for word, forms in base_forms.items():
+            synonym = next((closure[form] for form in forms if form in closure), None)
+            if synonym is not None:
+                resolved[word] = (synonym.translation, MATCH_MORPHOLOGICAL)
+            else:
+                pending.append(word)
+        fuzzy_vocab = lexicon.vocab_source
     else:
-        source_vocab = VOCAB_DAYAK
-        target_vocab = VOCAB_INDO
-        source_vectors = VOCAB_DAYAK_VECTORS if torch.cuda.is_available() else None
+        # 1. Exact match of the word in the dictionary values
+        reverse = reverse_entries(lexicon)
+        pending = []
+        for word in words:
+            if word in reverse:
+                resolved[word] = (reverse[word], MATCH_REVERSE)
+            else:
+                pending.append(word)
+        fuzzy_vocab = lexicon.vocab_target
 
+    # Last stage: lightweight (fuzzy) matching, using preserveFormatting as a proxy for enabling it
+    if options.preserveFormatting:
+        for word in pending:
+            degraded_before = len(budget.degraded_tokens) if budget is not None else 0
+            best_match = find_similar_word(word, fuzzy_vocab, budget)
+            if budget is not None and len(budget.degraded_tokens) > degraded_before:
+                degraded.add(word)
+            if best_match:
+                if source_lang == "id":
+                    translation = dictionary.get(best_match.lower())
+                else:
+                    translation = reverse_entries(lexicon).get(best_match.lower())
+                resolved[word] = (translation, MATCH_LIGHTWEIGHT)
+
+    return resolved, degraded
+
+def apply_case(translated_word: str, original_word: str, options: TranslationOptions) -> str:
+    if options.caseSensitive:
+        return translated_word
+    if original_word.isupper():
+        return translated_word.upper()
+    if original_word.istitle():
+        return translated_word.capitalize()
+    return translated_word.lower()
+
+async def process_tokens(tokens: List[str], source_lang: str, target_lang: str, options: TranslationOptions,
+                         budget: Optional[LatencyBudget] = None,
+                         word_types: Optional[Dict[str, WordResolution]] = None) -> Tuple[List[str], array]:
+    """Processes a list of tokens (words and non-words) and returns the translated tokens and their match codes.
+
+    Both are parallel to tokens (after numerals may have split a separator token): non-word tokens
+    translate to themselves, and the rest of a multi-word phrase or number to "".
+
+    Numbers (digits or number words) are translated by rule before any dictionary lookup, and
+    their words are not resolved through the cascade.
+
+    Unique word types are resolved once through the staged cascade and every occurrence is
+    materialized from that map, so cost follows vocabulary size rather than token count.
+    They are resolved RESOLVE_BATCH_SIZE at a time, yielding in between, so the caller's task
+    can be cancelled partway through a long line.
+    word_types carries resolutions across calls (e.g. the lines of one request); it must only be
+    shared between calls with the same languages and options.
+
+    With a latency budget, exact and phrase lookups always run; once it is spent the morphology
+    and fuzzy stages are skipped (or a running fuzzy scan is cut short) and the word is recorded
+    as degraded on the budget. Degraded resolutions are not added to word_types.
+    """
+    # Lexicon for the requested dictionary shards (the base dictionary when none are selected)
+    lexicon = dictionary_shards.lexicon(options.dictionaries)
+    if word_types is None:
+        word_types = {}
+
+    tokens, numerals = find_numerals(tokens, source_lang, target_lang)
+    in_numeral: Set[int] = set()
+    for start, numeral in numerals.items():
+        in_numeral.update(range(start, start + numeral.length))
+
+    is_word = [bool(re.fullmatch(r'\w+', token)) for token in tokens]
+    new_words = {
+        token.lower() for index, (token, word) in enumerate(zip(tokens, is_word))
+        if word and index not in in_numeral and token.lower() not in word_types
+    }
+    degraded_types: Dict[str, WordResolution] = {}
+    new_words = list(new_words)
+    for batch_start in range(0, len(new_words), RESOLVE_BATCH_SIZE):
+        if batch_start:
+            # Let other requests run, and a superseded live revision be cancelled, in the middle of a long line
+            await asyncio.sleep(0)
+        batch = new_words[batch_start:batch_start + RESOLVE_BATCH_SIZE]
+        resolved, degraded = resolve_word_types(batch, source_lang, options, lexicon, budget)
+        for word in batch:
+            resolution = resolved.get(word, (None, MATCH_NONE))
+            if word in degraded:
+                degraded_types[word] = resolution
+            else:
+                word_types[word] = resolution
+
+    reverse = reverse_entries(lexicon) if source_lang != "id" else None
+    translations: List[str] = []
+    codes = array('B')
+    i = 0 # Use an index to iterate through tokens
     while i < len(tokens):
         token = tokens[i]
 
         # Handle non-word tokens directly
-        if not re.fullmatch(r'\w+', token):
-            results.append((token, "none", token))
+        if not is_word[i]:
+            translations.append(token)
+            codes.append(MATCH_PRESERVED)
             i += 1
             continue
 
-        # It's a word token, try to translate
-        original_word = token
-        word_lower = original_word.lower()
-        translated_word = original_word # Default to original word
-        match_type = "none"
-
-        if source_lang == "id":
-            # --- Indonesian to Dayak Kenyah ---
-            # 1. Exact Match Lookup (Case-insensitive)
-            if word_lower in DICTIONARY:
-                translated_word = DICTIONARY[word_lower]
-                match_type = "exact"
-            else:
-                # 2. Morphological Analysis and Dictionary Lookup
-                possible_forms = analyze_morphology(original_word)
-                for form in possible_forms:
-                    if form in DICTIONARY:
-                        translated_word = DICTIONARY[form]
-                        match_type = "morphological"
-                        break # Use the first morphological match found
-
-                # 3. Lightweight Matching Fallback (if enabled and no exact/morphological match)
-                if match_type == "none" and options.preserveFormatting: # Using preserveFormatting as a proxy for enabling lightweight matching for now
-                     best_match = None
-                     best_similarity = 0.0
-
-                     # Search in the source vocabulary for similar words
-                     vocab_to_search = source_vocab
-
-                     for vocab_word in vocab_to_search:
-                         similarity = ngram_similarity(original_word, vocab_word)
-                         if similarity > best_similarity and similarity > 0.7: # Threshold for similarity
-                             best_similarity = similarity
-                             best_match = vocab_word
-
-                     if best_match:
-                         # Look up the translation of the best matching source word
-                         translated_word = DICTIONARY.get(best_match.lower(), translated_word) # Fallback to original if not found
-                         match_type = "lightweight"
-
-            # Apply case preservation for Indonesian to Dayak Kenyah
-            if not options.caseSensitive:
-                 if original_word.isupper():
-                     translated_word = translated_word.upper()
-                 elif original_word.istitle():
-                     translated_word = translated_word.capitalize()
-                 else:
-                     translated_word = translated_word.lower()
-
-            # Append result for this Indonesian word
-            results.append((translated_word, match_type, original_word))
-            i += 1
+        numeral = numerals.get(i)
+        if numeral is not None:
+            translations.append(apply_case(numeral.translation, token, options))
+            codes.append(MATCH_NUMERAL)
+            # The first token carries the number; its other words and the spaces between them are dropped
+            for k in range(i + 1, i + numeral.length):
+                translations.append("")
+                codes.append(MATCH_NUMERAL_PART if is_word[k] else MATCH_PRESERVED)
+            i += numeral.length
+            continue
 
-        else:
-            # --- Dayak Kenyah to Indonesian ---
-            # Implement cascading word match
-            translated = False
+        # Dayak Kenyah to Indonesian: multi-word phrases (3, then 2 words) take precedence
+        if reverse is not None:
             matched_length = 0
+            for n in (3, 2):
+                if i + n <= len(tokens) and all(is_word[i:i + n]):
+                    phrase = " ".join(t.lower() for t in tokens[i:i + n])
+                    if phrase in reverse:
+                        matched_length = n
+                        break
+            if matched_length:
+                translations.append(apply_case(reverse[phrase], token, options))
+                # Subsequent tokens in a multi-word match get empty string translation
+                translations.extend([""] * (matched_length - 1))
+                codes.extend([MATCH_PHRASE] * matched_length)
+                i += matched_length
+                continue
 
-            # Try matching 3 words, then 2 words, then 1 word
-            for n in range(3, 0, -1): # Try n-grams from 3 down to 1
-                if i + n <= len(tokens):
-                    phrase_tokens = tokens[i : i + n]
-                    # Check if all tokens in the phrase are words before forming phrase string
-                    if all(re.fullmatch(r'\w+', t) for t in phrase_tokens):
-                        phrase = " ".join(t.lower() for t in phrase_tokens)
-
-                        # Look for exact match of the phrase in dictionary values (Dayak Kenyah)
-                        for indo_word, dayak_word in DICTIONARY.items():
-                            if phrase == dayak_word.lower():
-                                translated_word = indo_word
-                                match_type = f"exact_{n}gram"
-                                matched_length = n
-                                translated = True
-                                break # Found a match, break from dictionary search
-                    if translated:
-                        break # Found a multi-word match, exit the n-gram loop
-
-            # If a multi-word exact match was found
-            if translated:
-                 # Append results for all tokens in the matched phrase
-                 for k in range(matched_length):
-                     # Apply case preservation to the translated word for the first token
-                     if k == 0:
-                         processed_translated_word = translated_word
-                         if not options.caseSensitive:
-                              if tokens[i+k].isupper():
-                                  processed_translated_word = translated_word.upper()
-                              elif tokens[i+k].istitle():
-                                   processed_translated_word = translated_word.capitalize()
-                              else:
-                                   processed_translated_word = translated_word.lower()
-                         results.append((processed_translated_word, match_type, tokens[i+k]))
-                     else:
-                         # Subsequent tokens in a multi-word match get empty string translation
-                         results.append(("", match_type, tokens[i+k]))
-                 i += matched_length # Advance index by the number of words in the matched phrase
-
-            # If no multi-word exact match found, try single word lightweight match
-            if not translated:
-                # Process as a single word
-                # 1. Exact Match Lookup (Case-insensitive) - already covered by n=1 in cascading, but keeping for clarity/fallback
-                single_word_translated = False
-                if word_lower in DICTIONARY.values(): # Check if the single word exists as a Dayak Kenyah word
-                     for indo_word, dayak_word in DICTIONARY.items():
-                         if word_lower == dayak_word.lower():
-                             translated_word = indo_word
-                             match_type = "exact"
-                             single_word_translated = True
-                             break
-
-                # 2. Lightweight Matching Fallback (if enabled and no exact match)
-                if not single_word_translated and options.preserveFormatting: # Using preserveFormatting as a proxy
-                     best_match = None
-                     best_similarity = 0.0
-                     # Search in the source vocabulary for similar words
-                     vocab_to_search = source_vocab
-
-                     for vocab_word in vocab_to_search:
-                         similarity = ngram_similarity(original_word, vocab_word)
-                         if similarity > best_similarity and similarity > 0.7: # Threshold for similarity
-                             best_similarity = similarity
-                             best_match = vocab_word
-
-                     if best_match:
-                          # Find the Indonesian word corresponding to the best matching Dayak word
-                          translated_word = next((k for k, v in DICTIONARY.items() if v.lower() == best_match.lower()), translated_word) # Fallback to original if not found
-                          match_type = "lightweight"
-
-                # Apply case preservation for single Dayak Kenyah word
-                if not options.caseSensitive:
-                     if original_word.isupper():
-                         translated_word = translated_word.upper()
-                     elif original_word.istitle():
-                         translated_word = translated_word.capitalize()
-                     else:
-                         translated_word = translated_word.lower()
-
-                # Append result for this single Dayak Kenyah word
-                results.append((translated_word, match_type, original_word))
-                i += 1
-
-    return results
-
-async def translate_text_async(text: str, source_lang: str, target_lang: str, options: TranslationOptions) -> TranslationResult:
-    """Asynchronous translation with CUDA acceleration, formatting preservation, and lightweight matching"""
-    start_time = time.time()
+        word_lower = token.lower()
+        translation, code = degraded_types.get(word_lower) or word_types[word_lower]
+        translated_word = translation if translation is not None else token
+        translations.append(apply_case(translated_word, token, options))
+        codes.append(code)
+        i += 1
 
+    return translations, codes
+
+async def translate_segment_detailed_async(text: str, source_lang: str, target_lang: str, options: TranslationOptions,
+                                          budget: Optional[LatencyBudget] = None,
+                                          word_types: Optional[Dict[str, WordResolution]] = None) -> Tuple[str, float, int, List[Optional[str]]]:
+    """Translate one segment; also returns the case-neutral translation of each word (None = left as is)"""
     # Tokenize using regex to separate words and non-word characters (including spaces and newlines)
     # This regex splits on word boundaries, preserving the delimiters (spaces, punctuation, newlines)
     tokens = re.findall(r'(\w+|\W+)', text)
@@ -458,63 +687,252 @@ async def translate_text_async(text: str, source_lang: str, target_lang: str, op
     tokens = [token for token in tokens if token]
 
     # Process tokens using the refactored function
-    processed_tokens_info = await process_tokens(tokens, source_lang, target_lang, options)
+    translations, codes = await process_tokens(tokens, source_lang, target_lang, options, budget, word_types)
+
+    # Tokens already carry their case (apply_case) and phrase continuations are "", so the text is one join
+    result_text = "".join(translations)
+
+    # Confidence over the words that were translated, and each word's case-neutral translation
+    total_confidence_score = 0.0
+    translatable_tokens_count = 0
+    word_translations: List[Optional[str]] = []
+    for translated_token, code in zip(translations, codes):
+        if code == MATCH_PRESERVED:
+            continue
+        if code == MATCH_NONE:
+            word_translations.append(None)
+            continue
+        if code == MATCH_NUMERAL_PART:
+            word_translations.append("")
+            continue
+        word_translations.append(translated_token if options.caseSensitive else translated_token.lower())
+        translatable_tokens_count += 1
+        total_confidence_score += MATCH_SCORES[code]
+
+    return result_text, total_confidence_score, translatable_tokens_count, word_translations
 
-    # Separate translated words, match types, and original tokens
-    translated_tokens = [result[0] for result in processed_tokens_info]
-    match_types = [result[1] for result in processed_tokens_info]
-    original_tokens_for_reconstruction = [result[2] for result in processed_tokens_info]
+async def translate_segment_async(text: str, source_lang: str, target_lang: str, options: TranslationOptions,
+                                  budget: Optional[LatencyBudget] = None) -> Tuple[str, float, int]:
+    """Translate one segment and return (translated text, confidence score sum, scored token count)"""
+    result_text, total_confidence_score, translatable_tokens_count, _ = await translate_segment_detailed_async(
+        text, source_lang, target_lang, options, budget
+    )
+    return result_text, total_confidence_score, translatable_tokens_count
 
-    # Reconstruct with preserved formatting and case
+def render_word_translations(text: str, word_translations: List[Optional[str]], case_sensitive: bool) -> Optional[str]:
+    """Re-apply stored word translations to a segment with the same words but different case, spacing or punctuation"""
+    if "" in word_translations:
+        # A multi-word number was translated as one; whether it still is depends on the separators
+        # between its words, which the near-match ignores, so the segment has to be translated again
+        return None
     result_text = ""
-    for i, original_token in enumerate(original_tokens_for_reconstruction):
-        translated_token = translated_tokens[i]
-        match_type = match_types[i]
-
-        # If the original token was a word, apply case preservation based on the original token
-        if re.fullmatch(r'\w+', original_token):
-            if options.caseSensitive:
-                 # If caseSensitive is true, the translation should ideally already have the correct case
-                 result_text += translated_token
-            else:
-                 # If caseSensitive is false, try to match the original case of the token
-                 if original_token.isupper():
-                     result_text += translated_token.upper()
-                 elif original_token.istitle():
-                     result_text += translated_token.capitalize()
-                 else:
-                     result_text += translated_token.lower()
+    separator = ""
+    word_index = 0
+    for token in re.findall(r'(\w+|\W+)', text):
+        if not token:
+            continue
+        if not re.fullmatch(r'\w+', token):
+            separator = token
+            continue
+        if word_index >= len(word_translations):
+            return None
+        translated_token = word_translations[word_index]
+        word_index += 1
+        result_text += separator
+        separator = ""
+        if translated_token is None:
+            translated_token = token
+        if case_sensitive:
+            result_text += translated_token
+        elif token.isupper():
+            result_text += translated_token.upper()
+        elif token.istitle():
+            result_text += translated_token.capitalize()
         else:
-            # If the token is not a word (punctuation, space, newline), append it directly
-            result_text += original_token # Use original_token to preserve exact formatting (spaces, newlines, etc.)
+            result_text += translated_token.lower()
+    result_text += separator
+    return result_text if word_index == len(word_translations) else None
 
-    # Calculate confidence based on match types
-    total_confidence_score = 0
+async def translate_line_async(line: str, source_lang: str, target_lang: str, options: TranslationOptions,
+                               budget: Optional[LatencyBudget] = None,
+                               word_types: Optional[Dict[str, WordResolution]] = None) -> Tuple[str, float, int]:
+    """Translate one line, consulting the persistent translation memory before running the cascade"""
+    if translation_memory is None or not WORD_PATTERN.search(line):
+        result_text, total_confidence_score, translatable_tokens_count, _ = await translate_segment_detailed_async(
+            line, source_lang, target_lang, options, budget, word_types
+        )
+        return result_text, total_confidence_score, translatable_tokens_count
+
+    options_key = "|".join(str(part) for part in segment_cache_key(source_lang, target_lang, options))
+    dictionary_version = dictionary_shards.lexicon(options.dictionaries).version
+    # The lookup can wait on the database (another worker's write lock), so keep it off the event loop
+    match = await asyncio.get_running_loop().run_in_executor(
+        thread_pool, translation_memory.lookup, line, dictionary_version, options_key
+    )
+    if match is not None:
+        if match.exact:
+            return match.translated, match.score, match.word_count
+        rendered = render_word_translations(line, match.words, options.caseSensitive)
+        if rendered is not None:
+            return rendered, match.score, match.word_count
+
+    degraded_before = len(budget.degraded_tokens) if budget is not None else 0
+    result_text, total_confidence_score, translatable_tokens_count, word_translations = await translate_segment_detailed_async(
+        line, source_lang, target_lang, options, budget, word_types
+    )
+    if budget is not None and len(budget.degraded_tokens) > degraded_before:
+        # Degraded output is never persisted
+        return result_text, total_confidence_score, translatable_tokens_count
+    translation_memory.record(
+        line, dictionary_version, options_key, result_text, word_translations,
+        total_confidence_score, translatable_tokens_count
+    )
+    return result_text, total_confidence_score, translatable_tokens_count
+
+def segment_cache_key(source_lang: str, target_lang: str, options: TranslationOptions) -> Tuple[Any, ...]:
+    """Key under which per-line results are shared; covers every option that changes the output"""
+    key = (source_lang, target_lang, options.preserveFormatting, options.caseSensitive)
+    if options.dictionaries:
+        key += dictionary_shards.lexicon(options.dictionaries).shards
+    return key
+
+async def translate_lines_async(text: str, source_lang: str, target_lang: str, options: TranslationOptions,
+                                budget: Optional[LatencyBudget] = None) -> Tuple[str, float, int]:
+    """Translate line by line through the shared segment cache, yielding between lines so superseded work can be cancelled"""
+    cache = translation_sessions.cache
+    key = segment_cache_key(source_lang, target_lang, options)
+    # Word types resolved for one line are reused by the rest of the request, until a dictionary edit
+    word_types: Dict[str, WordResolution] = {}
+    edit_count = dictionary_shards.edit_count
+    translated_parts = []
+    total_confidence_score = 0.0
     translatable_tokens_count = 0
+    for line in text.splitlines(True):
+        if dictionary_shards.edit_count != edit_count:
+            word_types = {}
+            edit_count = dictionary_shards.edit_count
+        result = cache.get(key, line)
+        if result is None:
+            degraded_before = len(budget.degraded_tokens) if budget is not None else 0
+            result = await translate_line_async(line, source_lang, target_lang, options, budget, word_types)
+            if budget is None or len(budget.degraded_tokens) == degraded_before:
+                cache.put(key, line, result)
+            await asyncio.sleep(0)
+        translated_parts.append(result[0])
+        total_confidence_score += result[1]
+        translatable_tokens_count += result[2]
+    return "".join(translated_parts), total_confidence_score, translatable_tokens_count
 
-    for match_type in match_types:
-        # Only consider tokens that were words for confidence calculation (match_type is not 'none')
-        if match_type != "none":
-             translatable_tokens_count += 1
-             if match_type == "exact":
-                 total_confidence_score += 1.0
-             elif match_type == "morphological":
-                 total_confidence_score += 0.9 # High confidence for morphological matches
-             elif match_type == "lightweight":
-                 total_confidence_score += 0.7 # Partial credit for lightweight matches
+async def translate_document_async(text: str, source_lang: str, target_lang: str, options: TranslationOptions,
+                                   budget: Optional[LatencyBudget] = None) -> Tuple[str, float, int]:
+    """Translate a whole request body, across worker processes when it is long enough"""
+    if input_log is not None:
+        input_log.record(text, source_lang, target_lang, options.dict())
+    if not parallel_translator.applies_to(text):
+        return await translate_lines_async(text, source_lang, target_lang, options, budget)
+    result_text, total_confidence_score, translatable_tokens_count, degraded_tokens = await parallel_translator.translate(
+        text, source_lang, target_lang, options.dict(),
+        budget.budget_ms if budget is not None else None,
+        budget.start_time if budget is not None else 0.0
+    )
+    if budget is not None:
+        budget.degraded_tokens.extend(degraded_tokens)
+    return result_text, total_confidence_score, translatable_tokens_count
 
+async def translate_text_async(text: str, source_lang: str, target_lang: str, options: TranslationOptions,
+                               budget: Optional[LatencyBudget] = None) -> TranslationResult:
+    """Asynchronous translation with CUDA acceleration, formatting preservation, and lightweight matching"""
+    result_text, total_confidence_score, translatable_tokens_count = await translate_document_async(
+        text, source_lang, target_lang, options, budget
+    )
     confidence = total_confidence_score / translatable_tokens_count if translatable_tokens_count else 0.0
 
     return TranslationResult(
         sourceLang=source_lang,
         targetLang=target_lang,
-        sourceText=text,
+        sourceText=text if options.includeSourceText else None,
         translatedText=result_text,
         confidence=confidence
     )
+
+def translation_metadata(text: str, translated_text: str, source_lang: str, start_time: float,
+                         budget: Optional[LatencyBudget] = None,
+                         detection: Optional[Detection] = None) -> Dict[str, Any]:
+    """Response metadata shared by the /translate variants"""
+    metadata = {
+        "processingTime": f"{(time.time() - start_time) * 1000:.0f}ms",
+        "model": "translator-v8-cuda" if torch.cuda.is_available() else "translator-v8-cpu",
+        "detectedLanguage": source_lang,
+        "gpuUtilization": f"{torch.cuda.memory_allocated() / 1024**2:.2f}MB" if torch.cuda.is_available() else "N/A",
+        "dictionarySize": len(DICTIONARY),
+        "inputLength": len(text),
+        "outputLength": len(translated_text)
+    }
+    if budget is not None:
+        metadata["latencyBudgetMs"] = budget.budget_ms
+        metadata["degraded"] = bool(budget.degraded_tokens)
+        metadata["degradedTokens"] = budget.degraded_tokens
+    if detection is not None:
+        metadata["languageDetection"] = detection.as_metadata()
+    return metadata
+
+def direct_copy_metadata(source_lang: str, detection: Optional[Detection] = None) -> Dict[str, Any]:
+    metadata = {"processingTime": "0ms", "model": "direct-copy", "detectedLanguage": source_lang}
+    if detection is not None:
+        metadata["languageDetection"] = detection.as_metadata()
+    return metadata
+
+def resolve_source_language(source_lang: str, target_lang: str, text: str,
+                            options: TranslationOptions) -> Tuple[str, Optional[Detection]]:
+    """Concrete source language for a request; 'auto' is detected from a prefix of the text"""
+    if source_lang != "auto":
+        return source_lang, None
+    detection = detect_language(
+        text, language_index(dictionary_shards.lexicon(options.dictionaries)),
+        fallback="id" if target_lang == "dyk" else "dyk"
+    )
+    return detection.language, detection
+
+def latency_budget(options: TranslationOptions, start_time: float) -> Optional[LatencyBudget]:
+    return LatencyBudget(options.latencyBudgetMs, start_time) if options.latencyBudgetMs else None
+
 @app.post("/translate", response_model=ServerResponse)
 async def translate(request: ClientRequest, background_tasks: BackgroundTasks) -> ServerResponse:
+    if request_capture is None or not request_capture.sample():
+        return await translate_request(request, background_tasks)
+    arrival = time.time()
+    started = time.perf_counter()
+    status_code = 500
+    translated_text = None
+    try:
+        response = await translate_request(request, background_tasks)
+        status_code = 200
+        translated_text = response.payload.translatedText
+        return response
+    except HTTPException as http_exc:
+        status_code = http_exc.status_code
+        raise
+    finally:
+        request_capture.record(
+            arrival, request.payload.text, request.payload.sourceLang, request.payload.targetLang,
+            request.payload.options.dict(exclude_defaults=True), status_code,
+            (time.perf_counter() - started) * 1000, translated_text
+        )
+
+def overloaded_error(rejected: AdmissionRejectedError) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail={
+            "code": "SERVER_OVERLOADED",
+            "message": "Too many translations in progress",
+            "details": rejected.reason
+        },
+        headers={"Retry-After": str(rejected.retry_after)}
+    )
+
+async def translate_request(request: ClientRequest, background_tasks: BackgroundTasks) -> ServerResponse:
     start_time = time.time()
+    request_log = RequestLogger(logger, request.requestId)
     try:
         # Validate dictionary is loaded
         if not DICTIONARY:
@@ -527,64 +945,65 @@ async def translate(request: ClientRequest, background_tasks: BackgroundTasks) -
                 }
             )
 
+        source_lang, detection = resolve_source_language(
+            request.payload.sourceLang, request.payload.targetLang, request.payload.text, request.payload.options
+        )
+
         # Additional validation
-        if request.payload.sourceLang == request.payload.targetLang:
+        if source_lang == request.payload.targetLang:
             return ServerResponse(
                 requestId=request.requestId,
                 timestamp=datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
                 status="success",
                 payload=TranslationResult(
-                    sourceLang=request.payload.sourceLang,
+                    sourceLang=source_lang,
                     targetLang=request.payload.targetLang,
-                    sourceText=request.payload.text,
+                    sourceText=request.payload.text if request.payload.options.includeSourceText else None,
                     translatedText=request.payload.text,
                     confidence=1.0
                 ),
-                metadata={
-                    "processingTime": "0ms",
-                    "model": "direct-copy",
-                    "detectedLanguage": request.payload.sourceLang
-                }
+                metadata=direct_copy_metadata(source_lang, detection)
             )
 
-        # Process translation asynchronously
+        # Process translation asynchronously, once admitted
+        budget = latency_budget(request.payload.options, start_time)
         try:
-            result = await translate_text_async(
-                request.payload.text,
-                request.payload.sourceLang,
-                request.payload.targetLang,
-                request.payload.options
-            )
-        except Exception as translation_error:
-            logger.error(f"Translation processing error: {str(translation_error)}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail={
-                    "code": "TRANSLATION_PROCESSING_ERROR",
-                    "message": "Failed to process translation",
-                    "details": str(translation_error)
-                }
-            )
+            async with admission.admit(len(request.payload.text)):
+                try:
+                    result = await translate_text_async(
+                        request.payload.text,
+                        source_lang,
+                        request.payload.targetLang,
+                        request.payload.options,
+                        budget
+                    )
+                except Exception as translation_error:
+                    request_log.error("Translation processing error", exc_info=True, error=str(translation_error))
+                    raise HTTPException(
+                        status_code=500,
+                        detail={
+                            "code": "TRANSLATION_PROCESSING_ERROR",
+                            "message": "Failed to process translation",
+                            "details": str(translation_error)
+                        }
+                    )
+        except AdmissionRejectedError as rejected:
+            raise overloaded_error(rejected)
 
-        # Calculate processing time
-        processing_time = time.time() - start_time
-        
         # Build response following plan.md format
+        metadata = translation_metadata(
+            request.payload.text, result.translatedText, source_lang, start_time, budget, detection
+        )
         response = ServerResponse(
             requestId=request.requestId,
             timestamp=datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
             status="success",
             payload=result,
-            metadata={
-                "processingTime": f"{processing_time * 1000:.0f}ms",
-                "model": "translator-v8-cuda" if torch.cuda.is_available() else "translator-v8-cpu",
-                "detectedLanguage": request.payload.sourceLang,
-                "gpuUtilization": f"{torch.cuda.memory_allocated() / 1024**2:.2f}MB" if torch.cuda.is_available() else "N/A",
-                "dictionarySize": len(DICTIONARY),
-                "inputLength": len(request.payload.text),
-                "outputLength": len(result.translatedText) if result else 0
-            }
+            metadata=metadata
         )
+        request_log.debug("Translation complete", processingTime=metadata["processingTime"],
+                          sourceLang=source_lang, targetLang=request.payload.targetLang,
+                          inputLength=len(request.payload.text))
         return response
 
     except HTTPException as http_exc:
@@ -592,7 +1011,7 @@ async def translate(request: ClientRequest, background_tasks: BackgroundTasks) -
         raise http_exc
     except Exception as e:
         # Catch any other unexpected errors and return a 500 response
-        logger.error(f"Unexpected error in translate endpoint: {str(e)}", exc_info=True)
+        request_log.error("Unexpected error in translate endpoint", exc_info=True, error=str(e))
         raise HTTPException(
             status_code=500,
             detail={
@@ -602,6 +1021,788 @@ async def translate(request: ClientRequest, background_tasks: BackgroundTasks) -
             }
         )
 
+DEFAULT_OPTIONS = TranslationOptions()
+
+@lru_cache(maxsize=64)
+def options_from_items(items: Tuple[Tuple[str, Any], ...]) -> TranslationOptions:
+    """Validate an options object once per distinct set of values"""
+    return TranslationOptions(**dict(items))
+
+def options_from_raw(raw_options: Optional[Dict[str, Any]]) -> TranslationOptions:
+    if not raw_options:
+        return DEFAULT_OPTIONS
+    return options_from_items(tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value) for name, value in raw_options.items()
+    )))
+
+def fast_error_content(request_id: str, code: str, message: str, details: Optional[str] = None) -> Dict[str, Any]:
+    error = {"code": code, "message": message}
+    if details is not None:
+        error["details"] = details
+    return {
+        "server": "translatorService",
+        "requestId": request_id,
+        "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        "status": "error",
+        "payload": None,
+        "error": error
+    }
+
+@app.post("/translate/fast")
+async def translate_fast(request: Request) -> Response:
+    """High-throughput variant of /translate with the same envelope.
+
+    The body may be JSON or MessagePack (chosen by Content-Type) and the response is
+    MessagePack when the Accept header asks for it, otherwise orjson-rendered JSON.
+    The envelope is checked by hand rather than through the Pydantic request and
+    response models, and options.includeSourceText=false drops the echoed source text.
+    """
+    start_time = time.time()
+    accept = request.headers.get("accept")
+    request_id = ""
+    try:
+        data = decode_body(await request.body(), request.headers.get("content-type"))
+        if not isinstance(data, dict):
+            raise ValueError("Request body must be an object")
+        request_id = str(data.get("requestId", ""))
+        source_lang, target_lang, text, raw_options = parse_payload_fields(data.get("payload"))
+        options = options_from_raw(raw_options)
+        source_lang, detection = resolve_source_language(source_lang, target_lang, text, options)
+    except UnsupportedMediaTypeError as media_error:
+        return negotiated_response(
+            fast_error_content(request_id, "UNSUPPORTED_MEDIA_TYPE", str(media_error)), accept, status_code=415
+        )
+    except (ValueError, TypeError) as validation_error:
+        return negotiated_response(
+            fast_error_content(request_id, "VALIDATION_ERROR", "Invalid translation request", str(validation_error)),
+            accept, status_code=422
+        )
+
+    if source_lang == target_lang:
+        translated_text, confidence = text, 1.0
+        metadata = direct_copy_metadata(source_lang, detection)
+    else:
+        budget = latency_budget(options, start_time)
+        try:
+            async with admission.admit(len(text)):
+                translated_text, score, count = await translate_document_async(
+                    text, source_lang, target_lang, options, budget
+                )
+        except AdmissionRejectedError as rejected:
+            return negotiated_response(
+                fast_error_content(request_id, "SERVER_OVERLOADED", "Too many translations in progress", rejected.reason),
+                accept, status_code=429, headers={"Retry-After": str(rejected.retry_after)}
+            )
+        except Exception as translation_error:
+            RequestLogger(logger, request_id).error(
+                "Translation processing error", exc_info=True, error=str(translation_error)
+            )
+            return negotiated_response(
+                fast_error_content(request_id, "TRANSLATION_PROCESSING_ERROR", "Failed to process translation",
+                                   str(translation_error)),
+                accept, status_code=500
+            )
+        confidence = score / count if count else 0.0
+        metadata = translation_metadata(text, translated_text, source_lang, start_time, budget, detection)
+
+    payload = {
+        "sourceLang": source_lang,
+        "targetLang": target_lang,
+        "translatedText": translated_text,
+        "confidence": confidence
+    }
+    if options.includeSourceText:
+        payload["sourceText"] = text
+    return negotiated_response({
+        "server": "translatorService",
+        "requestId": request_id,
+        "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        "status": "success",
+        "payload": payload,
+        "metadata": metadata,
+        "error": None
+    }, accept)
+
+def build_session_response(request_id: str, session, patch, start_time: float) -> SessionResponse:
+    """Wrap a session patch in the standard response envelope"""
+    return SessionResponse(
+        requestId=request_id,
+        timestamp=datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        status="success",
+        payload=TranslationPatchResult(
+            sessionId=session.session_id,
+            version=patch.version,
+            start=patch.start,
+            end=patch.end,
+            text=patch.text,
+            confidence=session.confidence
+        ),
+        metadata={
+            "processingTime": f"{(time.time() - start_time) * 1000:.0f}ms",
+            "segmentsTotal": session.segment_count,
+            "segmentsRetranslated": patch.segments_retranslated,
+            "segmentCacheHits": patch.segment_cache_hits,
+            "inputLength": session.length
+        }
+    )
+
+@app.post("/translate/session", response_model=SessionResponse)
+async def create_translation_session(request: ClientRequest) -> SessionResponse:
+    """Open an editing session; the returned patch inserts the full translation into an empty output"""
+    start_time = time.time()
+    target_lang = request.payload.targetLang
+    options = request.payload.options
+    source_lang, _ = resolve_source_language(request.payload.sourceLang, target_lang, request.payload.text, options)
+
+    async def translate_line(line: str) -> Tuple[str, float, int]:
+        if source_lang == target_lang:
+            return line, 1.0, 1
+        return await translate_line_async(line, source_lang, target_lang, options)
+
+    try:
+        async with admission.admit(len(request.payload.text)):
+            session = translation_sessions.create(
+                translate_line,
+                segment_cache_key(source_lang, target_lang, options)
+            )
+            async with session.lock:
+                patch = await session.load(request.payload.text)
+    except AdmissionRejectedError as rejected:
+        raise overloaded_error(rejected)
+    return build_session_response(request.requestId, session, patch, start_time)
+
+@app.post("/translate/session/{session_id}", response_model=SessionResponse)
+async def edit_translation_session(session_id: str, request: SessionEditRequest) -> SessionResponse:
+    """Apply one edit to a session's source text and return the matching patch to its translation"""
+    start_time = time.time()
+    edit = request.payload.edit
+    try:
+        session = translation_sessions.get(session_id)
+    except SessionNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "code": "SESSION_NOT_FOUND",
+                "message": "Translation session does not exist or has expired",
+                "details": session_id
+            }
+        )
+
+    async with session.lock:
+        if session.length - (edit.end - edit.start) + len(edit.text) > MAX_TEXT_LENGTH:
+            raise HTTPException(
+                status_code=422,
+                detail={
+                    "code": "TEXT_TOO_LONG",
+                    "message": f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters",
+                    "details": session_id
+                }
+            )
+        try:
+            # Cost is the size of the edit; only the lines it touches are re-translated
+            async with admission.admit(edit.end - edit.start + len(edit.text)):
+                patch = await session.apply_edit(request.payload.baseVersion, edit.start, edit.end, edit.text)
+        except AdmissionRejectedError as rejected:
+            raise overloaded_error(rejected)
+        except VersionConflictError as conflict:
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "code": "VERSION_CONFLICT",
+                    "message": "Edit does not apply to the current session version",
+                    "details": str(conflict)
+                }
+            )
+        except ValueError as range_error:
+            raise HTTPException(
+                status_code=422,
+                detail={
+                    "code": "INVALID_EDIT_RANGE",
+                    "message": "Edit range is outside the session text",
+                    "details": str(range_error)
+                }
+            )
+    return build_session_response(request.requestId, session, patch, start_time)
+
+@app.delete("/translate/session/{session_id}")
+async def close_translation_session(session_id: str):
+    return {"status": "success", "closed": translation_sessions.discard(session_id)}
+
+def parse_payload_fields(payload: Any, allow_empty: bool = False) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+    """Lightweight validation of a raw translation payload, mirroring TranslationPayload's rules"""
+    if not isinstance(payload, dict):
+        raise ValueError("Payload must be an object")
+    source_lang = payload.get("sourceLang")
+    target_lang = payload.get("targetLang")
+    if source_lang not in ('id', 'dyk', 'auto'):
+        raise ValueError("Source language must be 'id', 'dyk' or 'auto'")
+    if target_lang not in ('id', 'dyk'):
+        raise ValueError("Language must be either 'id' or 'dyk'")
+    text = payload.get("text")
+    if not isinstance(text, str):
+        raise ValueError("Text must be a string")
+    if not allow_empty and not text.strip():
+        raise ValueError("Text cannot be empty")
+    if len(text) > MAX_TEXT_LENGTH:
+        raise ValueError(f"Text too long. Maximum length is {MAX_TEXT_LENGTH} characters")
+    options = payload.get("options")
+    if options is not None and not isinstance(options, dict):
+        raise ValueError("Options must be an object")
+    return source_lang, target_lang, text, options
+
+def parse_live_message(message: Any) -> Tuple[int, str, str, str, Optional[Dict[str, Any]]]:
+    """Lightweight validation of a live-translation message"""
+    if not isinstance(message, dict) or message.get("type", "translate") != "translate":
+        raise ValueError("Message must be an object with type 'translate'")
+    revision = message.get("revision")
+    if not isinstance(revision, int) or isinstance(revision, bool):
+        raise ValueError("Revision must be an integer")
+    return (revision, *parse_payload_fields(message, allow_empty=True))
+
+async def run_live_translation(websocket: WebSocket, revision: int, text: str, source_lang: str,
+                               target_lang: str, options: TranslationOptions) -> None:
+    """Translate one revision and push the result; cancelled if a newer revision arrives first"""
+    start_time = time.time()
+    try:
+        source_lang, _ = resolve_source_language(source_lang, target_lang, text, options)
+        if source_lang == target_lang or not text.strip():
+            translated_text, confidence = text, 1.0 if text.strip() else 0.0
+        else:
+            async with admission.admit(len(text)):
+                translated_text, score, count = await translate_lines_async(text, source_lang, target_lang, options)
+            confidence = score / count if count else 0.0
+    except asyncio.CancelledError:
+        raise
+    except AdmissionRejectedError as rejected:
+        await websocket.send_json({
+            "type": "error",
+            "revision": revision,
+            "error": {
+                "code": "SERVER_OVERLOADED",
+                "message": "Too many translations in progress",
+                "details": rejected.reason,
+                "retryAfter": rejected.retry_after
+            }
+        })
+        return
+    except Exception as translation_error:
+        RequestLogger(logger).error("Live translation error", exc_info=True, revision=revision,
+                                    error=str(translation_error))
+        await websocket.send_json({
+            "type": "error",
+            "revision": revision,
+            "error": {
+                "code": "TRANSLATION_PROCESSING_ERROR",
+                "message": "Failed to process translation",
+                "details": str(translation_error)
+            }
+        })
+        return
+    await websocket.send_json({
+        "type": "result",
+        "revision": revision,
+        "translatedText": translated_text,
+        "confidence": confidence,
+        "sourceLang": source_lang,
+        "processingTime": f"{(time.time() - start_time) * 1000:.0f}ms"
+    })
+
+@app.websocket("/ws/translate")
+async def live_translate(websocket: WebSocket):
+    """Persistent live-translation channel.
+
+    Clients send {"type": "translate", "revision", "sourceLang", "targetLang", "text", "options"}
+    and receive {"type": "result", "revision", ...}. Revisions must increase; a new revision
+    cancels the one still in progress, and older or repeated revisions are ignored.
+    """
+    await websocket.accept()
+    current: Optional[asyncio.Task] = None
+    latest_revision: Optional[int] = None
+    raw_options: Optional[Dict[str, Any]] = None
+    options = TranslationOptions()
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            raw_message = message.get("text")
+            try:
+                if raw_message is None:
+                    raise ValueError("Messages must be JSON text frames")
+                revision, source_lang, target_lang, text, message_options = parse_live_message(json.loads(raw_message))
+                # Options rarely change while typing, so only re-validate when they do
+                if message_options is not None and message_options != raw_options:
+                    options = TranslationOptions(**message_options)
+                    raw_options = message_options
+            except (ValueError, TypeError) as validation_error:
+                await websocket.send_json({
+                    "type": "error",
+                    "revision": None,
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": str(validation_error)
+                    }
+                })
+                continue
+
+            if latest_revision is not None and revision <= latest_revision:
+                continue
+            latest_revision = revision
+            if current is not None and not current.done():
+                current.cancel()
+            current = asyncio.create_task(
+                run_live_translation(websocket, revision, text, source_lang, target_lang, options)
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if current is not None and not current.done():
+            current.cancel()
+
+@app.get("/metrics/admission")
+async def admission_metrics():
+    """Current admission-control state: in-flight, queue depth and rejection counters"""
+    return FastJSONResponse(content=admission.metrics())
+
+def lexicon_memory(lexicon: Lexicon, seen: Set[int]) -> Dict[str, Any]:
+    """Bytes of a lexicon's entries and derived tables; None for a table not built yet"""
+    tables = {
+        "entries": lexicon.entries,
+        "reverseEntries": lexicon.reverse_entries,
+        "reverseCandidates": lexicon.reverse_candidates,
+        "synonymClosure": lexicon.synonym_closure,
+        "languageIndex": lexicon.language_index
+    }
+    return {
+        "shards": list(lexicon.shards),
+        "entries": len(lexicon.entries),
+        "bytes": {name: None if table is None else deep_size(table, seen) for name, table in tables.items()}
+    }
+
+def memory_report() -> Dict[str, Any]:
+    """Deep size of every resident structure, cache occupancy and process memory.
+
+    Structures are measured in the order listed and share one walk, so an object reachable from several of
+    them (a word string, the shared segment cache) is counted under the first and the figures add up.
+    """
+    seen: Set[int] = set()
+    shards, lexicons = dictionary_shards.resident()
+    dictionaries = {
+        "shards": {name: {"entries": len(entries), "bytes": deep_size(entries, seen)} for name, entries in shards.items()},
+        "lexicons": [lexicon_memory(lexicon, seen) for lexicon in lexicons],
+        "liveEditsBytes": deep_size(dictionary_shards.overlay, seen),
+        # Views over the default lexicon's entries, so only their own headers are left to count
+        "vocabularyBytes": deep_size(VOCAB_INDO, seen) + deep_size(VOCAB_DAYAK, seen),
+        "rulesBytes": deep_size(RULES, seen) + deep_size(RULE_WORDS, seen)
+    }
+    cache_info = options_from_items.cache_info()
+    caches = {
+        "segmentCache": {
+            "entries": len(translation_sessions.cache),
+            "maxEntries": translation_sessions.cache.max_entries,
+            "bytes": deep_size(translation_sessions.cache, seen)
+        },
+        "sessions": {
+            "entries": len(translation_sessions),
+            "maxEntries": translation_sessions.max_sessions,
+            "bytes": deep_size(translation_sessions, seen)
+        },
+        # Validated TranslationOptions models; the lru_cache does not expose its entries, so sized from one model
+        "optionsCache": {
+            "entries": cache_info.currsize,
+            "maxEntries": cache_info.maxsize,
+            "estimatedBytes": cache_info.currsize * deep_size(DEFAULT_OPTIONS)
+        }
+    }
+    if translation_memory is not None:
+        # Only the write buffers live in this process; the rows are in SQLite
+        caches["translationMemoryBuffers"] = {"bytes": deep_size(translation_memory, seen)}
+    if input_log is not None:
+        caches["inputLog"] = {
+            "entries": len(input_log),
+            "maxEntries": input_log.max_inputs,
+            "bytes": deep_size(input_log, seen)
+        }
+
+    tensors = {name: globals()[name] for name in ("VOCAB_INDO_VECTORS", "VOCAB_DAYAK_VECTORS") if name in globals()}
+    device = {"device": str(DEVICE), "tensors": tensor_report(tensors)}
+    if torch.cuda.is_available():
+        device["allocatedBytes"] = torch.cuda.memory_allocated()
+        device["reservedBytes"] = torch.cuda.memory_reserved()
+
+    structure_bytes = sum(shard["bytes"] for shard in dictionaries["shards"].values())
+    structure_bytes += sum(sum(filter(None, lexicon["bytes"].values())) for lexicon in dictionaries["lexicons"])
+    structure_bytes += dictionaries["liveEditsBytes"] + dictionaries["vocabularyBytes"] + dictionaries["rulesBytes"]
+    structure_bytes += sum(cache.get("bytes", 0) for cache in caches.values())
+    return {
+        "process": dict(process_memory(), workers=workers_memory(parallel_translator.worker_pids())),
+        "structureBytes": structure_bytes,
+        "dictionaries": dictionaries,
+        "caches": caches,
+        "device": device
+    }
+
+@app.get("/metrics/memory")
+async def memory_metrics(request: Request):
+    """Process RSS, per-structure deep sizes and cache occupancy in bytes (admin only)"""
+    authorize_admin(request, "MEMORY_ADMIN_DISABLED", "Memory admin endpoints are not enabled")
+    start_time = time.time()
+    # The walk is proportional to the lexicon size, so it runs beside the event loop rather than on it
+    report = await asyncio.get_running_loop().run_in_executor(thread_pool, memory_report)
+    report["processingTime"] = f"{(time.time() - start_time) * 1000:.0f}ms"
+    return FastJSONResponse(content=report)
+
+@app.get("/dictionaries")
+async def list_dictionaries():
+    """Dictionary shards that can be selected with options.dictionaries, and their load state"""
+    stats = dictionary_shards.stats()
+    if dictionary_journal is not None:
+        stats["journal"] = dictionary_journal.stats()
+    return FastJSONResponse(content=stats)
+
+# Live dictionary edits; disabled unless an admin token is configured
+DICTIONARY_ADMIN_TOKEN = os.environ.get("DICTIONARY_ADMIN_TOKEN", "")
+
+def validate_entry_text(v: str) -> str:
+    v = v.strip()
+    if not v:
+        raise ValueError("Word and translation cannot be empty")
+    if len(v) > 200:
+        raise ValueError("Word and translation must be at most 200 characters")
+    return v
+
+class DictionaryEntryRequest(BaseModel):
+    word: str
+    translation: str
+
+    _validate_text = validator('word', 'translation', allow_reuse=True)(validate_entry_text)
+
+class DictionaryTranslationRequest(BaseModel):
+    translation: str
+
+    _validate_text = validator('translation', allow_reuse=True)(validate_entry_text)
+
+def authorize_admin(request: Request, disabled_code: str, disabled_message: str) -> None:
+    """Require the admin bearer token; 403 when no token is configured, 401 when it is missing or wrong"""
+    if not DICTIONARY_ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=403,
+            detail={
+                "code": disabled_code,
+                "message": disabled_message,
+                "details": "Set DICTIONARY_ADMIN_TOKEN to enable them"
+            }
+        )
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode("utf-8"), DICTIONARY_ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(
+            status_code=401,
+            detail={
+                "code": "UNAUTHORIZED",
+                "message": "Missing or invalid admin token",
+                "details": "Send Authorization: Bearer <token>"
+            },
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+def authorize_dictionary_edit(request: Request) -> None:
+    authorize_admin(request, "DICTIONARY_EDITS_DISABLED", "Live dictionary edits are not enabled")
+
+def update_derived_tables(lexicon: Lexicon, word: str, previous: Optional[str], translation: Optional[str]) -> None:
+    """Patch a lexicon's lookup tables for one edited entry instead of rebuilding them"""
+    if lexicon.reverse_entries is not None:
+        reverse = lexicon.reverse_entries
+        candidates = lexicon.reverse_candidates
+        if previous is not None:
+            dayak_word = previous.lower()
+            indo_words = candidates[dayak_word]
+            indo_words.remove(word)
+            if indo_words:
+                reverse[dayak_word] = indo_words[0]
+            else:
+                del candidates[dayak_word]
+                del reverse[dayak_word]
+        if translation is not None:
+            # The edited word is now the last entry, so it only wins where it is the sole candidate
+            candidates.setdefault(translation.lower(), []).append(word)
+            reverse.setdefault(translation.lower(), word)
+    if lexicon.language_index is not None:
+        if previous is not None:
+            lexicon.language_index.remove_entry(word, previous)
+        if translation is not None:
+            lexicon.language_index.add_entry(word, translation)
+    if word in RULE_WORDS:
+        # Recompiled on next use; costs the size of the rule set, not of the dictionary
+        lexicon.synonym_closure = None
+
+def segment_touches_words(key: Tuple[Any, ...], segment: str, source_words: Set[str], target_values: Set[str]) -> bool:
+    """Whether a cached line's translation can depend on the edited words, at any stage of the cascade"""
+    source_lang, fuzzy = key[0], key[2]
+    if source_lang == "id":
+        for token in WORD_PATTERN.findall(segment.lower()):
+            if token in source_words or any(form in source_words for form in analyze_morphology(token)):
+                return True
+            if fuzzy and any(ngram_similarity(token, word) > 0.7 for word in source_words):
+                return True
+        return False
+    target_words = {word for value in target_values for word in WORD_PATTERN.findall(value)}
+    for token in WORD_PATTERN.findall(segment.lower()):
+        if token in target_words:
+            return True
+        if fuzzy and any(ngram_similarity(token, value) > 0.7 for value in target_values):
+            return True
+    return False
+
+def apply_dictionary_edit(word: str, translation: Optional[str], persist: bool = True) -> Optional[Dict[str, Any]]:
+    """Set (or with None delete) one entry in every live lexicon; None if that changes nothing.
+
+    The edit is journaled first, then entries and derived tables are patched in place and only
+    the cached lines that can depend on the edited words are dropped. Lexicon versions move on,
+    so translation memory rows recorded before the edit are no longer matched.
+    """
+    if word in dictionary_shards.overlay and dictionary_shards.overlay[word] == translation:
+        return None
+    if persist and dictionary_journal is not None:
+        dictionary_journal.append(word, translation)
+    changed = dictionary_shards.apply_edit(word, translation)
+
+    source_words = ({word} | RULE_WORDS) if word in RULE_WORDS else {word}
+    target_values = {translation.lower()} if translation is not None else set()
+    previous_default = None
+    for lexicon, previous in changed:
+        update_derived_tables(lexicon, word, previous, translation)
+        if previous is not None:
+            target_values.add(previous.lower())
+        if lexicon is DEFAULT_LEXICON:
+            previous_default = previous
+    invalidated = translation_sessions.cache.discard_where(
+        lambda key, segment: segment_touches_words(key, segment, source_words, target_values)
+    )
+
+    if persist:
+        if dictionary_journal is not None and dictionary_journal.due:
+            dictionary_journal.compact(dictionary_shards.overlay.items())
+        if parallel_translator.enabled:
+            parallel_translator.reset(list(dictionary_shards.overlay.items()))
+    return {"previous": previous_default, "invalidatedSegments": invalidated}
+
+def dictionary_edit_response(word: str, translation: Optional[str], edit: Optional[Dict[str, Any]]) -> Response:
+    return FastJSONResponse(content={
+        "status": "success",
+        "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+        "word": word,
+        "translation": translation,
+        "previous": edit["previous"] if edit is not None else translation,
+        "changed": edit is not None,
+        "invalidatedSegments": edit["invalidatedSegments"] if edit is not None else 0,
+        "dictionaryVersion": DEFAULT_LEXICON.version,
+        "dictionarySize": len(DICTIONARY)
+    })
+
+def entry_not_found(word: str) -> HTTPException:
+    return HTTPException(
+        status_code=404,
+        detail={
+            "code": "ENTRY_NOT_FOUND",
+            "message": "Word is not in the dictionary",
+            "details": word
+        }
+    )
+
+@app.post("/dictionary/entries", status_code=201)
+async def add_dictionary_entry(entry: DictionaryEntryRequest, request: Request):
+    """Add a new Indonesian -> Dayak Kenyah entry"""
+    authorize_dictionary_edit(request)
+    word = entry.word.lower()
+    if word in DICTIONARY:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "ENTRY_EXISTS",
+                "message": "Word is already in the dictionary; use PUT to change it",
+                "details": word
+            }
+        )
+    response = dictionary_edit_response(word, entry.translation, apply_dictionary_edit(word, entry.translation))
+    response.status_code = 201
+    return response
+
+@app.put("/dictionary/entries/{word}")
+async def update_dictionary_entry(word: str, entry: DictionaryTranslationRequest, request: Request):
+    """Change the translation of an existing entry"""
+    authorize_dictionary_edit(request)
+    word = word.strip().lower()
+    if word not in DICTIONARY:
+        raise entry_not_found(word)
+    return dictionary_edit_response(word, entry.translation, apply_dictionary_edit(word, entry.translation))
+
+@app.delete("/dictionary/entries/{word}")
+async def delete_dictionary_entry(word: str, request: Request):
+    """Remove an entry"""
+    authorize_dictionary_edit(request)
+    word = word.strip().lower()
+    if word not in DICTIONARY:
+        raise entry_not_found(word)
+    return dictionary_edit_response(word, None, apply_dictionary_edit(word, None))
+
+# Allocations traced up to the end of startup, for sinceStartup comparisons
+startup_allocations = None
+
+@app.get("/metrics/memory/allocations")
+async def memory_allocations(
+    request: Request,
+    limit: int = Query(25, ge=1, le=500),
+    groupBy: str = Query("lineno", pattern=f"^({'|'.join(GROUP_BY)})$"),
+    sinceStartup: bool = False
+):
+    """Top allocation sites from tracemalloc (admin only), optionally as growth since startup"""
+    authorize_admin(request, "MEMORY_ADMIN_DISABLED", "Memory admin endpoints are not enabled")
+    if MEMORY_TRACE_FRAMES <= 0:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "code": "ALLOCATION_TRACING_DISABLED",
+                "message": "Allocation tracing is not enabled",
+                "details": "Restart the server with MEMORY_TRACE_FRAMES set to 1 or more"
+            }
+        )
+    baseline = startup_allocations if sinceStartup else None
+    return FastJSONResponse(content=top_allocations(limit, groupBy, baseline))
+
+@app.on_event("startup")
+async def replay_dictionary_journal():
+    """Apply the journaled live edits before anything is served, cached or handed to workers"""
+    global dictionary_journal
+    if not DICTIONARY_JOURNAL_PATH:
+        return
+    journal = DictionaryJournal(
+        DICTIONARY_JOURNAL_PATH,
+        compact_every=int(os.environ.get("DICTIONARY_JOURNAL_COMPACT_EVERY", "1000"))
+    )
+    for word, translation in journal.load():
+        apply_dictionary_edit(word, translation, persist=False)
+    dictionary_journal = journal
+    # Workers get the edits only through their initializer's overlay, never from the journal
+    parallel_translator.reset(list(dictionary_shards.overlay.items()))
+    logger.info(f"Replayed {len(dictionary_shards.overlay)} live dictionary edits from {DICTIONARY_JOURNAL_PATH}")
+
+@app.on_event("startup")
+async def start_parallel_workers():
+    await parallel_translator.start()
+
+def lexicon_version(key: Tuple[Any, ...]) -> str:
+    """Version of the lexicon behind a segment cache key (its shard names follow the four option fields)"""
+    return dictionary_shards.lexicon(key[4:]).version
+
+@app.on_event("startup")
+async def warm_caches():
+    """Restore cached lines still valid for the current dictionary, then replay the most requested inputs"""
+    if not CACHE_SNAPSHOT_PATH:
+        return
+    snapshot = load_snapshot(CACHE_SNAPSHOT_PATH)
+    if snapshot is None:
+        logger.info(f"No usable cache snapshot at {CACHE_SNAPSHOT_PATH}")
+        return
+    cache = translation_sessions.cache
+    restored = 0
+    discarded = 0
+    for group in snapshot["segments"]:
+        key = tuple(group["key"])
+        try:
+            current = lexicon_version(key) == group["dictionaryVersion"]
+        except UnknownShardError:
+            current = False
+        if not current:
+            discarded += len(group["entries"])
+            continue
+        for segment, translated, score, count in group["entries"]:
+            cache.put(key, segment, (translated, score, count))
+            restored += 1
+
+    # Most requested first, so a replay cut short by the time limit still covers the hottest inputs
+    replayed = []
+    deadline = time.time() + CACHE_SNAPSHOT_REPLAY_SECONDS
+    for entry in snapshot["inputs"]:
+        if time.time() >= deadline:
+            break
+        try:
+            options = TranslationOptions(**entry["options"])
+            await translate_lines_async(entry["text"], entry["sourceLang"], entry["targetLang"], options)
+        except Exception as e:
+            logger.warning(f"Skipping cache replay input: {e}")
+            continue
+        replayed.append(entry)
+    # Counts carry over; recorded least requested first so the ranking is unchanged
+    for entry in reversed(replayed):
+        input_log.record(entry["text"], entry["sourceLang"], entry["targetLang"], entry["options"], entry["count"])
+    logger.info(
+        f"Warmed caches from {CACHE_SNAPSHOT_PATH}: {restored} lines restored, {discarded} stale lines discarded, "
+        f"{len(replayed)}/{len(snapshot['inputs'])} inputs replayed"
+    )
+
+@app.on_event("startup")
+async def record_startup_allocations():
+    """Baseline for sinceStartup, taken once the caches are warm"""
+    global startup_allocations
+    if MEMORY_TRACE_FRAMES > 0:
+        startup_allocations = take_snapshot()
+
+@app.on_event("startup")
+async def open_request_capture():
+    global request_capture
+    if not REQUEST_CAPTURE_PATH:
+        return
+    request_capture = RequestCapture(
+        REQUEST_CAPTURE_PATH,
+        sample_rate=float(os.environ.get("REQUEST_CAPTURE_SAMPLE_RATE", "0.01")),
+        text_mode=os.environ.get("REQUEST_CAPTURE_TEXT", "redacted"),
+        max_bytes=int(float(os.environ.get("REQUEST_CAPTURE_MAX_MB", "100")) * 1024 * 1024),
+        dictionary_version=DEFAULT_LEXICON.version
+    )
+    logger.info(
+        f"Capturing {request_capture.sample_rate:.2%} of /translate requests to {REQUEST_CAPTURE_PATH} "
+        f"(text: {request_capture.text_mode})"
+    )
+
+@app.on_event("shutdown")
+async def save_cache_snapshot():
+    """Write the hottest cached lines, grouped by key and tagged with their lexicon version, and the ranked inputs"""
+    if not CACHE_SNAPSHOT_PATH:
+        return
+    groups: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    hottest = translation_sessions.cache.items()[-CACHE_SNAPSHOT_MAX_SEGMENTS:] if CACHE_SNAPSHOT_MAX_SEGMENTS else []
+    for (key, segment), (translated, score, count) in hottest:
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"key": list(key), "dictionaryVersion": lexicon_version(key), "entries": []}
+        group["entries"].append([segment, translated, score, count])
+    try:
+        save_snapshot(CACHE_SNAPSHOT_PATH, list(groups.values()), input_log.ranked())
+    except OSError as e:
+        logger.error(f"Failed to write cache snapshot to {CACHE_SNAPSHOT_PATH}: {e}")
+        return
+    logger.info(f"Saved {len(hottest)} cached lines and {len(input_log)} inputs to {CACHE_SNAPSHOT_PATH}")
+
+@app.on_event("shutdown")
+async def close_request_capture():
+    if request_capture is not None:
+        logger.info(f"Captured {request_capture.captured} requests to {REQUEST_CAPTURE_PATH}")
+        request_capture.close()
+
+@app.on_event("shutdown")
+async def flush_translation_memory():
+    if translation_memory is not None:
+        translation_memory.close()
+
+@app.on_event("shutdown")
+async def close_dictionary_journal():
+    if dictionary_journal is not None:
+        dictionary_journal.close()
+
+@app.on_event("shutdown")
+async def stop_parallel_workers():
+    parallel_translator.shutdown()
+
 @app.get("/")
 async def root():
     return FileResponse(STATIC_DIR / "index.html")
@@ -0,0 +1,168 @@
+"""Memory accounting for the structures the server keeps resident.
+
+deep_size walks an object graph the way the garbage collector sees it:
+containers, instance dictionaries and slots are followed, while classes,
+modules, functions and event loops are not (they belong to the program, not
+to the structure). Objects are counted once per walk, so a report that
+passes the same `seen` set through several structures attributes shared
+objects -- the word strings the reverse tables share with the dictionary,
+the segment cache every session points at -- to the first structure that
+reaches them, and the per-structure figures add up.
+
+Walking is proportional to the number of objects reached, so a report over
+a large lexicon takes a while; it is meant to be scraped now and then, not
+on every request.
+
+Process memory comes from /proc (Linux) with a getrusage fallback, and the
+allocation view is a thin layer over tracemalloc, which must have been
+started before the allocations of interest were made.
+"""
+import asyncio
+import resource
+import sys
+import tracemalloc
+import types
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Never walked into: shared program state rather than data owned by a structure
+OPAQUE_TYPES = (
+    type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+    types.CodeType, types.FrameType, types.CoroutineType, types.GeneratorType,
+    asyncio.AbstractEventLoop, asyncio.Future
+)
+LEAF_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), memoryview)
+DICT_VIEW_TYPES = (type({}.keys()), type({}.values()), type({}.items()))
+
+GROUP_BY = ("lineno", "filename", "traceback")
+
+
+def _tensor_bytes(tensor: Any) -> int:
+    return tensor.element_size() * tensor.nelement()
+
+
+def deep_size(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """Bytes of obj and everything it references that is not already in seen."""
+    if seen is None:
+        seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, OPAQUE_TYPES):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+        if isinstance(current, LEAF_TYPES):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            stack.extend(current)
+        elif isinstance(current, DICT_VIEW_TYPES):
+            # Live dictionary views (VOCAB_*) only cost their own header once the dict is counted
+            stack.append(current.mapping)
+        elif hasattr(current, "element_size") and hasattr(current, "nelement"):
+            # torch tensors: host storage only; device memory is reported separately
+            if getattr(current, "device", None) is None or current.device.type == "cpu":
+                total += _tensor_bytes(current)
+            continue
+        instance_dict = getattr(current, "__dict__", None)
+        if isinstance(instance_dict, dict):
+            stack.append(instance_dict)
+        for cls in type(current).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if slot not in ("__dict__", "__weakref__") and hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def tensor_report(tensors: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Storage bytes, shape and device of named tensors"""
+    return {
+        name: {
+            "bytes": _tensor_bytes(tensor),
+            "shape": list(tensor.shape),
+            "dtype": str(tensor.dtype),
+            "device": str(tensor.device)
+        }
+        for name, tensor in tensors.items()
+    }
+
+
+def _status_fields(pid: str) -> Dict[str, int]:
+    """VmRSS, VmHWM, ... from /proc/<pid>/status in bytes"""
+    fields = {}
+    with open(f"/proc/{pid}/status", "r", encoding="ascii") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            parts = value.split()
+            if name.startswith("Vm") and len(parts) == 2 and parts[1] == "kB":
+                fields[name] = int(parts[0]) * 1024
+    return fields
+
+
+def process_memory(pid: str = "self") -> Dict[str, Optional[int]]:
+    """Resident and peak resident bytes of a process (peak only, from getrusage, without /proc)"""
+    try:
+        fields = _status_fields(pid)
+        return {"rssBytes": fields.get("VmRSS"), "peakRssBytes": fields.get("VmHWM")}
+    except OSError:
+        if pid != "self":
+            return {"rssBytes": None, "peakRssBytes": None}
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        return {"rssBytes": None, "peakRssBytes": peak if sys.platform == "darwin" else peak * 1024}
+
+
+def workers_memory(pids: Iterable[int]) -> List[Dict[str, Optional[int]]]:
+    return [dict(pid=pid, **process_memory(str(pid))) for pid in pids]
+
+
+def start_tracing(frames: int) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    """Snapshot of live traced allocations, without tracemalloc's own and the import machinery's"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+
+
+def top_allocations(limit: int = 25, group_by: str = "lineno",
+                    baseline: Optional[tracemalloc.Snapshot] = None) -> Dict[str, Any]:
+    """Largest live allocation sites, or the largest growth since baseline when one is given."""
+    snapshot = take_snapshot()
+    if baseline is not None:
+        statistics = snapshot.compare_to(baseline, group_by)
+    else:
+        statistics = snapshot.statistics(group_by)
+    current, peak = tracemalloc.get_traced_memory()
+    top = []
+    for stat in statistics[:limit]:
+        frame = stat.traceback[-1]
+        entry = {
+            "location": f"{frame.filename}:{frame.lineno}" if group_by != "filename" else frame.filename,
+            "bytes": stat.size,
+            "count": stat.count
+        }
+        if baseline is not None:
+            entry["bytesDiff"] = stat.size_diff
+            entry["countDiff"] = stat.count_diff
+        if group_by == "traceback":
+            entry["traceback"] = stat.traceback.format()
+        top.append(entry)
+    return {
+        "tracedBytes": current,
+        "peakTracedBytes": peak,
+        "tracebackFrames": tracemalloc.get_traceback_limit(),
+        "groupBy": group_by,
+        "sinceStartup": baseline is not None,
+        "top": top
+    }
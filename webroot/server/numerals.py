@@ -0,0 +1,250 @@
+"""Numbers translated by rule instead of by dictionary entry.
+
+Indonesian and Dayak Kenyah build numbers the same way, from the units one to
+nine and the words for teens, tens, hundreds, thousands and millions:
+
+    Indonesian    satu .. sembilan   belas  puluh  ratus  ribu  juta
+    Dayak Kenyah  ca' .. pe'en       elas   puluk  ato    ibu   juta
+
+plus the fused Indonesian forms sepuluh, sebelas, seratus, seribu and sejuta
+(Dayak Kenyah writes ten as plain puluk). A run of number words is parsed
+into its value and the value is spelled out in the target language; digit
+strings are spelled out the same way when translating from Indonesian. Values
+from 1 to 999 999 999 are covered (there is no Dayak Kenyah word for a
+billion in the dictionary, nor one for zero); anything else is left to the
+rest of the cascade.
+
+The two server engines tokenize text differently, so runs are found in the
+text the tokens join back to: a run is number words separated by single
+spaces, and it is only taken as far as it parses as one number. A run ending
+inside a separator token (the apostrophe of a final ca') splits that token.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+MAX_VALUE = 999_999_999
+MAX_RUN_WORDS = 16
+# Tokens joined when looking for a run: a word, an apostrophe and a space per run word
+MAX_RUN_TOKENS = 3 * MAX_RUN_WORDS
+
+DIGITS_PATTERN = re.compile(r'[1-9][0-9]{0,8}')
+
+
+class Lexicon(NamedTuple):
+    units: Tuple[str, ...]   # one to nine
+    teen: str
+    ten: str
+    hundred: str
+    thousand: str
+    million: str
+    fused: Dict[str, int]    # single words with their own value: sepuluh, seratus, ...
+
+
+INDONESIAN = Lexicon(
+    units=("satu", "dua", "tiga", "empat", "lima", "enam", "tujuh", "delapan", "sembilan"),
+    teen="belas", ten="puluh", hundred="ratus", thousand="ribu", million="juta",
+    fused={"sepuluh": 10, "sebelas": 11, "seratus": 100, "seribu": 1000, "sejuta": 1000000}
+)
+
+DAYAK = Lexicon(
+    units=("ca'", "dua", "telu", "pat", "lema", "nem", "tujuk", "aya", "pe'en"),
+    teen="elas", ten="puluk", hundred="ato", thousand="ibu", million="juta",
+    fused={"puluk": 10}
+)
+
+LEXICONS = {"id": INDONESIAN, "dyk": DAYAK}
+
+
+def _word_pattern(lexicon: Lexicon) -> "re.Pattern":
+    words = set(lexicon.units) | set(lexicon.fused) | {
+        lexicon.teen, lexicon.ten, lexicon.hundred, lexicon.thousand, lexicon.million
+    }
+    alternation = "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+    return re.compile(rf"(?:{alternation})(?!\w)", re.IGNORECASE)
+
+
+WORD_PATTERNS = {language: _word_pattern(lexicon) for language, lexicon in LEXICONS.items()}
+
+# Lower-cased tokens a run can start with (ca' and pe'en are tokenized without their apostrophe)
+START_TOKENS = {
+    language: frozenset(re.match(r"\w+", word).group() for word in (*lexicon.units, *lexicon.fused))
+    for language, lexicon in LEXICONS.items()
+}
+
+
+def _parse_group(words: Sequence[str], position: int, lexicon: Lexicon) -> Tuple[int, int]:
+    """Value below a thousand starting at position, and the position after it (value 0 if none)"""
+    units = lexicon.units
+    count = len(words)
+    value = 0
+
+    def unit_at(index: int) -> int:
+        return units.index(words[index]) + 1 if index < count and words[index] in units else 0
+
+    # Hundreds
+    if position < count and lexicon.fused.get(words[position]) == 100:
+        value += 100
+        position += 1
+    elif unit_at(position) and position + 1 < count and words[position + 1] == lexicon.hundred:
+        value += 100 * unit_at(position)
+        position += 2
+
+    # Ten and eleven as one word, teens, tens
+    fused = lexicon.fused.get(words[position]) if position < count else None
+    if fused in (10, 11):
+        return value + fused, position + 1
+    unit = unit_at(position)
+    if unit and position + 1 < count and words[position + 1] == lexicon.teen:
+        return value + 10 + unit, position + 2
+    if unit and position + 1 < count and words[position + 1] == lexicon.ten:
+        value += 10 * unit
+        position += 2
+
+    # Units
+    unit = unit_at(position)
+    if unit:
+        value += unit
+        position += 1
+    return value, position
+
+
+def parse_number(words: Sequence[str], language: str) -> Optional[int]:
+    """Value of a complete sequence of lower-cased number words, or None if it is not exactly one number"""
+    lexicon = LEXICONS[language]
+    scales = {lexicon.thousand: 1000, lexicon.million: 1000000}
+    total = 0
+    last_scale = MAX_VALUE + 1
+    position = 0
+    while position < len(words):
+        fused = lexicon.fused.get(words[position])
+        if fused in (1000, 1000000):
+            group, scale = 1, fused
+            position += 1
+        else:
+            group, next_position = _parse_group(words, position, lexicon)
+            if next_position == position:
+                return None
+            position = next_position
+            scale = 1
+            if position < len(words) and words[position] in scales:
+                scale = scales[words[position]]
+                position += 1
+            elif position < len(words):
+                # Only a thousands or millions group can be followed by more words
+                return None
+        if scale >= last_scale:
+            return None
+        total += group * scale
+        last_scale = scale
+    return total if 0 < total <= MAX_VALUE else None
+
+
+def _group_words(value: int, lexicon: Lexicon, language: str) -> List[str]:
+    words = []
+    hundreds, rest = divmod(value, 100)
+    if hundreds:
+        words.extend(["seratus"] if language == "id" and hundreds == 1 else [lexicon.units[hundreds - 1], lexicon.hundred])
+    tens, unit = divmod(rest, 10)
+    if rest == 10:
+        words.append("sepuluh" if language == "id" else lexicon.ten)
+    elif rest == 11 and language == "id":
+        words.append("sebelas")
+    elif tens == 1:
+        words.extend([lexicon.units[unit - 1], lexicon.teen])
+    else:
+        if tens:
+            words.extend([lexicon.units[tens - 1], lexicon.ten])
+        if unit:
+            words.append(lexicon.units[unit - 1])
+    return words
+
+
+def spell_number(value: int, language: str) -> str:
+    """value (1 to MAX_VALUE) written out in words"""
+    lexicon = LEXICONS[language]
+    words = []
+    millions, value = divmod(value, 1000000)
+    thousands, value = divmod(value, 1000)
+    if millions:
+        words.extend(_group_words(millions, lexicon, language) + [lexicon.million])
+    if thousands:
+        if language == "id" and thousands == 1:
+            words.append("seribu")
+        else:
+            words.extend(_group_words(thousands, lexicon, language) + [lexicon.thousand])
+    if value:
+        words.extend(_group_words(value, lexicon, language))
+    return " ".join(words)
+
+
+class Numeral(NamedTuple):
+    value: int
+    translation: str
+    # Tokens the numeral covers, starting with the one it is keyed by
+    length: int
+
+
+def _match_run(text: str, language: str) -> Optional[Tuple[int, int]]:
+    """(value, characters) of the longest number the run of number words at the start of text spells"""
+    pattern = WORD_PATTERNS[language]
+    words = []
+    ends = []
+    position = 0
+    while len(words) < MAX_RUN_WORDS:
+        match = pattern.match(text, position)
+        if match is None:
+            break
+        words.append(match.group().lower())
+        ends.append(match.end())
+        if text[match.end():match.end() + 1] != " ":
+            break
+        position = match.end() + 1
+    for count in range(len(words), 0, -1):
+        value = parse_number(words[:count], language)
+        if value is not None:
+            return value, ends[count - 1]
+    return None
+
+
+def find_numerals(tokens: List[str], source_lang: str, target_lang: str) -> Tuple[List[str], Dict[int, Numeral]]:
+    """Numbers in a token list, keyed by the index of their first token.
+
+    Returns the token list (a copy, when a separator had to be split where a numeral ends) and
+    the numerals found, each translated into target_lang.
+    """
+    numerals: Dict[int, Numeral] = {}
+    if source_lang not in LEXICONS or target_lang not in LEXICONS or source_lang == target_lang:
+        return tokens, numerals
+    starts = START_TOKENS[source_lang]
+    copied = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if source_lang == "id" and token[:1].isdigit() and DIGITS_PATTERN.fullmatch(token):
+            numerals[i] = Numeral(int(token), spell_number(int(token), target_lang), 1)
+            i += 1
+            continue
+        if token.lower() not in starts:
+            i += 1
+            continue
+        run = _match_run("".join(tokens[i:i + MAX_RUN_TOKENS]), source_lang)
+        if run is None:
+            i += 1
+            continue
+        value, characters = run
+        # Walk to the token the run ends in, splitting it if the run ends inside it
+        end = i
+        consumed = 0
+        while consumed < characters:
+            consumed += len(tokens[end])
+            end += 1
+        if consumed > characters:
+            if not copied:
+                tokens = list(tokens)
+                copied = True
+            overshoot = consumed - characters
+            last = tokens[end - 1]
+            tokens[end - 1:end] = [last[:-overshoot], last[-overshoot:]]
+        numerals[i] = Numeral(value, spell_number(value, target_lang), end - i)
+        i = end
+    return tokens, numerals
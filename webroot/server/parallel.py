@@ -0,0 +1,143 @@
+"""Document-parallel translation across worker processes.
+
+A long document is cut into chunks at line ends and sentence ends (after the
+whitespace that follows the terminator), translated concurrently in a process
+pool and stitched back in order. Phrase matching (up to three words) only
+ever spans consecutive word tokens and numbers only span words separated by
+single spaces, so a boundary inside a run of whitespace or punctuation can
+never split either, and translation is otherwise context-free per word: the
+stitched text is identical to a sequential run.
+Confidence is recombined from the per-chunk score sums and word counts, so it
+is weighted by words exactly as for a single pass.
+
+Workers are spawned (not forked) and import the server module themselves,
+each with its own caches; they share the persistent translation memory when
+one is configured. Live dictionary edits are handed to new workers as the
+registry's overlay (workers never open the edit journal); after an edit the
+pool is replaced, and work already submitted finishes on the old workers.
+"""
+import asyncio
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# A line break, or sentence-final punctuation with the whitespace after it
+BOUNDARY_PATTERN = re.compile(r'[.!?]+\s+|\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# (translated text, confidence score sum, scored word count, degraded tokens)
+ChunkResult = Tuple[str, float, int, List[str]]
+
+
+def split_document(text: str, chunks: int, min_chunk_chars: int = 500) -> List[str]:
+    """Cut text at safe boundaries into at most `chunks` pieces of similar length; "".join() restores it."""
+    if chunks <= 1 or len(text) < 2 * min_chunk_chars:
+        return [text]
+    target = max(min_chunk_chars, len(text) // chunks)
+    pieces = []
+    start = 0
+    for match in BOUNDARY_PATTERN.finditer(text):
+        end = match.end()
+        if end - start >= target and len(text) - end >= min_chunk_chars and len(pieces) < chunks - 1:
+            pieces.append(text[start:end])
+            start = end
+    pieces.append(text[start:])
+    return pieces
+
+
+def translate_chunk(chunk: str, source_lang: str, target_lang: str, options: Dict[str, Any],
+                    budget_ms: Optional[int], start_time: float) -> ChunkResult:
+    """Worker entry point: translate one chunk with the server's line pipeline."""
+    import main
+
+    translation_options = main.TranslationOptions(**options)
+    budget = main.LatencyBudget(budget_ms, start_time) if budget_ms else None
+    text, score, count = asyncio.run(
+        main.translate_lines_async(chunk, source_lang, target_lang, translation_options, budget)
+    )
+    return text, score, count, budget.degraded_tokens if budget is not None else []
+
+
+def install_overlay(overlay: List[Tuple[str, Optional[str]]]) -> None:
+    """Worker initializer: bring the worker's dictionary up to the parent's live edits."""
+    import main
+    for word, translation in overlay:
+        main.apply_dictionary_edit(word, translation, persist=False)
+
+
+def warm_up() -> int:
+    """Import the server module in a worker ahead of the first request."""
+    import main
+    return len(main.DICTIONARY)
+
+
+class ParallelTranslator:
+    """Lazily started process pool that translates documents above a length threshold."""
+
+    def __init__(self, max_workers: int, min_length: int = 2000, min_chunk_chars: int = 500):
+        self.max_workers = max_workers
+        self.min_length = min_length
+        self.min_chunk_chars = min_chunk_chars
+        self.documents = 0
+        self.chunks = 0
+        self.overlay: List[Tuple[str, Optional[str]]] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 1
+
+    def applies_to(self, text: str) -> bool:
+        return self.enabled and len(text) >= max(self.min_length, 2 * self.min_chunk_chars)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=install_overlay, initargs=(self.overlay,)
+            )
+        return self._executor
+
+    async def start(self) -> None:
+        """Spawn and warm every worker so the first long document does not pay for imports."""
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, warm_up) for _ in range(self.max_workers)))
+
+    async def translate(self, text: str, source_lang: str, target_lang: str, options: Dict[str, Any],
+                        budget_ms: Optional[int] = None, start_time: float = 0.0) -> ChunkResult:
+        pieces = split_document(text, self.max_workers, self.min_chunk_chars)
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(pool, translate_chunk, piece, source_lang, target_lang, options, budget_ms, start_time)
+            for piece in pieces
+        ))
+        self.documents += 1
+        self.chunks += len(pieces)
+        translated = "".join(result[0] for result in results)
+        score = sum(result[1] for result in results)
+        count = sum(result[2] for result in results)
+        degraded = [token for result in results for token in result[3]]
+        return translated, score, count, degraded
+
+    def worker_pids(self) -> List[int]:
+        """Process ids of the live workers (none before the pool is first used)."""
+        if self._executor is None:
+            return []
+        # ProcessPoolExecutor has no public accessor for its processes
+        return list(getattr(self._executor, "_processes", None) or {})
+
+    def reset(self, overlay: List[Tuple[str, Optional[str]]]) -> None:
+        """Replace the pool so that new work runs with the given dictionary edits."""
+        self.overlay = overlay
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
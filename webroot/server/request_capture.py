@@ -0,0 +1,125 @@
+"""Sampled capture of production /translate requests for offline replay.
+
+A capture file is JSON Lines. Every time the server opens it, a header line
+is appended, followed by one line per sampled request:
+
+    {"type": "capture", "format": 1, "timestamp": "D:...", "text": "redacted", "sampleRate": 0.01,
+     "dictionaryVersion": "3f2a..."}
+    {"time": 1760000000.123, "sourceLang": "id", "targetLang": "dyk", "text": "...",
+     "options": {"caseSensitive": true}, "status": 200, "processingMs": 4.21}
+
+`time` is the wall-clock arrival time, so files appended to by several
+workers or across restarts still replay in arrival order. Options are stored
+without their default values; the client name and request id are never
+stored. How much of the text is kept is configurable:
+
+    full      the text as sent, plus the translatedText returned for it
+    redacted  e-mail addresses, URLs and runs of five or more digits masked
+    shape     every letter replaced by x/X and every digit by 0; spacing,
+              punctuation and length survive, the words do not
+
+Translations are only kept in full mode: a masked text does not translate
+to the masked translation, so there is nothing to compare a replay against.
+Capturing stops once the file reaches its size cap.
+"""
+import json
+import logging
+import os
+import random
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+CAPTURE_FORMAT = 1
+TEXT_MODES = ("full", "redacted", "shape")
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+LONG_NUMBER_PATTERN = re.compile(r"\d{5,}")
+SHAPE_TABLE = {"lower": "x", "upper": "X", "digit": "0"}
+
+logger = logging.getLogger(__name__)
+
+
+def redact_text(text: str) -> str:
+    text = EMAIL_PATTERN.sub("user@example.com", text)
+    text = URL_PATTERN.sub("https://example.com", text)
+    return LONG_NUMBER_PATTERN.sub(lambda match: "0" * len(match.group()), text)
+
+
+def shape_text(text: str) -> str:
+    return "".join(
+        SHAPE_TABLE["digit"] if char.isdigit()
+        else SHAPE_TABLE["upper"] if char.isupper()
+        else SHAPE_TABLE["lower"] if char.isalpha()
+        else char
+        for char in text
+    )
+
+
+class RequestCapture:
+    """Appends a sample of requests to a capture file until it reaches max_bytes."""
+
+    def __init__(self, path: str, sample_rate: float = 0.01, text_mode: str = "redacted",
+                 max_bytes: int = 100 * 1024 * 1024, dictionary_version: str = ""):
+        if text_mode not in TEXT_MODES:
+            raise ValueError(f"Unknown capture text mode {text_mode!r}. Use one of: {', '.join(TEXT_MODES)}")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.text_mode = text_mode
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._size = os.path.getsize(path)
+        self._write({
+            "type": "capture",
+            "format": CAPTURE_FORMAT,
+            "timestamp": datetime.now().strftime("D:%d-%m-%Y#T:%H:%M:%S"),
+            "text": text_mode,
+            "sampleRate": sample_rate,
+            "dictionaryVersion": dictionary_version
+        })
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self.max_bytes
+
+    def sample(self) -> bool:
+        """Whether to capture the request about to be served"""
+        return self._file is not None and not self.full and random.random() < self.sample_rate
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self._file.write(line)
+        self._file.flush()
+        self._size += len(line.encode("utf-8"))
+
+    def record(self, arrival: float, text: str, source_lang: str, target_lang: str, options: Dict[str, Any],
+               status: int, processing_ms: float, translated_text: Optional[str] = None) -> None:
+        if self._file is None or self.full:
+            return
+        if self.text_mode == "redacted":
+            text = redact_text(text)
+        elif self.text_mode == "shape":
+            text = shape_text(text)
+        record = {
+            "time": round(arrival, 3),
+            "sourceLang": source_lang,
+            "targetLang": target_lang,
+            "text": text,
+            "options": options,
+            "status": status,
+            "processingMs": round(processing_ms, 2)
+        }
+        if self.text_mode == "full" and translated_text is not None:
+            record["translatedText"] = translated_text
+        self._write(record)
+        self.captured += 1
+        if self.full:
+            logger.info(f"Request capture {self.path} reached {self.max_bytes} bytes, capturing stopped")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,80 @@
+"""Synonym rules compiled into a per-dictionary closure.
+
+The rule file is versioned JSON:
+
+    {
+        "version": 1,
+        "maxChainLength": 2,
+        "synonyms": {
+            "kawan": [["teman", 0.95]],
+            "sobat": [["teman", 0.9]]
+        }
+    }
+
+Every synonym edge carries a confidence. compile_closure follows chains of at
+most maxChainLength edges from each rule word and keeps, for every word that
+is not a dictionary entry itself, the reachable entry with the highest
+combined (multiplied) confidence, shorter chains winning ties. Applying the
+rules at request time is then a single dict lookup however many rules exist.
+"""
+import json
+from typing import Dict, List, NamedTuple, Tuple
+
+RULES_FORMAT_VERSION = 1
+
+
+class RuleSet(NamedTuple):
+    version: int
+    max_chain_length: int
+    synonyms: Dict[str, List[Tuple[str, float]]]
+
+
+class SynonymMatch(NamedTuple):
+    target: str
+    translation: str
+    confidence: float
+    depth: int
+
+
+EMPTY_RULES = RuleSet(RULES_FORMAT_VERSION, 0, {})
+
+
+def load_rules(path: str) -> RuleSet:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    version = data.get("version")
+    if version != RULES_FORMAT_VERSION:
+        raise ValueError(f"Unsupported rule file version {version!r} in {path}")
+    synonyms: Dict[str, List[Tuple[str, float]]] = {}
+    for word, edges in data.get("synonyms", {}).items():
+        synonyms[word.lower()] = [(synonym.lower(), float(confidence)) for synonym, confidence in edges]
+    return RuleSet(version, int(data.get("maxChainLength", 1)), synonyms)
+
+
+def compile_closure(rules: RuleSet, dictionary: Dict[str, str]) -> Dict[str, SynonymMatch]:
+    """Map each rule word to its best reachable dictionary entry."""
+    closure: Dict[str, SynonymMatch] = {}
+    for word in rules.synonyms:
+        if word in dictionary:
+            continue
+        best = None
+        frontier = {word: 1.0}
+        for depth in range(1, rules.max_chain_length + 1):
+            reached: Dict[str, float] = {}
+            for node, confidence in frontier.items():
+                for synonym, edge_confidence in rules.synonyms.get(node, ()):
+                    if synonym == word:
+                        continue
+                    combined = confidence * edge_confidence
+                    if combined > reached.get(synonym, 0.0):
+                        reached[synonym] = combined
+            for synonym, combined in reached.items():
+                if synonym in dictionary and (best is None or combined > best.confidence):
+                    best = SynonymMatch(synonym, dictionary[synonym], combined, depth)
+            # Chains only continue through words the dictionary cannot translate
+            frontier = {node: combined for node, combined in reached.items() if node not in dictionary}
+            if not frontier:
+                break
+        if best is not None:
+            closure[word] = best
+    return closure
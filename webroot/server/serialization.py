@@ -0,0 +1,78 @@
+"""Response classes and content negotiation for the high-throughput protocol.
+
+orjson and msgpack are optional: without orjson responses fall back to the
+standard json module, and without msgpack binary requests are rejected with
+415 and binary responses are never negotiated.
+"""
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+class UnsupportedMediaTypeError(ValueError):
+    """Raised when a request body uses an encoding this server cannot decode."""
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available.
+
+    Content must already be made of plain dicts, lists, strings and numbers;
+    no jsonable_encoder pass is made.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def is_msgpack(media_type: Optional[str]) -> bool:
+    if not media_type:
+        return False
+    return media_type.split(";", 1)[0].strip().lower() in MSGPACK_MEDIA_TYPES
+
+
+def decode_body(body: bytes, content_type: Optional[str]) -> Any:
+    """Decode a request body according to its Content-Type."""
+    if is_msgpack(content_type):
+        if msgpack is None:
+            raise UnsupportedMediaTypeError("MessagePack support is not installed on this server")
+        return msgpack.unpackb(body, raw=False)
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """True if the Accept header lists a MessagePack type and the server can produce it."""
+    if msgpack is None or not accept:
+        return False
+    return any(is_msgpack(part) for part in accept.split(","))
+
+
+def negotiated_response(content: Any, accept: Optional[str], status_code: int = 200,
+                        headers: Optional[dict] = None) -> Response:
+    """Build a MessagePack or JSON response depending on the Accept header."""
+    if wants_msgpack(accept):
+        return MsgPackResponse(content=content, status_code=status_code, headers=headers)
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
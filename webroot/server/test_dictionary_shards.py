@@ -0,0 +1,132 @@
+"""Shard layering, lazy loading and eviction, over a manifest written for each test."""
+import json
+
+import pytest
+
+from dictionary_shards import ShardRegistry, UnknownShardError, estimate_size
+
+
+def bulk(prefix: str, count: int = 200) -> dict:
+    return {f"{prefix}kata{index}": f"{prefix}liu{index}" for index in range(count)}
+
+
+def write_registry(tmp_path, shards, memory_cap=64 * 1024 * 1024) -> ShardRegistry:
+    """shards: (name, entries, priority, default) in manifest order."""
+    manifest = {"shards": []}
+    for name, entries, priority, default in shards:
+        (tmp_path / f"{name}.json").write_text(json.dumps(entries), encoding="utf-8")
+        manifest["shards"].append({"name": name, "file": f"{name}.json", "priority": priority, "default": default})
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+    return ShardRegistry(manifest_path, tmp_path / "missing.json", memory_cap=memory_cap)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return write_registry(tmp_path, [
+        ("core", {"padi": "padi-core", "rumah": "uma"}, 0, True),
+        ("agriculture", {"padi": "parai", "jagung": "jagung-dyk"}, 20, False),
+        ("health", {"padi": "padi-health", "obat": "tabat"}, 10, False),
+        ("farming", {"jagung": "jagung-farming"}, 20, False),
+    ])
+
+
+def test_default_lexicon_holds_only_default_shards(registry):
+    assert registry.default_names == ("core",)
+    assert registry.lexicon().entries == {"padi": "padi-core", "rumah": "uma"}
+    assert registry.lexicon(["core"]) is registry.default_lexicon
+
+
+def test_higher_priority_shard_wins(registry):
+    assert registry.lexicon(["health"]).entries["padi"] == "padi-health"
+    lexicon = registry.lexicon(["health", "agriculture"])
+    assert lexicon.entries["padi"] == "parai"
+    assert lexicon.entries["obat"] == "tabat"
+    assert lexicon.entries["rumah"] == "uma"
+    # Higher-priority entries iterate first, which is the order reverse lookups see
+    assert list(lexicon.entries)[:2] == ["padi", "jagung"]
+    # Selection order does not matter
+    assert registry.lexicon(["agriculture", "health"]) is lexicon
+
+
+def test_later_manifest_entry_wins_a_priority_tie(registry):
+    assert registry.lexicon(["agriculture", "farming"]).entries["jagung"] == "jagung-farming"
+
+
+def test_shards_load_on_first_use(registry):
+    assert registry.loads == 1
+    registry.lexicon(["agriculture"])
+    assert registry.loads == 2
+    registry.lexicon(["agriculture"])
+    assert registry.loads == 2
+    loaded = {shard["name"]: shard["loaded"] for shard in registry.stats()["shards"]}
+    assert loaded == {"core": True, "agriculture": True, "health": False, "farming": False}
+
+
+def test_unknown_shard_is_rejected(registry):
+    with pytest.raises(UnknownShardError):
+        registry.lexicon(["agriculture", "legal"])
+    assert registry.loads == 1
+
+
+def test_live_edits_apply_to_lexicons_merged_later(registry):
+    registry.apply_edit("padi", "padi-edited")
+    registry.apply_edit("rumah", None)
+    lexicon = registry.lexicon(["agriculture"])
+    assert lexicon.entries["padi"] == "padi-edited"
+    assert "rumah" not in lexicon.entries
+
+
+def test_least_recently_used_shard_is_evicted_over_the_cap(tmp_path):
+    registry = write_registry(tmp_path, [
+        ("core", {"rumah": "uma"}, 0, True),
+        ("agriculture", bulk("a"), 10, False),
+        ("health", bulk("h"), 10, False),
+        ("legal", bulk("l"), 10, False),
+    ])
+    registry.lexicon(["agriculture"])
+    registry.lexicon(["health"])
+    # Room for exactly what is resident now: two shards and their lexicons
+    registry.memory_cap = registry.stats()["residentBytes"]
+    assert registry.memory_cap >= 2 * estimate_size(bulk("a"))
+    registry.lexicon(["agriculture"])
+
+    registry.lexicon(["legal"])
+    loaded = {shard["name"]: shard["loaded"] for shard in registry.stats()["shards"]}
+    assert loaded == {"core": True, "agriculture": True, "health": False, "legal": True}
+    assert registry.evictions == 1
+    assert registry.stats()["residentBytes"] <= registry.memory_cap
+
+    # An evicted shard is read again when next selected, and default shards are never evicted
+    loads = registry.loads
+    assert registry.lexicon(["health"]).entries["hkata0"] == "hliu0"
+    assert registry.loads == loads + 1
+    assert registry.lexicon().entries == {"rumah": "uma"}
+
+
+def test_shard_over_the_cap_is_still_served(tmp_path):
+    registry = write_registry(tmp_path, [
+        ("core", {"rumah": "uma"}, 0, True),
+        ("agriculture", bulk("a"), 10, False),
+    ], memory_cap=0)
+    assert registry.lexicon(["agriculture"]).entries["akata1"] == "aliu1"
+    assert registry.lexicon(["agriculture"]).entries["rumah"] == "uma"
+
+
+def test_unknown_shard_is_a_validation_error_over_http(monkeypatch):
+    # Keep the import from opening a deployment's journal, translation memory, snapshot or capture file
+    for name in ("DICTIONARY_JOURNAL_PATH", "TRANSLATION_MEMORY_PATH", "CACHE_SNAPSHOT_PATH",
+                 "REQUEST_CAPTURE_PATH", "DICTIONARY_MANIFEST", "TRANSLATION_WORKERS"):
+        monkeypatch.delenv(name, raising=False)
+    from fastapi.testclient import TestClient
+    import main
+
+    response = TestClient(main.app).post("/translate", json={
+        "client": "test",
+        "requestId": "shards",
+        "timestamp": "D:01-01-2026#T:00:00:00",
+        "payload": {"text": "padi", "sourceLang": "id", "targetLang": "dyk",
+                    "options": {"dictionaries": ["no-such-shard"]}}
+    })
+    assert response.status_code == 422
+    assert "no-such-shard" in response.text
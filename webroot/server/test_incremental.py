@@ -0,0 +1,49 @@
+"""Incremental edits must leave the same lines, and so the same translation, as translating from scratch."""
+import asyncio
+import random
+
+from incremental import SegmentCache, TranslationSession
+
+
+async def reverse_line(line: str):
+    # Depends on the whole line, so a line wrongly split or joined by an edit changes the output
+    return line[::-1], 1.0, 1
+
+
+def full_translation(text: str) -> str:
+    return "".join(line[::-1] for line in text.splitlines(True))
+
+
+def test_typing_at_end_extends_last_line():
+    async def run():
+        session = TranslationSession("s", reverse_line, "key", SegmentCache())
+        await session.load("rumah")
+        await session.apply_edit(1, 5, 5, "ku")
+        return session
+
+    session = asyncio.run(run())
+    assert session._lines == ["rumahku"]
+    assert session.translated_text == full_translation("rumahku")
+
+
+def test_random_edits_match_full_translation():
+    pieces = ["a", "ku", " ", "\n", "\r", "\r\n", "dua puluh", "x"]
+
+    async def run(seed: int):
+        rng = random.Random(seed)
+        session = TranslationSession("s", reverse_line, "key", SegmentCache())
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 6)))
+        await session.load(text)
+        for _ in range(40):
+            start = rng.randint(0, len(text))
+            end = rng.randint(start, min(len(text), start + 3))
+            replacement = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+            previous = session.translated_text
+            patch = await session.apply_edit(session.version, start, end, replacement)
+            text = text[:start] + replacement + text[end:]
+            assert "".join(session._lines) == text
+            assert session.translated_text == full_translation(text), (seed, text)
+            assert previous[:patch.start] + patch.text + previous[patch.end:] == session.translated_text
+
+    for seed in range(200):
+        asyncio.run(run(seed))
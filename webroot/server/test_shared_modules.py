@@ -0,0 +1,24 @@
+"""Modules copied into the Vercel bundle must stay identical to the server's, or the engines drift apart."""
+from pathlib import Path
+
+import pytest
+
+SERVER_DIR = Path(__file__).resolve().parent
+SERVERLESS_DIR = SERVER_DIR.parent.parent / "vercel-deployment" / "api"
+
+# (server module, serverless copy); the copies start with "_" so the api/*.py build skips them
+SHARED_MODULES = [
+    ("rules.py", "_rules.py"),
+    ("numerals.py", "_numerals.py"),
+    ("structured_logging.py", "_structured_logging.py"),
+]
+
+
+@pytest.mark.parametrize("server_name, serverless_name", SHARED_MODULES)
+def test_serverless_copy_is_identical(server_name, serverless_name):
+    server_source = (SERVER_DIR / server_name).read_bytes()
+    serverless_source = (SERVERLESS_DIR / serverless_name).read_bytes()
+    assert server_source == serverless_source, (
+        f"vercel-deployment/api/{serverless_name} differs from webroot/server/{server_name}; "
+        f"apply the change to both and copy one over the other"
+    )
@@ -0,0 +1,316 @@
+"""Persistent segment-level translation memory backed by SQLite.
+
+Segments (lines) are stored with their translation, the per-word translations
+that produced it and their confidence, keyed by dictionary version and the
+options that affect output. Lookups match exactly on the segment text or,
+failing that, on its normalized form (lower-cased word sequence), which lets
+a segment differing only in case, spacing or punctuation be re-rendered from
+the stored word translations.
+
+The database runs in WAL mode so several worker processes or containers on
+the same host can share one file. Lookups read through their own connection
+and are meant to be run off the event loop; writes are buffered and flushed
+in small transactions by a background thread, which also prunes the table to
+a maximum number of rows, least recently used first, so waiting on another
+process's write lock never stalls a request.
+
+Command line:
+    python translation_memory.py stats  --db tm.sqlite3
+    python translation_memory.py export --db tm.sqlite3 --file tm.jsonl
+    python translation_memory.py import --db tm.sqlite3 --file tm.jsonl
+    python translation_memory.py prune  --db tm.sqlite3 --max-entries 100000 [--keep-version V]
+"""
+import argparse
+import json
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import IO, Iterable, Iterator, List, NamedTuple, Optional
+
+WORD_PATTERN = re.compile(r'\w+')
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segments (
+    dict_version TEXT NOT NULL,
+    options_key TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    translated TEXT NOT NULL,
+    words TEXT NOT NULL,
+    score REAL NOT NULL,
+    word_count INTEGER NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (dict_version, options_key, segment)
+);
+CREATE INDEX IF NOT EXISTS segments_normalized ON segments (dict_version, options_key, normalized);
+CREATE INDEX IF NOT EXISTS segments_last_used ON segments (last_used);
+"""
+
+
+def normalize_segment(segment: str) -> str:
+    """Lower-cased word sequence; segments with equal keys translate word for word alike."""
+    return " ".join(word.lower() for word in WORD_PATTERN.findall(segment))
+
+
+class MemoryMatch(NamedTuple):
+    exact: bool
+    translated: str
+    words: List[Optional[str]]
+    score: float
+    word_count: int
+
+
+class TranslationMemory:
+    """SQLite translation memory for one process; safe to share the file between processes."""
+
+    def __init__(self, path: str, max_entries: int = 200000, flush_size: int = 64,
+                 flush_interval: float = 1.0, prune_every: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.prune_every = prune_every
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        # Guards the write connection; _read_lock the lookup connection, _buffer_lock the write buffers
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._buffer_lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._touched: List[tuple] = []
+        self._writes_since_prune = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._connection.commit()
+        self._read_connection = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._closed = False
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="translation-memory-flush", daemon=True)
+        self._flusher.start()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        with self._read_lock:
+            self._read_connection.close()
+        with self._lock:
+            self._connection.close()
+
+    def _flush_loop(self) -> None:
+        """Flush every flush_interval, or sooner once flush_size writes are buffered."""
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation memory flush failed, will retry: {e}")
+
+    def lookup(self, segment: str, dict_version: str, options_key: str) -> Optional[MemoryMatch]:
+        """Blocking (it may wait on the database); call it from a worker thread."""
+        normalized = normalize_segment(segment)
+        with self._read_lock:
+            self.lookups += 1
+            row = self._read_connection.execute(
+                "SELECT segment, translated, words, score, word_count FROM segments "
+                "WHERE dict_version = ? AND options_key = ? AND normalized = ? "
+                "ORDER BY segment = ? DESC LIMIT 1",
+                (dict_version, options_key, normalized, segment)
+            ).fetchone()
+            if row is None:
+                return None
+            exact = row[0] == segment
+            if exact:
+                self.exact_hits += 1
+            else:
+                self.near_hits += 1
+        with self._buffer_lock:
+            self._touched.append((time.time(), dict_version, options_key, row[0]))
+        self._maybe_wake()
+        return MemoryMatch(exact, row[1], json.loads(row[2]), row[3], row[4])
+
+    def record(self, segment: str, dict_version: str, options_key: str, translated: str,
+               words: List[Optional[str]], score: float, word_count: int) -> None:
+        """Buffer a translated segment; it is written by the background flush."""
+        with self._buffer_lock:
+            self._pending.append((
+                dict_version, options_key, segment, normalize_segment(segment), translated,
+                json.dumps(words, ensure_ascii=False), score, word_count, time.time()
+            ))
+        self._maybe_wake()
+
+    def _maybe_wake(self) -> None:
+        if len(self._pending) + len(self._touched) >= self.flush_size:
+            self._wake.set()
+
+    def flush(self) -> None:
+        with self._lock:
+            with self._buffer_lock:
+                pending, self._pending = self._pending, []
+                touched, self._touched = self._touched, []
+            if not pending and not touched:
+                return
+            try:
+                self._write_batch(pending, touched)
+            except sqlite3.Error:
+                # Keep the writes for the next flush rather than losing them to a busy database
+                with self._buffer_lock:
+                    self._pending[:0] = pending
+                    self._touched[:0] = touched
+                raise
+            self._writes_since_prune += len(pending)
+            prune_due = self._writes_since_prune >= self.prune_every
+        if prune_due:
+            self.prune(self.max_entries)
+
+    def _write_batch(self, pending: List[tuple], touched: List[tuple]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO segments (dict_version, options_key, segment, normalized, translated, "
+                "words, score, word_count, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (dict_version, options_key, segment) DO UPDATE SET "
+                "translated = excluded.translated, words = excluded.words, score = excluded.score, "
+                "word_count = excluded.word_count, last_used = excluded.last_used",
+                pending
+            )
+            self._connection.executemany(
+                "UPDATE segments SET hits = hits + 1, last_used = ? "
+                "WHERE dict_version = ? AND options_key = ? AND segment = ?",
+                touched
+            )
+
+    def prune(self, max_entries: int, keep_version: Optional[str] = None) -> int:
+        """Drop other dictionary versions (if keep_version is given) and the least recently used rows."""
+        with self._lock:
+            self._writes_since_prune = 0
+            with self._connection:
+                removed = 0
+                if keep_version is not None:
+                    removed += self._connection.execute(
+                        "DELETE FROM segments WHERE dict_version != ?", (keep_version,)
+                    ).rowcount
+                total = self._connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+                if total > max_entries:
+                    removed += self._connection.execute(
+                        "DELETE FROM segments WHERE rowid IN "
+                        "(SELECT rowid FROM segments ORDER BY last_used ASC LIMIT ?)",
+                        (total - max_entries,)
+                    ).rowcount
+        return removed
+
+    def stats(self) -> dict:
+        with self._read_lock:
+            rows = self._read_connection.execute(
+                "SELECT dict_version, COUNT(*), SUM(hits) FROM segments GROUP BY dict_version"
+            ).fetchall()
+        return {
+            "path": self.path,
+            "entries": sum(row[1] for row in rows),
+            "versions": {row[0]: {"entries": row[1], "hits": row[2] or 0} for row in rows},
+            "lookups": self.lookups,
+            "exactHits": self.exact_hits,
+            "nearHits": self.near_hits,
+            "pendingWrites": len(self._pending),
+        }
+
+    def export_rows(self) -> Iterator[dict]:
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT dict_version, options_key, segment, translated, words, score, word_count, hits, last_used "
+                "FROM segments ORDER BY last_used DESC"
+            ).fetchall()
+        for row in rows:
+            yield {
+                "dictVersion": row[0],
+                "optionsKey": row[1],
+                "segment": row[2],
+                "translated": row[3],
+                "words": json.loads(row[4]),
+                "score": row[5],
+                "wordCount": row[6],
+                "hits": row[7],
+                "lastUsed": row[8],
+            }
+
+    def import_rows(self, rows: Iterable[dict], batch_size: int = 1000) -> int:
+        imported = 0
+        batch = []
+        for row in rows:
+            batch.append((
+                row["dictVersion"], row["optionsKey"], row["segment"], normalize_segment(row["segment"]),
+                row["translated"], json.dumps(row["words"], ensure_ascii=False), row["score"],
+                row["wordCount"], row.get("hits", 0), row.get("lastUsed", time.time())
+            ))
+            if len(batch) >= batch_size:
+                imported += self._insert_batch(batch)
+                batch = []
+        if batch:
+            imported += self._insert_batch(batch)
+        return imported
+
+    def _insert_batch(self, batch: List[tuple]) -> int:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO segments (dict_version, options_key, segment, normalized, translated, "
+                "words, score, word_count, hits, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch
+            )
+        return len(batch)
+
+
+def _read_jsonl(stream: IO[str]) -> Iterator[dict]:
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the SQLite translation memory.")
+    parser.add_argument("command", choices=("stats", "export", "import", "prune"))
+    parser.add_argument("--db", required=True, help="path to the SQLite file")
+    parser.add_argument("--file", default="-", help="JSONL file for export/import (default: stdout/stdin)")
+    parser.add_argument("--max-entries", type=int, default=200000)
+    parser.add_argument("--keep-version", help="with prune: drop every other dictionary version")
+    args = parser.parse_args(argv)
+
+    memory = TranslationMemory(args.db, max_entries=args.max_entries)
+    try:
+        if args.command == "stats":
+            print(json.dumps(memory.stats(), indent=2))
+        elif args.command == "export":
+            stream = sys.stdout if args.file == "-" else open(args.file, "w", encoding="utf-8")
+            count = 0
+            for row in memory.export_rows():
+                stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+                count += 1
+            if stream is not sys.stdout:
+                stream.close()
+            print(f"Exported {count} segments", file=sys.stderr)
+        elif args.command == "import":
+            stream = sys.stdin if args.file == "-" else open(args.file, "r", encoding="utf-8")
+            count = memory.import_rows(_read_jsonl(stream))
+            if stream is not sys.stdin:
+                stream.close()
+            print(f"Imported {count} segments", file=sys.stderr)
+        else:
+            removed = memory.prune(args.max_entries, args.keep_version)
+            print(f"Removed {removed} segments", file=sys.stderr)
+    finally:
+        memory.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())